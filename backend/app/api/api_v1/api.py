@@ -2,7 +2,7 @@ from fastapi import APIRouter
 from app.api.api_v1.endpoints import (
     login, users, projects, tasks, subtasks, notifications, calendar, 
     dashboard, metadata, templates, teams, ideas, workflows, 
-    comments, whiteboards, search, webhooks, folders
+    comments, whiteboards, search, webhooks, folders, work_calendars
 )
 
 api_router = APIRouter()
@@ -24,3 +24,4 @@ api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
 api_router.include_router(subtasks.router, prefix="/subtasks", tags=["subtasks"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
 api_router.include_router(calendar.router, prefix="/calendar", tags=["calendar"])
+api_router.include_router(work_calendars.router, prefix="/work-calendars", tags=["work-calendars"])
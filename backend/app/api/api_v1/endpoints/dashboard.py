@@ -1,16 +1,22 @@
-from typing import Any, List, Dict
-from fastapi import APIRouter, Depends, Query
+from typing import Any, List, Dict, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, or_
 from sqlalchemy.orm import selectinload
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 
 from app.api import deps
+from app.core import result_cache
+from app.crud import crud_task, crud_work_calendar
+from app.models.associations import project_members, task_assignees, team_members
 from app.models.project import Project
 from app.models.task import Task
+from app.models.team import Team
 from app.models.user import User
 from app.core.enums import Status
 from app.core.reports import generate_weekly_summaries, notify_near_deadlines
+from app.core.workload import day_numbers, spread_workload
 from app.schemas.workload import TeamWorkloadResponse, UserWorkload, DayWorkload
 
 router = APIRouter()
@@ -19,77 +25,77 @@ router = APIRouter()
 async def get_team_workload(
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
-    days: int = Query(30, ge=1, le=90)
+    days: int = Query(30, ge=1, le=90),
+    team_id: Optional[UUID] = None,
+    project_id: Optional[UUID] = None,
 ) -> Any:
     """
     Calculate daily workload per user for the next N days.
+    team_id limits the users to a team's members, project_id to the
+    project's owner and members; their workload still counts all their tasks.
     """
     start_date = datetime.utcnow().date()
-    
-    # 1. Fetch all active users
-    users_res = await db.execute(select(User).filter(User.is_active == True))
-    users = users_res.scalars().all()
-    
-    # 2. Fetch all active tasks with assignees
-    tasks_stmt = (
-        select(Task)
+    end_date = start_date + timedelta(days=days - 1)
+
+    # 1. Active users, optionally of one team or project
+    users_query = select(User.id, User.full_name, User.email).filter(User.is_active == True)
+    if team_id:
+        if not await db.get(Team, team_id):
+            raise HTTPException(status_code=404, detail="Team not found")
+        users_query = users_query.filter(
+            User.id.in_(select(team_members.c.user_id).filter(team_members.c.team_id == team_id))
+        )
+    if project_id:
+        project = await db.get(Project, project_id)
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        users_query = users_query.filter(or_(
+            User.id == project.owner_id,
+            User.id.in_(select(project_members.c.user_id).filter(project_members.c.project_id == project_id)),
+        ))
+    users_res = await db.execute(users_query.order_by(User.email))
+    users = users_res.all()
+    user_row = {u.id: i for i, u in enumerate(users)}
+
+    # 2. (assignee, start, due) of every open dated task overlapping the window
+    pairs_query = (
+        select(task_assignees.c.user_id, Task.start_date, Task.due_date)
+        .join(Task, Task.id == task_assignees.c.task_id)
         .filter(
-            and_(
-                Task.status != Status.DONE,
-                Task.start_date != None,
-                Task.due_date != None,
-                Task.is_archived == False
-            )
+            Task.status != Status.DONE,
+            Task.is_archived == False,
+            Task.start_date < datetime.combine(end_date + timedelta(days=1), time()),
+            Task.due_date >= datetime.combine(start_date, time()),
         )
-        .options(selectinload(Task.assignees))
     )
-    tasks_res = await db.execute(tasks_stmt)
-    tasks = tasks_res.scalars().all()
-    
-    response_users = []
-    
-    for user in users:
-        # Filter tasks assigned to this user
-        user_tasks = [t for t in tasks if any(u.id == user.id for u in t.assignees)]
-        
-        day_map = {}
-        for i in range(days):
-            d = start_date + timedelta(days=i)
-            day_map[d.isoformat()] = {"hours": 0.0, "count": 0}
-            
-        is_over = False
-        for task in user_tasks:
-            t_start = task.start_date.date()
-            t_due = task.due_date.date()
-            t_dur = (t_due - t_start).days + 1
-            
-            if t_dur <= 0: continue
-            
-            # Assume 8h per task by default if not specified
-            daily_effort = 8.0 / t_dur 
-            
-            curr = t_start
-            while curr <= t_due:
-                d_str = curr.isoformat()
-                if d_str in day_map:
-                    day_map[d_str]["hours"] += daily_effort
-                    day_map[d_str]["count"] += 1
-                    if day_map[d_str]["hours"] > 8.0:
-                        is_over = True
-                curr += timedelta(days=1)
-                
-        workload_list = [
-            DayWorkload(date=d, hours=round(v["hours"], 1), task_count=v["count"])
-            for d, v in day_map.items()
-        ]
-        
-        response_users.append(UserWorkload(
+    if team_id or project_id:
+        pairs_query = pairs_query.filter(task_assignees.c.user_id.in_(users_query.with_only_columns(User.id)))
+    pairs_res = await db.execute(pairs_query)
+    pairs = [(user_row[u], s, d) for u, s, d in pairs_res.all() if u in user_row]
+
+    # Work is spread over working days only when a calendar applies
+    calendars = await crud_work_calendar.work_calendar.for_users(db, user_row.keys())
+    workload = spread_workload(
+        [p[0] for p in pairs], day_numbers([p[1] for p in pairs]), day_numbers([p[2] for p in pairs]),
+        n_users=len(users), first_day=int(day_numbers([start_date])[0]), days=days,
+        calendars=[calendars.get(u.id, calendars[None]) for u in users],
+    )
+
+    dates = [(start_date + timedelta(days=i)).isoformat() for i in range(days)]
+    hours = workload.hours.round(1).tolist()
+    counts = workload.counts.tolist()
+    response_users = [
+        UserWorkload(
             user_id=str(user.id),
             user_name=user.full_name or user.email,
-            workload=workload_list,
-            is_overallocated=is_over
-        ))
-        
+            workload=[
+                DayWorkload(date=d, hours=h, task_count=c)
+                for d, h, c in zip(dates, hours[i], counts[i])
+            ],
+            is_overallocated=bool(workload.overallocated[i]),
+        )
+        for i, user in enumerate(users)
+    ]
     return TeamWorkloadResponse(users=response_users)
 
 @router.post("/trigger-weekly-summary", status_code=202)
@@ -242,105 +248,74 @@ async def get_dashboard_summary(
 ) -> Any:
     """
     Get summary statistics for the dashboard.
+    Status counts come from one GROUP BY, every query selects only the
+    columns it returns, and the result is cached per user for a few seconds
+    (see app.core.result_cache.dashboard_summaries).
     """
+    cached = result_cache.dashboard_summaries.get(current_user.id)
+    if cached is not None:
+        return cached
+    # A write committed while the queries run makes this result stale: not cached then
+    generation = result_cache.dashboard_summaries.generation
+
+    def owned(query):
+        # Non-superusers only see tasks of projects they own
+        if current_user.is_superuser:
+            return query
+        return query.join(Project, Project.id == Task.project_id).where(Project.owner_id == current_user.id)
+
     # 1. Projects Count
     proj_query = select(func.count(Project.id)).where(Project.is_archived == False)
     if not current_user.is_superuser:
         proj_query = proj_query.where(Project.owner_id == current_user.id)
-    
-    res = await db.execute(proj_query)
-    total_projects = res.scalar()
 
-    # 2. Tasks Count & Breakdown
-    # For tasks, we need to filter by projects owned by the user if not superuser
-    # And EXCLUDE archived tasks
-    if current_user.is_superuser:
-        task_query = select(Task).where(Task.is_archived == False)
-    else:
-        task_query = select(Task).join(Project).where(
-            Project.owner_id == current_user.id,
-            Task.is_archived == False
-        )
+    # 2. Tasks Count & Breakdown (archived tasks excluded)
+    status_query = owned(
+        select(Task.status, func.count(Task.id)).where(Task.is_archived == False)
+    ).group_by(Task.status)
 
-    res = await db.execute(task_query)
-    all_tasks = res.scalars().all()
-    
-    total_tasks = len(all_tasks)
-    tasks_backlog = sum(1 for t in all_tasks if t.status == Status.BACKLOG)
-    tasks_todo = sum(1 for t in all_tasks if t.status == Status.TODO)
-    tasks_in_progress = sum(1 for t in all_tasks if t.status == Status.IN_PROGRESS)
-    tasks_on_hold = sum(1 for t in all_tasks if t.status == Status.ON_HOLD)
-    tasks_review = sum(1 for t in all_tasks if t.status == Status.REVIEW)
-    tasks_done = sum(1 for t in all_tasks if t.status == Status.DONE)
-    
     # 3. Upcoming Deadlines (next 7 days)
-    # Exclude archived
     now = datetime.utcnow()
     next_week = now + timedelta(days=7)
-    
-    if current_user.is_superuser:
-        upcoming_query = select(Task).where(
-            Task.due_date >= now,
-            Task.due_date <= next_week,
-            Task.status != Status.DONE,
-            Task.is_archived == False
-        ).order_by(Task.due_date.asc()).limit(5)
-    else:
-        upcoming_query = select(Task).join(Project).where(
-            Project.owner_id == current_user.id,
+    upcoming_query = owned(
+        select(Task.id, Task.title, Task.due_date, Task.project_id).where(
             Task.due_date >= now,
             Task.due_date <= next_week,
             Task.status != Status.DONE,
             Task.is_archived == False
-        ).order_by(Task.due_date.asc()).limit(5)
-
-    res = await db.execute(upcoming_query)
-    upcoming_tasks = res.scalars().all()
+        )
+    ).order_by(Task.due_date.asc()).limit(5)
 
     # 4. Recent Activity (last 5 completed tasks)
-    if current_user.is_superuser:
-        activity_query = select(Task).where(
+    activity_query = owned(
+        select(Task.id, Task.title, Task.completed_at, Task.project_id).where(
             Task.status == Status.DONE,
             Task.completed_at != None
-        ).order_by(Task.completed_at.desc()).limit(5)
-    else:
-        activity_query = select(Task).join(Project).where(
-            Project.owner_id == current_user.id,
-            Task.status == Status.DONE,
-            Task.completed_at != None
-        ).order_by(Task.completed_at.desc()).limit(5)
-
-    res = await db.execute(activity_query)
-    recent_activity = res.scalars().all()
-
-    # 5. Global Activity (for heatmap)
-    # Using unified Task model
-    activity_query = select(
-        func.date(Task.completed_at).label("date"),
-        func.count(Task.id).label("count")
-    ).where(
-        Task.completed_at != None
-    )
-
-    if not current_user.is_superuser:
-        activity_query = activity_query.join(Project).where(Project.owner_id == current_user.id)
+        )
+    ).order_by(Task.completed_at.desc()).limit(5)
 
-    global_activity_query = activity_query.group_by(
-        func.date(Task.completed_at)
+    # 5. Global Activity (for heatmap), from the daily rollup
+    global_activity_query = crud_task.task.completion_activity_query(
+        project_owner_id=None if current_user.is_superuser else current_user.id
     )
 
-    res = await db.execute(global_activity_query)
-    global_stats = res.all()
+    # On the request's session, one after the other: they are small, and a
+    # cache miss must not take more than one pooled connection
+    projects, status_counts, upcoming_tasks, recent_activity, global_stats = [
+        (await db.execute(q)).all()
+        for q in (proj_query, status_query, upcoming_query, activity_query, global_activity_query)
+    ]
+    counts = {status: count for status, count in status_counts}
 
-    return {
-        "total_projects": total_projects,
-        "total_tasks": total_tasks,
-        "tasks_backlog": tasks_backlog,
-        "tasks_todo": tasks_todo,
-        "tasks_in_progress": tasks_in_progress,
-        "tasks_on_hold": tasks_on_hold,
-        "tasks_review": tasks_review,
-        "tasks_done": tasks_done,
+    summary = {
+        "total_projects": projects[0][0],
+        "total_tasks": sum(counts.values()),
+        "tasks_backlog": counts.get(Status.BACKLOG, 0),
+        "tasks_todo": counts.get(Status.TODO, 0),
+        "tasks_in_progress": counts.get(Status.IN_PROGRESS, 0),
+        "tasks_on_hold": counts.get(Status.ON_HOLD, 0),
+        "tasks_review": counts.get(Status.REVIEW, 0),
+        "tasks_done": counts.get(Status.DONE, 0),
         "upcoming_deadlines": [
             {
                 "id": str(t.id),
@@ -359,3 +334,5 @@ async def get_dashboard_summary(
         ],
         "global_activity": [{"date": str(s.date), "count": s.count} for s in global_stats]
     }
+    result_cache.dashboard_summaries.put(current_user.id, summary, generation=generation)
+    return summary
@@ -1,6 +1,6 @@
 from typing import Any, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
@@ -11,16 +11,19 @@ router = APIRouter()
 
 @router.get("/", response_model=List[schemas.idea.Idea])
 async def read_ideas(
+    response: Response,
     project_id: Optional[UUID] = Query(None),
     task_id: Optional[UUID] = Query(None),
     db: AsyncSession = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Retrieve ideas. If project_id is provided, filters by project.
     Otherwise, returns all ideas relevant to the current user.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
     if project_id:
         # Check project access (implied by dependency but let's be safe)
@@ -28,9 +31,11 @@ async def read_ideas(
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
             
-        return await crud_idea.get_multi_by_project(db, project_id=project_id, task_id=task_id, skip=skip, limit=limit, current_user_id=current_user.id)
-    
-    return await crud_idea.get_multi_by_user(db, user_id=current_user.id, skip=skip, limit=limit, current_user_id=current_user.id)
+        ideas = await crud_idea.get_multi_by_project(db, project_id=project_id, task_id=task_id, skip=skip, limit=limit, current_user_id=current_user.id, cursor=cursor)
+    else:
+        ideas = await crud_idea.get_multi_by_user(db, user_id=current_user.id, skip=skip, limit=limit, current_user_id=current_user.id, cursor=cursor)
+    deps.set_next_cursor(response, crud_idea, ideas, limit)
+    return ideas
 
 @router.post("/{idea_id}/vote")
 async def vote_idea(
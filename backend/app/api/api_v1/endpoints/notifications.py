@@ -1,6 +1,6 @@
-from typing import Any, List
+from typing import Any, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from jose import jwt, JWTError
 
@@ -53,17 +53,21 @@ async def websocket_endpoint(websocket: WebSocket, token: str):
 
 @router.get("/", response_model=List[Notification])
 async def read_notifications(
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """
-    Retrieve notifications for the current user.
+    Retrieve notifications for the current user, newest first.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
     notifications = await crud_notification.get_multi_by_user(
-        db, user_id=current_user.id, skip=skip, limit=limit
+        db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor
     )
+    deps.set_next_cursor(response, crud_notification, notifications, limit)
     return notifications
 
 @router.put("/{notification_id}", response_model=Notification)
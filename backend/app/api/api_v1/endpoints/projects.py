@@ -1,6 +1,6 @@
-from typing import Any, List
+from typing import Any, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -11,6 +11,8 @@ from datetime import datetime
 from app.api import deps
 from app.crud import crud_project, crud_task
 from app.schemas.project import Project, ProjectCreate, ProjectUpdate
+from app.schemas.simulation import ScheduleSimulation
+from app.schemas.workload import ResourceLeveling
 from app.models.user import User
 from app.models.task import Task
 
@@ -219,91 +221,69 @@ async def export_project(
         response.headers["Content-Disposition"] = f"attachment; filename={filename}"
         return response
 
-from app.schemas.portfolio import PortfolioHealthResponse, ProjectHealth
-from app.core.enums import Status as TaskStatus
+from app.schemas.portfolio import PortfolioHealthResponse, PortfolioSchedule
 
-@router.get("/portfolio/health", response_model=PortfolioHealthResponse)
-async def get_portfolio_health(
-    db: AsyncSession = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
-) -> Any:
-    """
-    Calculate health metrics for all active projects.
-    """
-    # Fetch active projects
+async def _portfolio_projects(db: AsyncSession, current_user: User) -> list:
     if current_user.is_superuser:
         projects = await crud_project.project.get_multi(db, limit=1000)
-        projects = [p for p in projects if not p.is_archived]
     else:
         # Simplified: owner only for now
         projects = await crud_project.project.get_multi_by_owner(db, owner_id=current_user.id)
-        projects = [p for p in projects if not p.is_archived]
-
-    project_healths = []
-    total_progress = 0.0
-    critical_projects = 0
-    now = datetime.utcnow()
-
-    for p in projects:
-        # Load tasks for analysis
-        tasks_stmt = select(Task).filter(Task.project_id == p.id, Task.is_archived == False)
-        tasks_res = await db.execute(tasks_stmt)
-        tasks = tasks_res.scalars().all()
+    return [p for p in projects if not p.is_archived]
 
-        overdue = sum(1 for t in tasks if t.due_date and t.due_date < now and t.status != TaskStatus.DONE)
-        critical_path = sum(1 for t in tasks if getattr(t, 'is_critical', False))
-        
-        # Simple health score formula: 100 - (overdue * 5)
-        score = 100.0 - (overdue * 5.0)
-        if p.status == "On hold": score -= 20
-        score = max(0.0, min(100.0, score))
-
-        risk = "Low"
-        if score < 50 or overdue > 5: risk = "High"
-        elif score < 80 or overdue > 2: risk = "Medium"
-
-        if risk == "High": critical_projects += 1
-        total_progress += (p.progress_percent or 0.0)
-
-        project_healths.append(ProjectHealth(
-            id=p.id,
-            name=p.name,
-            progress=p.progress_percent or 0.0,
-            status=p.status.value if hasattr(p.status, 'value') else str(p.status),
-            health_score=score,
-            overdue_tasks=overdue,
-            critical_path_tasks=critical_path,
-            risk_level=risk,
-            variance_days=overdue # Simplified variance
-        ))
+@router.get("/portfolio/schedule", response_model=PortfolioSchedule)
+async def get_portfolio_schedule(
+    project_ids: Optional[List[UUID]] = Query(None, description="Defaults to every active project visible to the user"),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Cross-project critical path: one CPM run over the selected projects,
+    dependencies between them included. Returns the global critical chain and
+    each project's projected finish against its due date.
+    """
+    visible = {p.id for p in await _portfolio_projects(db, current_user)}
+    if project_ids is not None:
+        if not set(project_ids) <= visible:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        visible = set(project_ids)
+    return await crud_task.task.portfolio_schedule(db, project_ids=visible)
 
-    return PortfolioHealthResponse(
-        projects=project_healths,
-        total_active=len(projects),
-        average_progress=total_progress / len(projects) if projects else 0.0,
-        critical_projects=critical_projects
-    )
+@router.get("/portfolio/health", response_model=PortfolioHealthResponse)
+async def get_portfolio_health(
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Calculate health metrics for all active projects: one grouped query plus
+    the cross-project CPM run, cached until one of the projects changes.
+    """
+    return await crud_task.task.portfolio_health(db, owner_id=None if current_user.is_superuser else current_user.id)
 
 @router.get("/", response_model=List[Project])
 async def read_projects(
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     include_archived: bool = Query(False),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Retrieve projects.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
     if current_user.is_superuser:
         projects = await crud_project.project.get_multi(
-            db, skip=skip, limit=limit, include_archived=include_archived
+            db, skip=skip, limit=limit, include_archived=include_archived, cursor=cursor
         )
     else:
         # Use new method to fetch projects where user is owner OR member
         projects = await crud_project.project.get_multi_by_user(
-            db, user_id=current_user.id, skip=skip, limit=limit, include_archived=include_archived
+            db, user_id=current_user.id, skip=skip, limit=limit, include_archived=include_archived, cursor=cursor
         )
+    deps.set_next_cursor(response, crud_project.project, projects, limit)
     return projects
 
 @router.post("/", response_model=Project)
@@ -375,13 +355,9 @@ async def read_project_statistics(
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """
-    Get project statistics (activity data for heatmap).
+    Get project statistics (activity data for heatmap): tasks completed per
+    day over the last year, read from the daily completion rollup.
     """
-    from sqlalchemy import func
-    from app.models.task import Task
-    from app.models.project import Project as ProjectModel
-    from sqlalchemy import select
-
     project = await crud_project.project.get(db, id=project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -392,23 +368,66 @@ async def read_project_statistics(
         if current_user.id not in member_ids:
              raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    # Activity query: count all completed tasks in this project per day
-    # Using unified Task model
-    query = select(
-        func.date(Task.completed_at).label("date"),
-        func.count(Task.id).label("count")
-    ).where(
-        Task.project_id == project_id,
-        Task.completed_at != None
-    ).group_by(
-        func.date(Task.completed_at)
-    )
-
-    result = await db.execute(query)
+    result = await db.execute(crud_task.task.completion_activity_query(project_id=project_id))
     stats = result.all()
     
     return [{"date": str(s.date), "count": s.count} for s in stats]
 
+@router.get("/{project_id}/schedule/simulate", response_model=ScheduleSimulation)
+async def simulate_project_schedule(
+    project_id: UUID,
+    iterations: int = Query(
+        10_000, ge=1, le=100_000,
+        description="Upper bound; large projects run fewer to keep the forecast around a second",
+    ),
+    seed: Optional[int] = Query(None, description="Fixes the random stream for reproducible forecasts"),
+    bins: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Monte Carlo forecast from the tasks' optimistic/normal/pessimistic
+    estimates: P50/P80/P95 finish dates, finish and criticality histograms,
+    and each task's criticality index. Tasks x iterations is capped by
+    SIMULATION_CELL_BUDGET (2,000 iterations for 10k tasks by default); the
+    response's `iterations` is the count actually run.
+    """
+    project = await crud_project.project.get(db, id=project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    # Check permissions (Owner or Member)
+    if not current_user.is_superuser and project.owner_id != current_user.id:
+        member_ids = [m.id for m in project.members]
+        if current_user.id not in member_ids:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    return await crud_task.task.simulate_schedule(db, project_id=project_id, iterations=iterations, seed=seed, bins=bins)
+
+@router.post("/{project_id}/schedule/level", response_model=ResourceLeveling)
+async def level_project_resources(
+    project_id: UUID,
+    apply: bool = Query(False, description="Write the proposed dates instead of only returning them"),
+    capacity_hours: float = Query(8.0, gt=0, le=24),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Resource leveling: delay non-critical tasks within their slack so that no
+    assignee is planned for more than capacity_hours a day.
+    """
+    project = await crud_project.project.get(db, id=project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    # Check permissions (Owner or Member)
+    if not current_user.is_superuser and project.owner_id != current_user.id:
+        member_ids = [m.id for m in project.members]
+        if current_user.id not in member_ids:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    return await crud_task.task.level_resources(db, project_id=project_id, capacity_hours=capacity_hours, apply=apply)
+
 @router.get("/{project_id}", response_model=Project)
 async def read_project(
     project_id: UUID,
@@ -1,6 +1,8 @@
-from typing import Any, List
+from typing import Any, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
@@ -12,14 +14,18 @@ router = APIRouter()
 
 @router.get("/", response_model=List[Task])
 async def read_subtasks(
+    response: Response,
     task_id: UUID,
     db: AsyncSession = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = Depends(deps.get_task_fields),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Retrieve subtasks for a task.
+    With `view=compact` or `fields=...`, flat rows carrying only those fields.
     """
     parent_task = await crud_task.task.get(db, id=task_id)
     if not parent_task:
@@ -30,8 +36,11 @@ async def read_subtasks(
         raise HTTPException(status_code=400, detail="Not enough permissions")
     
     subtasks = await crud_task.task.get_multi_by_project(
-        db, project_id=parent_task.project_id, parent_id=task_id, skip=skip, limit=limit
+        db, project_id=parent_task.project_id, parent_id=task_id, skip=skip, limit=limit, fields=fields, cursor=cursor
     )
+    deps.set_next_cursor(response, crud_task.task, subtasks, limit)
+    if fields:
+        return JSONResponse(jsonable_encoder(subtasks), headers=dict(response.headers))
     return subtasks
 
 @router.post("/", response_model=Task)
@@ -3,7 +3,7 @@ import os
 import shutil
 import uuid
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Query
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import and_
 from sqlalchemy.future import select
@@ -11,8 +11,9 @@ from sqlalchemy.orm import selectinload
 
 from app.api import deps
 from app.crud import crud_task, crud_project, crud_dependency
-from app.schemas.task import Task, TaskCreate, TaskUpdate, Dependency, DependencyCreate
+from app.schemas.task import Task, TaskCreate, TaskUpdate, TaskBulkCreate, TaskReorder, Dependency, DependencyCreate, DependencyBulkCreate, DependencyBulkResult, TaskBlockers, TaskEvent
 from app.models.user import User
+from app.models.task import Task as TaskModel
 from app.models.dependency import Dependency as DependencyModel
 from app.core.config import settings
 from app.core.enums import Status
@@ -21,7 +22,8 @@ from datetime import datetime
 import io
 import pandas as pd
 from datetime import datetime
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
 
 router = APIRouter()
 
@@ -127,89 +129,94 @@ async def export_tasks(
 
 @router.get("/assigned", response_model=List[Task])
 async def read_assigned_tasks(
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = Depends(deps.get_task_fields),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Retrieve all tasks assigned to the current user.
+    With `view=compact` or `fields=...`, flat rows carrying only those fields.
     """
-    from app.models.task import Task as TaskModel
-    from app.models.project import Project as ProjectModel
-    from app.models.associations import task_assignees
-    from sqlalchemy import or_
-    
-    query = (
-        select(TaskModel)
-        .join(task_assignees)
-        .outerjoin(ProjectModel, TaskModel.project_id == ProjectModel.id)
-        .filter(task_assignees.c.user_id == current_user.id)
-        .filter(TaskModel.is_archived == False)
-        .filter(or_(ProjectModel.id == None, ProjectModel.is_archived == False))
-        .options(
-            selectinload(TaskModel.owner),
-            selectinload(TaskModel.assignees),
-            selectinload(TaskModel.blocked_by),
-            selectinload(TaskModel.blocking),
-            selectinload(TaskModel.topic_ref),
-            selectinload(TaskModel.type_ref),
-            selectinload(TaskModel.topics),
-            selectinload(TaskModel.types),
-            selectinload(TaskModel.project),
-            selectinload(TaskModel.subtasks).options(
-                selectinload(TaskModel.owner),
-                selectinload(TaskModel.assignees),
-                selectinload(TaskModel.blocked_by),
-                selectinload(TaskModel.blocking),
-                selectinload(TaskModel.topic_ref),
-                selectinload(TaskModel.type_ref),
-                selectinload(TaskModel.topics),
-                selectinload(TaskModel.types),
-                selectinload(TaskModel.subtasks).options(
-                    selectinload(TaskModel.owner),
-                    selectinload(TaskModel.assignees),
-                    selectinload(TaskModel.blocked_by),
-                    selectinload(TaskModel.blocking),
-                    selectinload(TaskModel.topic_ref),
-                    selectinload(TaskModel.type_ref),
-                    selectinload(TaskModel.topics),
-                    selectinload(TaskModel.types),
-                    selectinload(TaskModel.subtasks).options(
-                        selectinload(TaskModel.owner),
-                        selectinload(TaskModel.assignees),
-                        selectinload(TaskModel.blocked_by),
-                        selectinload(TaskModel.blocking),
-                        selectinload(TaskModel.topic_ref),
-                        selectinload(TaskModel.type_ref),
-                        selectinload(TaskModel.topics),
-                        selectinload(TaskModel.types),
-                        selectinload(TaskModel.subtasks)
-                    )
-                )
-            )
-        )
-        .offset(skip)
-        .limit(limit)
+    tasks = await crud_task.task.get_multi_by_assignee(
+        db, user_id=current_user.id, skip=skip, limit=limit, fields=fields, cursor=cursor
     )
-    result = await db.execute(query)
-    tasks = result.scalars().all()
+    deps.set_next_cursor(response, crud_task.task, tasks, limit)
+    if fields:
+        return JSONResponse(jsonable_encoder(tasks), headers=dict(response.headers))
     
     # We don't apply WBS here as these tasks are from different projects/levels
     return tasks
 
+@router.get("/blockers", response_model=List[TaskBlockers])
+async def read_project_blockers(
+    project_id: UUID,
+    transitive: bool = Query(False),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Blocked tasks of a project (e.g. for Kanban cards), each with its
+    unfinished direct blockers. With `transitive=true`, every task of the
+    project also gets its full upstream set.
+    """
+    project = await crud_project.project.get(db, id=project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if not current_user.is_superuser and project.owner_id != current_user.id:
+        if current_user.id not in [m.id for m in project.members]:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    active = await crud_task.task.get_active_blockers(db, project_id=project_id)
+    if not transitive:
+        return [{"task_id": task_id, "active_blockers": blockers} for task_id, blockers in active.items()]
+    upstream = await crud_task.task.get_transitive_blockers(db, project_id=project_id)
+    return [
+        {"task_id": task_id, "active_blockers": active.get(task_id, []), "upstream_ids": sorted(upstream.get(task_id, ()))}
+        for task_id in active.keys() | upstream.keys()
+    ]
+
+@router.get("/events", response_model=List[TaskEvent])
+async def read_task_events(
+    project_id: UUID,
+    task_id: Optional[UUID] = None,
+    since: Optional[datetime] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Change history of a project's tasks (or of one task), oldest first:
+    creation, status and date changes, assignee changes, moves and deletion.
+    """
+    project = await crud_project.project.get(db, id=project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if not current_user.is_superuser and project.owner_id != current_user.id:
+        if current_user.id not in [m.id for m in project.members]:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+    return await crud_task.task.get_events(db, project_id=project_id, task_id=task_id, since=since, limit=limit)
+
 @router.get("/", response_model=List[Task])
 async def read_tasks(
+    response: Response,
     project_id: UUID,
     parent_id: Optional[UUID] = None,
     include_archived: bool = Query(False),
     db: AsyncSession = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = Depends(deps.get_task_fields),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Retrieve tasks for a project.
+    With `view=compact` or `fields=...`, flat rows carrying only those fields
+    (no subtasks, WBS codes or CPM data).
     """
     from typing import Optional
     project = await crud_project.project.get(db, id=project_id)
@@ -228,11 +235,17 @@ async def read_tasks(
         skip=skip, 
         limit=limit, 
         parent_id=parent_id,
-        include_archived=include_archived
+        include_archived=include_archived,
+        fields=fields,
+        cursor=cursor
     )
+    deps.set_next_cursor(response, crud_task.task, tasks, limit)
+    if fields:
+        return JSONResponse(jsonable_encoder(tasks), headers=dict(response.headers))
     
     from app.core.wbs import apply_wbs_codes
-    from app.core.cpm import calculate_cpm
+    from app.core.cpm import apply_schedule
+    from app.core.result_cache import apply_results
     from app.schemas.task import Task as TaskSchema
     # Convert models to schemas to allow setting wbs_code (which is not in DB)
     # We also ensure the project is attached to the schema if loaded
@@ -242,9 +255,15 @@ async def read_tasks(
         ts.project = project # Attach the project we already fetched
         task_schemas.append(ts)
     
-    # Apply WBS and CPM
+    if not include_archived:
+        # Project-wide WBS codes and CPM flags, cached per project revision
+        results = await crud_task.task.get_project_results(db, project_id=project_id)
+        return apply_results(task_schemas, results)
+
+    # Archived tasks are not part of the cached numbering
     task_schemas = apply_wbs_codes(task_schemas, "")
-    return calculate_cpm(task_schemas)
+    schedule = await crud_task.task.get_schedule(db, project_id=project_id)
+    return apply_schedule(task_schemas, schedule)
 
 @router.post("/", response_model=Task)
 async def create_task(
@@ -276,6 +295,81 @@ async def create_task(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/bulk", response_model=List[Task])
+async def create_tasks_bulk(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    bulk_in: TaskBulkCreate,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Create a forest of tasks (with subtasks, assignees, topics, types and
+    dependencies) in a single transaction. Dependencies may point to other
+    items of the batch through their `ref`.
+    """
+    project_id = bulk_in.project_id
+    if bulk_in.parent_id:
+        parent = await crud_task.task.get(db, id=bulk_in.parent_id)
+        if not parent:
+            raise HTTPException(status_code=404, detail="Parent task not found")
+        await check_task_permissions(db, parent, current_user, "write")
+        if project_id and project_id != parent.project_id:
+            raise HTTPException(status_code=400, detail="Subtasks must belong to their parent's project")
+        project_id = parent.project_id
+
+    if project_id:
+        project = await crud_project.project.get(db, id=project_id)
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        
+        # Check permissions (Owner or Member)
+        if not current_user.is_superuser and project.owner_id != current_user.id:
+            member_ids = [m.id for m in project.members]
+            if current_user.id not in member_ids:
+                raise HTTPException(status_code=403, detail="Not enough permissions")
+        bulk_in.project_id = project_id
+
+    try:
+        return await crud_task.task.create_bulk(db=db, obj_in=bulk_in, owner_id=current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.patch("/reorder", response_model=List[Task])
+async def reorder_tasks(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    reorder_in: TaskReorder,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Move several tasks at once (drag-and-drop). Each move places `task_id`
+    right after `after_id` or right before `before_id`, optionally under a new
+    `parent_id`; with no anchor the task goes to the end of its siblings.
+    Only the moved tasks are rewritten.
+    """
+    ids = {i for m in reorder_in.moves for i in (m.task_id, m.parent_id) if i}
+    res = await db.execute(
+        select(TaskModel.id, TaskModel.project_id, TaskModel.owner_id).filter(TaskModel.id.in_(ids))
+    )
+    rows = res.all()
+    if len(rows) != len(ids):
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    if not current_user.is_superuser:
+        for project_id in {r.project_id for r in rows if r.project_id}:
+            project = await crud_project.project.get(db, id=project_id)
+            if not project:
+                raise HTTPException(status_code=404, detail="Project not found")
+            if project.owner_id != current_user.id and current_user.id not in [m.id for m in project.members]:
+                raise HTTPException(status_code=403, detail="Not enough permissions for this project")
+        if any(not r.project_id and r.owner_id != current_user.id for r in rows):
+            raise HTTPException(status_code=403, detail="Not enough permissions for this task")
+
+    try:
+        return await crud_task.task.reorder(db=db, moves=reorder_in.moves)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 async def check_task_permissions(db: AsyncSession, task_obj: Any, current_user: User, required_level: str = "read") -> None:
     if current_user.is_superuser:
         return
@@ -414,6 +508,20 @@ async def create_task_dependency(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/dependencies/bulk", response_model=List[DependencyBulkResult])
+async def create_dependencies_bulk(
+    obj_in: DependencyBulkCreate,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Create many dependencies at once. Each link is validated against the
+    existing graph and the links before it; the valid ones are inserted
+    together and every link gets its own result (created, exists, invalid,
+    or cycle with the offending path).
+    """
+    return await crud_dependency.dependency.create_bulk(db, objs_in=obj_in.dependencies)
+
 @router.delete("/{task_id}/dependencies/{predecessor_id}", response_model=List[Dependency])
 async def delete_task_dependency(
     task_id: UUID,
@@ -489,29 +597,41 @@ async def restore_task(
 
 @router.get("/archived/all", response_model=List[Task])
 async def read_archived_tasks(
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = Depends(deps.get_task_fields),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Retrieve all archived tasks where the current user is either the owner or an assignee.
+    With `view=compact` or `fields=...`, flat rows carrying only those fields.
     """
-    from app.models.task import Task as TaskModel
     from app.models.associations import task_assignees
-    from sqlalchemy import or_
+    from sqlalchemy import or_, exists
+
+    # EXISTS rather than a join + DISTINCT: one row per task, and the
+    # keyset ORDER BY of paginate() stays valid on the id-only select
+    visible = and_(
+        TaskModel.is_archived == True,
+        or_(
+            TaskModel.owner_id == current_user.id,
+            exists().where(task_assignees.c.task_id == TaskModel.id, task_assignees.c.user_id == current_user.id)
+        )
+    )
+
+    if fields:
+        ids_query = crud_task.task.paginate(select(TaskModel.id).filter(visible), skip=skip, limit=limit, cursor=cursor)
+        rows = await crud_task.task.get_projection(db, ids_query=ids_query, fields=fields)
+        deps.set_next_cursor(response, crud_task.task, rows, limit)
+        return JSONResponse(jsonable_encoder(rows), headers=dict(response.headers))
     
     # Select tasks that are archived AND (user is owner OR user is in assignees)
     query = (
         select(TaskModel)
-        .outerjoin(task_assignees)
-        .filter(TaskModel.is_archived == True)
-        .filter(
-            or_(
-                TaskModel.owner_id == current_user.id,
-                task_assignees.c.user_id == current_user.id
-            )
-        )
+        .filter(visible)
         .options(
             selectinload(TaskModel.owner),
             selectinload(TaskModel.assignees),
@@ -519,11 +639,9 @@ async def read_archived_tasks(
             selectinload(TaskModel.topics),
             selectinload(TaskModel.types)
         )
-        .distinct()
-        .offset(skip)
-        .limit(limit)
     )
     
-    result = await db.execute(query)
+    result = await db.execute(crud_task.task.paginate(query, skip=skip, limit=limit, cursor=cursor))
     tasks = result.scalars().all()
+    deps.set_next_cursor(response, crud_task.task, tasks, limit)
     return tasks
@@ -1,6 +1,6 @@
-from typing import Any, List
+from typing import Any, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
@@ -10,20 +10,24 @@ router = APIRouter()
 
 @router.get("/", response_model=List[schemas.template.ProjectTemplate])
 async def read_templates(
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: models.user.User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Retrieve templates.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
     if current_user.is_superuser:
-        templates = await crud.project_template.get_multi(db, skip=skip, limit=limit)
+        templates = await crud.project_template.get_multi(db, skip=skip, limit=limit, cursor=cursor)
     else:
         templates = await crud.project_template.get_multi_by_user(
-            db, user_id=current_user.id, skip=skip, limit=limit
+            db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor
         )
+    deps.set_next_cursor(response, crud.project_template, templates, limit)
     return templates
 
 @router.post("/", response_model=schemas.template.ProjectTemplate)
@@ -1,6 +1,6 @@
-from typing import Any, List
+from typing import Any, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
@@ -13,19 +13,25 @@ router = APIRouter()
 
 @router.get("/", response_model=List[Webhook])
 async def read_webhooks(
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Retrieve webhooks owned by the current user.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
     if current_user.is_superuser:
-        return await crud_webhook.webhook.get_multi(db, skip=skip, limit=limit)
-    return await crud_webhook.webhook.get_multi_by_owner(
-        db, owner_id=current_user.id, skip=skip, limit=limit
-    )
+        webhooks = await crud_webhook.webhook.get_multi(db, skip=skip, limit=limit, cursor=cursor)
+    else:
+        webhooks = await crud_webhook.webhook.get_multi_by_owner(
+            db, owner_id=current_user.id, skip=skip, limit=limit, cursor=cursor
+        )
+    deps.set_next_cursor(response, crud_webhook.webhook, webhooks, limit)
+    return webhooks
 
 @router.post("/", response_model=Webhook)
 async def create_webhook(
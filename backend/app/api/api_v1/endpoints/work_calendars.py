@@ -0,0 +1,142 @@
+from typing import Any, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.crud import crud_project
+from app.crud.crud_work_calendar import work_calendar
+from app.schemas.work_calendar import WorkCalendar, WorkCalendarUpdate
+from app.models.user import User
+
+router = APIRouter()
+
+async def _check_project(db: AsyncSession, project_id: UUID, current_user: User, write: bool):
+    project = await crud_project.project.get(db, id=project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if current_user.is_superuser or project.owner_id == current_user.id:
+        return
+    if write or current_user.id not in [m.id for m in project.members]:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+def _check_user(user_id: UUID, current_user: User):
+    if not current_user.is_superuser and user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+def _check_superuser(current_user: User):
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+async def _read(db: AsyncSession, **scope) -> Optional[dict]:
+    row = await work_calendar.get_scoped(db, **scope)
+    return work_calendar.as_dict(row) if row else None
+
+async def _write(db: AsyncSession, obj_in: WorkCalendarUpdate, **scope) -> dict:
+    return work_calendar.as_dict(await work_calendar.set_scoped(db, obj_in=obj_in, **scope))
+
+async def _remove(db: AsyncSession, **scope) -> dict:
+    if not await work_calendar.remove_scoped(db, **scope):
+        raise HTTPException(status_code=404, detail="Calendar not found")
+    return {"status": "success"}
+
+@router.get("/global", response_model=Optional[WorkCalendar])
+async def read_global_calendar(
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    The installation-wide working calendar (null: calendar days are used).
+    """
+    return await _read(db)
+
+@router.put("/global", response_model=WorkCalendar)
+async def set_global_calendar(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    obj_in: WorkCalendarUpdate,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Set the working weekdays and holidays used by projects and users without their own calendar.
+    """
+    _check_superuser(current_user)
+    return await _write(db, obj_in)
+
+@router.delete("/global")
+async def delete_global_calendar(
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    _check_superuser(current_user)
+    return await _remove(db)
+
+@router.get("/projects/{project_id}", response_model=Optional[WorkCalendar])
+async def read_project_calendar(
+    project_id: UUID,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    The project's own calendar (null: the global calendar applies).
+    """
+    await _check_project(db, project_id, current_user, write=False)
+    return await _read(db, project_id=project_id)
+
+@router.put("/projects/{project_id}", response_model=WorkCalendar)
+async def set_project_calendar(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    project_id: UUID,
+    obj_in: WorkCalendarUpdate,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Working calendar for CPM and duration sync in this project.
+    """
+    await _check_project(db, project_id, current_user, write=True)
+    return await _write(db, obj_in, project_id=project_id)
+
+@router.delete("/projects/{project_id}")
+async def delete_project_calendar(
+    project_id: UUID,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    await _check_project(db, project_id, current_user, write=True)
+    return await _remove(db, project_id=project_id)
+
+@router.get("/users/{user_id}", response_model=Optional[WorkCalendar])
+async def read_user_calendar(
+    user_id: UUID,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    The user's own calendar (null: the global calendar applies).
+    """
+    _check_user(user_id, current_user)
+    return await _read(db, user_id=user_id)
+
+@router.put("/users/{user_id}", response_model=WorkCalendar)
+async def set_user_calendar(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    user_id: UUID,
+    obj_in: WorkCalendarUpdate,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Working days of one person, used to spread their workload.
+    """
+    _check_user(user_id, current_user)
+    return await _write(db, obj_in, user_id=user_id)
+
+@router.delete("/users/{user_id}")
+async def delete_user_calendar(
+    user_id: UUID,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    _check_user(user_id, current_user)
+    return await _remove(db, user_id=user_id)
@@ -1,5 +1,5 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from typing import Any, Generator, List, Optional
+from fastapi import Depends, HTTPException, Query, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
@@ -7,10 +7,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import security
 from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.token import TokenPayload
-from app.crud import crud_user
+from app.crud import crud_user, crud_task
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"/api/v1/login/access-token"
@@ -64,3 +65,25 @@ async def get_current_admin(
             status_code=400, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+def get_task_fields(
+    view: str = Query("full", pattern="^(compact|full)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated task fields; overrides view"),
+) -> Optional[List[str]]:
+    """
+    Sparse fieldsets for task list endpoints. None means the full nested
+    Task representation.
+    """
+    try:
+        return crud_task.task.projection_fields(view, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def set_next_cursor(response: Response, crud: Any, items: List[Any], limit: int) -> None:
+    """
+    Expose the cursor of the next page in the X-Next-Cursor header
+    (absent on the last page). Pass it back as `cursor` to continue.
+    """
+    cursor = crud.next_cursor(items, limit)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
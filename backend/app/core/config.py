@@ -8,6 +8,22 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     UPLOAD_DIR: str = "uploads"
 
+    # Derived project results (WBS/CPM): projects kept per worker / in the shared table
+    RESULT_CACHE_SIZE: int = 256
+    RESULT_CACHE_SHARED_SIZE: int = 5000
+    # Projects whose dependency graph is kept per worker for cycle checks
+    DEPENDENCY_GRAPH_CACHE_SIZE: int = 512
+    # Dashboard summaries kept per worker, and for how many seconds
+    DASHBOARD_SUMMARY_CACHE_SIZE: int = 1000
+    DASHBOARD_SUMMARY_TTL: float = 30.0
+    # Portfolio health results kept per worker (keyed by the projects'
+    # revisions), and for how many seconds: overdue counts move with the clock
+    PORTFOLIO_HEALTH_CACHE_SIZE: int = 64
+    PORTFOLIO_HEALTH_TTL: float = 300.0
+    # Most task x iteration cells one schedule simulation may run (about a
+    # second of CPU); larger projects get proportionally fewer iterations
+    SIMULATION_CELL_BUDGET: int = 20_000_000
+
     # SMTP Configuration
     SMTP_HOST: str = "localhost"
     SMTP_PORT: int = 1025
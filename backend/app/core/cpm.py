@@ -1,187 +1,442 @@
+"""
+Critical Path Method over compact integer arrays.
+
+Tasks are indexed 0..n-1 and dependencies become parallel (pred, succ, type,
+lag) arrays. Every dependency type reduces to a weighted edge:
+
+    forward:  ES[succ] >= ES[pred] + w_fwd
+    backward: LF[pred] <= LF[succ] - w_bwd
+
+so one iterative Kahn pass yields the topological order together with ES,
+and one reverse sweep over that order yields LF. Nothing recurses, so chain
+length is unbounded. Tasks that sit on (or behind) a dependency cycle never
+reach in-degree zero; they are reported instead of being given made-up dates.
+
+Times are int64 microsecond offsets from the earliest start, so slack keeps
+the exact semantics of the former datetime arithmetic (timedelta.days).
+With a working calendar (app.core.working_calendar) the same passes run on
+working time, so durations, lags and slack count working days.
+"""
+
 import logging
-from typing import List, Dict, Optional, Set
 from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from uuid import UUID
+
+import numpy as np
+
 from app.schemas.task import Task
 from app.core.enums import DependencyType
+from app.core.working_calendar import WorkingCalendar
 
 logger = logging.getLogger(__name__)
 
-def calculate_cpm(tasks: List[Task]):
+DAY = 86_400_000_000  # microseconds
+NO_DEADLINE = int(np.iinfo(np.int64).max)
+EPOCH = datetime(1970, 1, 1)
+
+FS, SS, FF, SF = 0, 1, 2, 3
+DEPENDENCY_CODES = {
+    DependencyType.FS: FS,
+    DependencyType.SS: SS,
+    DependencyType.FF: FF,
+    DependencyType.SF: SF,
+}
+
+class Schedule(NamedTuple):
+    es: np.ndarray
+    ef: np.ndarray
+    ls: np.ndarray
+    lf: np.ndarray
+    # resolved[i] is False for tasks on or behind a dependency cycle (their
+    # times are meaningless); cycle marks the ones on a cycle
+    resolved: np.ndarray
+    cycle: np.ndarray
+    finish: int
+
+class CPMResult(NamedTuple):
+    ids: List[UUID]
+    schedule: Schedule
+    slack_days: np.ndarray
+    critical: np.ndarray
+    cycle_ids: List[UUID]
+
+def to_micros(dt: datetime, origin: datetime = EPOCH) -> int:
+    delta = dt - origin
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+def from_micros(value: int, origin: datetime = EPOCH) -> datetime:
+    return origin + timedelta(microseconds=value)
+
+def task_duration(
+    start_date: Optional[datetime], due_date: Optional[datetime], completed_at: Optional[datetime],
+    calendar: Optional[WorkingCalendar] = None,
+) -> int:
+    """Remaining duration used for pathing, in microseconds (of working time with a calendar)."""
+    if completed_at:
+        return 0  # Completed tasks have no remaining duration for pathing
+    if due_date and start_date:
+        # Nominal duration. If same day, count as 1 day to represent effort/span
+        if calendar:
+            return max(1, calendar.between(start_date.date(), due_date.date())) * DAY
+        return max(1, (due_date - start_date).days) * DAY
+    return DAY
+
+def slack_and_critical(sched: Schedule):
+    """Whole-day slack and the critical mask. Floor division keeps timedelta.days
+    semantics for negative slack."""
+    slack_days = (sched.ls - sched.es) // DAY
+    return slack_days, (slack_days <= 0) & sched.resolved
+
+def _csr(pred: np.ndarray, n: int):
+    """Edge permutation grouped by pred, and per-node offsets into it."""
+    perm = np.argsort(pred, kind="stable")
+    ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pred, minlength=n), out=ptr[1:])
+    return perm, ptr
+
+def _edge_weights(durations, pred, succ, dep_type, lag):
+    # FS/FF start from the predecessor's finish, FF/SF constrain the successor's finish
+    w_fwd = (
+        lag
+        + np.where((dep_type == FS) | (dep_type == FF), durations[pred], 0)
+        - np.where((dep_type == FF) | (dep_type == SF), durations[succ], 0)
+    )
+    # FS/SS bound the successor's start, SS/SF bound the predecessor's start
+    w_bwd = (
+        lag
+        + np.where((dep_type == FS) | (dep_type == SS), durations[succ], 0)
+        - np.where((dep_type == SS) | (dep_type == SF), durations[pred], 0)
+    )
+    return w_fwd, w_bwd
+
+def _as_arrays(durations, pred, succ, dep_type, lag):
+    return (
+        np.asarray(durations, dtype=np.int64),
+        np.asarray(pred, dtype=np.int64),
+        np.asarray(succ, dtype=np.int64),
+        np.asarray(dep_type, dtype=np.int8),
+        np.asarray(lag, dtype=np.int64),
+    )
+
+def schedule(
+    durations: np.ndarray,
+    earliest: np.ndarray,
+    deadlines: np.ndarray,
+    pred: np.ndarray,
+    succ: np.ndarray,
+    dep_type: np.ndarray,
+    lag: np.ndarray,
+    finish_floor: Optional[int] = None,
+) -> Schedule:
     """
-    Calculates Critical Path and Slack for a set of tasks using a full Two-Pass method (Forward and Backward).
-    Handles FS, SS, FF, and SF dependencies with lag days.
+    Two-pass CPM. durations/earliest/deadlines are per task (deadline
+    NO_DEADLINE when absent), pred/succ/dep_type/lag per dependency, all in
+    the same integer time unit. The project finish is the latest EF, raised to
+    finish_floor if given; LF starts there (or at the task deadline if earlier).
     """
-    if not tasks:
-        return tasks
-
-    # 1. Prepare Data: Flatten all tasks for global path analysis
-    all_tasks: Dict[UUID, Task] = {}
-    
-    def flatten(t_list: List[Task]):
-        for t in t_list:
-            all_tasks[t.id] = t
-            if t.subtasks:
-                flatten(t.subtasks)
-    
-    flatten(tasks)
-    
-    if not all_tasks:
-        return tasks
-
-    # Calculate durations (in days)
-    durations: Dict[UUID, int] = {}
-    for tid, t in all_tasks.items():
-        if t.completed_at:
-            durations[tid] = 0 # Completed tasks have no remaining duration for pathing
-        elif t.due_date and t.start_date:
-            # Nominal duration. If same day, count as 1 day to represent effort/span
-            durations[tid] = max(1, (t.due_date - t.start_date).days)
-        else:
-            durations[tid] = 1 # Default nominal duration
-
-    # 2. Forward Pass: Calculate Earliest Start (ES) and Earliest Finish (EF)
-    es: Dict[UUID, datetime] = {}
-    ef: Dict[UUID, datetime] = {}
-    
-    # Project start baseline
-    project_start = min(
-        (t.start_date for t in all_tasks.values() if t.start_date), 
-        default=datetime.utcnow()
+    n = len(durations)
+    durations, pred, succ, dep_type, lag = _as_arrays(durations, pred, succ, dep_type, lag)
+    w_fwd, w_bwd = _edge_weights(durations, pred, succ, dep_type, lag)
+
+    perm, ptr = _csr(pred, n)
+    out_succ = succ[perm].tolist()
+    out_fwd = w_fwd[perm].tolist()
+    out_bwd = w_bwd[perm].tolist()
+    ptr = ptr.tolist()
+
+    # Forward pass fused with Kahn: a task is final once all its predecessors are
+    indegree = np.bincount(succ, minlength=n).tolist()
+    es = np.asarray(earliest, dtype=np.int64).tolist()
+    order = [i for i in range(n) if indegree[i] == 0]
+    head = 0
+    while head < len(order):
+        u = order[head]
+        head += 1
+        es_u = es[u]
+        for k in range(ptr[u], ptr[u + 1]):
+            v = out_succ[k]
+            candidate = es_u + out_fwd[k]
+            if candidate > es[v]:
+                es[v] = candidate
+            indegree[v] -= 1
+            if indegree[v] == 0:
+                order.append(v)
+
+    resolved = np.zeros(n, dtype=bool)
+    resolved[order] = True
+    es_arr = np.asarray(es, dtype=np.int64)
+    ef_arr = es_arr + durations
+
+    finish = int(ef_arr[resolved].max()) if order else 0
+    if finish_floor is not None:
+        finish = max(finish, finish_floor)
+
+    # Backward pass in reverse topological order; unresolved successors impose nothing
+    lf = np.minimum(np.asarray(deadlines, dtype=np.int64), finish).tolist()
+    resolved_list = resolved.tolist()
+    for u in reversed(order):
+        best = lf[u]
+        for k in range(ptr[u], ptr[u + 1]):
+            v = out_succ[k]
+            if resolved_list[v]:
+                candidate = lf[v] - out_bwd[k]
+                if candidate < best:
+                    best = candidate
+        lf[u] = best
+    lf_arr = np.asarray(lf, dtype=np.int64)
+
+    return Schedule(
+        es=es_arr,
+        ef=ef_arr,
+        ls=lf_arr - durations,
+        lf=lf_arr,
+        resolved=resolved,
+        cycle=_cycle_members(resolved, pred, succ),
+        finish=finish,
     )
 
-    successors_of: Dict[UUID, List] = {tid: [] for tid in all_tasks}
-    memo_ef: Dict[UUID, datetime] = {}
-    solving_forward: Set[UUID] = set()
-
-    def resolve_forward(tid: UUID) -> datetime:
-        if tid in memo_ef:
-            return memo_ef[tid]
-        
-        if tid in solving_forward:
-            # Cycle safety
-            return project_start + timedelta(days=durations.get(tid, 1))
-        
-        solving_forward.add(tid)
-        task = all_tasks[tid]
-        
-        # ES starts as planned start or project start
-        current_es = task.start_date or project_start
-        
-        # Predecessor constraints
-        if task.blocked_by:
-            for dep in task.blocked_by:
-                pred_id = dep.predecessor_id
-                if pred_id not in all_tasks:
-                    continue
-                
-                # Register for backward pass
-                successors_of[pred_id].append((tid, dep))
-                
-                # Recursive call
-                p_ef = resolve_forward(pred_id)
-                p_es = es.get(pred_id, project_start)
-                lag = timedelta(days=dep.lag_days or 0)
-                
-                # Calculate constraint on ES
-                if dep.type == DependencyType.FS or not dep.type:
-                    current_es = max(current_es, p_ef + lag)
-                elif dep.type == DependencyType.SS:
-                    current_es = max(current_es, p_es + lag)
-                elif dep.type == DependencyType.FF:
-                    # EF_succ = EF_pred + lag => ES_succ = EF_pred + lag - duration
-                    target_ef = p_ef + lag
-                    current_es = max(current_es, target_ef - timedelta(days=durations[tid]))
-                elif dep.type == DependencyType.SF:
-                    # EF_succ = ES_pred + lag => ES_succ = ES_pred + lag - duration
-                    target_ef = p_es + lag
-                    current_es = max(current_es, target_ef - timedelta(days=durations[tid]))
-
-        es[tid] = current_es
-        current_ef = current_es + timedelta(days=durations[tid])
-        ef[tid] = current_ef
-        memo_ef[tid] = current_ef
-        
-        solving_forward.remove(tid)
-        return current_ef
-
-    for tid in all_tasks:
-        resolve_forward(tid)
-
-    # 3. Backward Pass: Calculate Latest Finish (LF) and Latest Start (LS)
-    ls: Dict[UUID, datetime] = {}
-    lf: Dict[UUID, datetime] = {}
-    
-    # Project end anchor
-    project_finish = max(ef.values(), default=datetime.utcnow())
+def _reach(seeds: np.ndarray, ptr: List[int], targets: List[int], n: int) -> np.ndarray:
+    """Mask of everything reachable from seeds (inclusive) along a CSR adjacency."""
+    mask = np.zeros(n, dtype=bool)
+    mask[seeds] = True
+    stack = np.flatnonzero(mask).tolist()
+    while stack:
+        u = stack.pop()
+        for k in range(ptr[u], ptr[u + 1]):
+            v = targets[k]
+            if not mask[v]:
+                mask[v] = True
+                stack.append(v)
+    return mask
+
+def reschedule(
+    durations: np.ndarray,
+    earliest: np.ndarray,
+    deadlines: np.ndarray,
+    pred: np.ndarray,
+    succ: np.ndarray,
+    dep_type: np.ndarray,
+    lag: np.ndarray,
+    es: np.ndarray,
+    lf: np.ndarray,
+    finish: int,
+    changed: np.ndarray,
+    finish_floor: Optional[int] = None,
+) -> Tuple[Schedule, np.ndarray]:
+    """
+    Incremental schedule(). es/lf/finish are the previous (fully resolved)
+    solution; `changed` lists the tasks whose duration, earliest start or
+    deadline changed, new tasks, and both ends of every added or removed
+    dependency.
+
+    ES is re-run only over the downstream cone of `changed`, LF only over the
+    upstream cone of `changed` and their direct predecessors. When the
+    project finish moves (every LF shifts) or a cycle shows up, this falls
+    back to a full schedule(). Returns the schedule and the mask of tasks
+    whose times were recomputed.
+    """
+    n = len(durations)
+    durations, pred, succ, dep_type, lag = _as_arrays(durations, pred, succ, dep_type, lag)
+    w_fwd, w_bwd = _edge_weights(durations, pred, succ, dep_type, lag)
+    changed = np.asarray(changed, dtype=np.int64)
+
+    def full():
+        result = schedule(durations, earliest, deadlines, pred, succ, dep_type, lag, finish_floor)
+        return result, np.ones(n, dtype=bool)
+
+    out_perm, out_ptr = _csr(pred, n)
+    out_succ = succ[out_perm].tolist()
+    out_bwd = w_bwd[out_perm].tolist()
+    out_ptr = out_ptr.tolist()
+    in_perm, in_ptr = _csr(succ, n)
+    in_pred = pred[in_perm].tolist()
+    in_fwd = w_fwd[in_perm].tolist()
+    in_ptr = in_ptr.tolist()
+
+    # Forward: Kahn over the downstream cone, reading final ES of outside predecessors
+    cone = _reach(changed, out_ptr, out_succ, n)
+    inside = cone[pred] & cone[succ]
+    indegree = np.bincount(succ[inside], minlength=n).tolist()
+    es = np.asarray(es, dtype=np.int64).tolist()
+    earliest = np.asarray(earliest, dtype=np.int64).tolist()
+    order = [v for v in np.flatnonzero(cone).tolist() if indegree[v] == 0]
+    head = 0
+    cone_list = cone.tolist()
+    while head < len(order):
+        v = order[head]
+        head += 1
+        best = earliest[v]
+        for k in range(in_ptr[v], in_ptr[v + 1]):
+            candidate = es[in_pred[k]] + in_fwd[k]
+            if candidate > best:
+                best = candidate
+        es[v] = best
+        for k in range(out_ptr[v], out_ptr[v + 1]):
+            w = out_succ[k]
+            if cone_list[w]:
+                indegree[w] -= 1
+                if indegree[w] == 0:
+                    order.append(w)
+    if len(order) < int(cone.sum()):
+        return full()
+
+    es_arr = np.asarray(es, dtype=np.int64)
+    ef_arr = es_arr + durations
+    new_finish = int(ef_arr.max()) if n else 0
+    if finish_floor is not None:
+        new_finish = max(new_finish, finish_floor)
+    if new_finish != finish:
+        return full()
+
+    # Backward: reverse Kahn over the upstream cone (LF of a predecessor also
+    # depends on the duration of its changed successor)
+    seeds = np.zeros(n, dtype=bool)
+    seeds[changed] = True
+    seeds[pred[seeds[succ]]] = True
+    upstream = _reach(np.flatnonzero(seeds), in_ptr, in_pred, n)
+    inside = upstream[pred] & upstream[succ]
+    outdegree = np.bincount(pred[inside], minlength=n).tolist()
+    lf = np.asarray(lf, dtype=np.int64).tolist()
+    deadlines = np.asarray(deadlines, dtype=np.int64).tolist()
+    upstream_list = upstream.tolist()
+    stack = [u for u in np.flatnonzero(upstream).tolist() if outdegree[u] == 0]
+    while stack:
+        u = stack.pop()
+        best = min(deadlines[u], new_finish)
+        for k in range(out_ptr[u], out_ptr[u + 1]):
+            candidate = lf[out_succ[k]] - out_bwd[k]
+            if candidate < best:
+                best = candidate
+        lf[u] = best
+        for k in range(in_ptr[u], in_ptr[u + 1]):
+            p = in_pred[k]
+            if upstream_list[p]:
+                outdegree[p] -= 1
+                if outdegree[p] == 0:
+                    stack.append(p)
+
+    lf_arr = np.asarray(lf, dtype=np.int64)
+    result = Schedule(
+        es=es_arr,
+        ef=ef_arr,
+        ls=lf_arr - durations,
+        lf=lf_arr,
+        resolved=np.ones(n, dtype=bool),
+        cycle=np.zeros(n, dtype=bool),
+        finish=new_finish,
+    )
+    return result, cone | upstream
+
+def _cycle_members(resolved: np.ndarray, pred: np.ndarray, succ: np.ndarray) -> np.ndarray:
+    """
+    Among the unresolved tasks, drop the ones merely downstream of a cycle
+    (repeatedly peel tasks with no unresolved successor); what remains lies on
+    a cycle or between cycles.
+    """
+    members = ~resolved
+    if not members.any():
+        return members
+    inside = members[pred] & members[succ]
+    pred, succ = pred[inside], succ[inside]
+    outdegree = np.bincount(pred, minlength=len(resolved))
+    stack = np.flatnonzero(members & (outdegree == 0)).tolist()
+    perm, ptr = _csr(succ, len(resolved))
+    in_pred = pred[perm].tolist()
+    ptr = ptr.tolist()
+    outdegree = outdegree.tolist()
+    while stack:
+        v = stack.pop()
+        members[v] = False
+        for k in range(ptr[v], ptr[v + 1]):
+            u = in_pred[k]
+            outdegree[u] -= 1
+            if outdegree[u] == 0:
+                stack.append(u)
+    return members
+
+def analyze_cpm(tasks: List[Task], calendar: Optional[WorkingCalendar] = None) -> CPMResult:
+    """
+    Run CPM over the task trees (all levels) and write slack_days/is_critical
+    back onto the schemas. Tasks on or behind a dependency cycle get
+    slack_days=None and is_critical=False, and are listed in cycle_ids.
+    """
+    all_tasks: List[Task] = []
+    stack = list(reversed(tasks))
+    while stack:
+        t = stack.pop()
+        all_tasks.append(t)
+        stack.extend(reversed(t.subtasks or []))
+
+    ids = [t.id for t in all_tasks]
+    index = {task_id: i for i, task_id in enumerate(ids)}
+
+    origin = min((t.start_date for t in all_tasks if t.start_date), default=datetime.utcnow())
+
+    def offset(dt: datetime) -> int:
+        if calendar:
+            return calendar.to_time(dt) - calendar.to_time(origin)
+        return to_micros(dt, origin)
+
+    # Plain lists while walking the schemas; converted to arrays once
+    durations, earliest, deadlines = [], [], []
+    pred, succ, dep_type, lag = [], [], [], []
+    for i, t in enumerate(all_tasks):
+        durations.append(task_duration(t.start_date, t.due_date, t.completed_at, calendar))
+        earliest.append(offset(t.start_date) if t.start_date else 0)
+        deadlines.append(offset(t.deadline_at) if t.deadline_at else NO_DEADLINE)
+        for dep in t.blocked_by or []:
+            p = index.get(dep.predecessor_id)
+            if p is None:
+                continue
+            pred.append(p)
+            succ.append(i)
+            dep_type.append(DEPENDENCY_CODES.get(dep.type, FS))
+            lag.append(dep.lag_days * DAY if dep.lag_days else 0)
+
     # Use project deadline if available
-    first_task = next(iter(all_tasks.values()))
-    if first_task.project and first_task.project.due_date:
-        project_finish = max(project_finish, first_task.project.due_date)
-
-    memo_ls: Dict[UUID, datetime] = {}
-    solving_backward: Set[UUID] = set()
-
-    def resolve_backward(tid: UUID) -> datetime:
-        if tid in memo_ls:
-            return memo_ls[tid]
-            
-        if tid in solving_backward:
-            return project_finish - timedelta(days=durations.get(tid, 1))
-
-        solving_backward.add(tid)
-        task = all_tasks[tid]
-        
-        # LF starts at project end or hard deadline
-        current_lf = project_finish
-        if task.deadline_at:
-            current_lf = min(current_lf, task.deadline_at)
-            
-        # Successor constraints
-        deps_as_pred = successors_of.get(tid, [])
-        if deps_as_pred:
-            constraints = []
-            for s_id, dep in deps_as_pred:
-                s_ls = resolve_backward(s_id)
-                s_lf = lf.get(s_id, project_finish)
-                lag = timedelta(days=dep.lag_days or 0)
-                
-                if dep.type == DependencyType.FS or not dep.type:
-                    constraints.append(s_ls - lag)
-                elif dep.type == DependencyType.SS:
-                    # LS_pred = LS_succ - lag => LF_pred = LS_succ - lag + duration
-                    constraints.append(s_ls - lag + timedelta(days=durations[tid]))
-                elif dep.type == DependencyType.FF:
-                    constraints.append(s_lf - lag)
-                elif dep.type == DependencyType.SF:
-                    # LS_pred = LF_succ - lag => LF_pred = LF_succ - lag + duration
-                    constraints.append(s_lf - lag + timedelta(days=durations[tid]))
-            
-            if constraints:
-                current_lf = min(current_lf, *constraints)
-
-        lf[tid] = current_lf
-        current_ls = current_lf - timedelta(days=durations[tid])
-        ls[tid] = current_ls
-        memo_ls[tid] = current_ls
-        
-        solving_backward.remove(tid)
-        return current_ls
-
-    for tid in all_tasks:
-        resolve_backward(tid)
-
-    # 4. Results: Calculate Slack/Float and Mark Critical Path
-    for tid, task in all_tasks.items():
-        # Slack = LS - ES
-        float_delta = ls[tid] - es[tid]
-        task.slack_days = float_delta.days
-        
-        # A task is critical if it has zero or negative slack
-        task.is_critical = (task.slack_days <= 0)
-        
-        # Optional: update schema with calculated EF if needed, 
-        # but usually we leave planned dates untouched.
-        # task.calculated_ef = ef[tid]
+    finish_floor = None
+    if all_tasks and all_tasks[0].project and all_tasks[0].project.due_date:
+        finish_floor = offset(all_tasks[0].project.due_date)
+
+    sched = schedule(
+        np.asarray(durations, dtype=np.int64), np.asarray(earliest, dtype=np.int64),
+        np.asarray(deadlines, dtype=np.int64),
+        np.asarray(pred, dtype=np.int64), np.asarray(succ, dtype=np.int64),
+        np.asarray(dep_type, dtype=np.int8), np.asarray(lag, dtype=np.int64),
+        finish_floor=finish_floor,
+    )
+    slack_days, critical = slack_and_critical(sched)
+
+    for t, slack, is_critical, ok in zip(all_tasks, slack_days.tolist(), critical.tolist(), sched.resolved.tolist()):
+        t.slack_days = slack if ok else None
+        t.is_critical = is_critical
 
+    cycle_ids = [ids[i] for i in np.flatnonzero(sched.cycle)]
+    if not sched.resolved.all():
+        logger.warning(
+            "CPM skipped %d tasks on or behind a dependency cycle (cycle members: %s)",
+            int((~sched.resolved).sum()), ", ".join(str(i) for i in cycle_ids)
+        )
+    return CPMResult(ids=ids, schedule=sched, slack_days=slack_days, critical=critical, cycle_ids=cycle_ids)
+
+def calculate_cpm(tasks: List[Task], calendar: Optional[WorkingCalendar] = None):
+    """
+    Calculates Critical Path and Slack for a set of tasks using a full Two-Pass method (Forward and Backward).
+    Handles FS, SS, FF, and SF dependencies with lag days.
+    """
+    if tasks:
+        analyze_cpm(tasks, calendar)
+    return tasks
+
+def apply_schedule(tasks: List[Task], results: Dict[UUID, tuple]) -> List[Task]:
+    """
+    Annotate task trees with stored CPM results ({task_id: (slack_days,
+    is_critical)}, see CRUDTask.get_schedule) instead of recomputing them.
+    """
+    stack = list(tasks)
+    while stack:
+        t = stack.pop()
+        t.slack_days, t.is_critical = results.get(t.id, (None, False))
+        stack.extend(t.subtasks or [])
     return tasks
@@ -42,27 +42,26 @@ def find_cycle(
     """
     A more generic cycle detection that returns the path if a cycle is found.
      neighbors_func: lambda uuid: List[UUID] (returns predecessors/blockers)
+    Iterative depth-first search, so arbitrarily long chains do not hit the
+    recursion limit; the current path is indexed for O(1) membership tests.
     """
-    visited = set()
-    path = []
-
-    def visit(u: UUID):
-        if u in path:
-            # Cycle found! Return the slice from first occurrence to end
-            return path[path.index(u):] + [u]
-        
-        if u in visited:
-            return None
-            
-        visited.add(u)
-        path.append(u)
-        
-        for v in neighbors_func(u):
-            res = visit(v)
-            if res:
-                return res
-                
-        path.pop()
-        return None
+    visited = {start_node}
+    path = [start_node]
+    position = {start_node: 0}
+    stack = [iter(neighbors_func(start_node))]
 
-    return visit(start_node)
+    while stack:
+        for v in stack[-1]:
+            if v in position:
+                # Cycle found! Return the slice from first occurrence to end
+                return path[position[v]:] + [v]
+            if v not in visited:
+                visited.add(v)
+                position[v] = len(path)
+                path.append(v)
+                stack.append(iter(neighbors_func(v)))
+                break
+        else:
+            stack.pop()
+            del position[path.pop()]
+    return None
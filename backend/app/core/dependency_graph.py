@@ -0,0 +1,108 @@
+"""
+In-process cache of the dependency graph, one entry per project.
+
+An entry holds the project's tasks and the outgoing links of each of them
+(successor plus the successor's project), stamped with the project revision
+it was loaded at. Every dependency write bumps the revision of the projects
+on both ends, and moving a task bumps its old and new project, so an entry
+whose revision still matches the database is exact. A cycle check walks
+successors from the new link's successor, entry by entry, and so only ever
+touches the projects downstream of it: the component the link would join.
+
+Writes made by this worker are applied to the cached entries after commit
+(apply_link) when the new revision shows no other write came in between,
+which keeps a project that is being edited warm. Anything else just drops
+or outdates the entry, and the caller falls back to SQL.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.result_cache import LRUCache
+
+class ProjectGraph:
+    __slots__ = ("revision", "tasks", "successors")
+
+    def __init__(self, revision: int, tasks: Set[UUID], successors: Dict[UUID, List[Tuple[UUID, Optional[UUID]]]]):
+        self.revision = revision
+        self.tasks = tasks
+        # {predecessor_id: [(successor_id, successor's project_id)]}, predecessors in this project
+        self.successors = successors
+
+    @classmethod
+    def from_rows(cls, revision: int, rows: Iterable[Tuple[UUID, Optional[UUID], Optional[UUID]]]) -> "ProjectGraph":
+        """rows: (task_id, successor_id or None, successor's project_id), as loaded by
+        CRUDDependency._load_graph (tasks without successors come with None)."""
+        tasks: Set[UUID] = set()
+        successors: Dict[UUID, List[Tuple[UUID, Optional[UUID]]]] = {}
+        for task_id, successor_id, successor_project in rows:
+            tasks.add(task_id)
+            if successor_id is not None:
+                successors.setdefault(task_id, []).append((successor_id, successor_project))
+        return cls(revision, tasks, successors)
+
+class DependencyGraphCache:
+    def __init__(self, maxsize: int):
+        self._graphs = LRUCache(maxsize)
+
+    def get(self, project_id: UUID, revision: int) -> Optional[ProjectGraph]:
+        graph = self._graphs.get(project_id)
+        return graph if graph is not None and graph.revision == revision else None
+
+    def put(self, project_id: UUID, graph: ProjectGraph):
+        self._graphs.put(project_id, graph)
+
+    def apply_link(
+        self, predecessor_id: UUID, successor_id: UUID, successor_project: Optional[UUID],
+        predecessor_project: Optional[UUID], revisions: Dict[UUID, int], added: bool,
+    ):
+        """
+        Bring entries up to date after a committed link insert/delete.
+        revisions: the projects' revisions read after the commit. An entry one
+        revision behind saw exactly the state before this write; anything
+        else means a concurrent write and the entry is dropped.
+        """
+        for project_id, revision in revisions.items():
+            graph = self._graphs.get(project_id)
+            if graph is None:
+                continue
+            if graph.revision != revision - 1:
+                self._graphs.pop(project_id)
+                continue
+            if project_id == predecessor_project:
+                links = graph.successors.setdefault(predecessor_id, [])
+                if added:
+                    links.append((successor_id, successor_project))
+                elif (successor_id, successor_project) in links:
+                    links.remove((successor_id, successor_project))
+            graph.revision = revision
+
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+def reaches(graph: ProjectGraph, project_id: UUID, sources: Iterable[UUID], target: UUID, visited: Set[UUID]):
+    """
+    Breadth-first walk along successors inside one project's entry.
+    Returns (found, {other_project_id: [task_id]}) with the tasks reached in
+    other projects, for the caller to continue in their entries. visited is
+    shared across entries so every task is expanded once.
+    """
+    queue = deque(sources)
+    crossings: Dict[Optional[UUID], List[UUID]] = {}
+    while queue:
+        node = queue.popleft()
+        for successor_id, successor_project in graph.successors.get(node, ()):
+            if successor_id == target:
+                return True, crossings
+            if successor_id in visited:
+                continue
+            visited.add(successor_id)
+            if successor_project == project_id:
+                queue.append(successor_id)
+            else:
+                crossings.setdefault(successor_project, []).append(successor_id)
+    return False, crossings
+
+dependency_graphs = DependencyGraphCache(settings.DEPENDENCY_GRAPH_CACHE_SIZE)
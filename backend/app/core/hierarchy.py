@@ -0,0 +1,92 @@
+"""
+Materialized-path helpers for the task hierarchy.
+
+Every task stores `path`: the chain of its ancestors' segments plus its own,
+joined by PATH_SEPARATOR. A segment is the sibling sort key (see
+app.core.ordering), the created_at stamp as a tie-breaker, and the task id, e.g.
+
+    2LKcbC-00060c3f1a2b3c-<uuid hex>.2LKcb4V-00060c3f4d5e6f-<uuid hex>
+
+ID_SEPARATOR sorts below every key digit, so a key that is a prefix of a
+sibling's key still orders first, exactly as the bare keys compare.
+
+Ordering rows by `path` (with the "C" collation) therefore yields a depth-first
+walk of the tree in WBS order, a subtree is a single prefix range, and
+"is X below Y" is a string prefix test.
+"""
+
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+from uuid import UUID
+from datetime import datetime, timedelta
+
+PATH_SEPARATOR = "."
+ID_SEPARATOR = "-"
+
+EPOCH = datetime(1970, 1, 1)
+
+def sibling_key(sort_key: str, created_at: Optional[datetime]) -> str:
+    """
+    Key that orders siblings like (sort_key, created_at).
+    """
+    created = created_at or EPOCH
+    if created.tzinfo is not None:
+        created = created.replace(tzinfo=None)
+    micros = max(0, (created - EPOCH) // timedelta(microseconds=1))
+    return f"{sort_key}{ID_SEPARATOR}{micros:014x}"
+
+def path_segment(task_id: UUID, sort_key: str, created_at: Optional[datetime]) -> str:
+    return f"{sibling_key(sort_key, created_at)}{ID_SEPARATOR}{task_id.hex}"
+
+def build_path(parent_path: Optional[str], segment: str) -> str:
+    return f"{parent_path}{PATH_SEPARATOR}{segment}" if parent_path else segment
+
+def descendants_prefix(path: str) -> str:
+    """Prefix shared by every strict descendant of the task at `path`."""
+    return f"{path}{PATH_SEPARATOR}"
+
+def descendants_range(path: str) -> Tuple[str, str]:
+    """
+    Half-open [low, high) bounds of every strict descendant of `path`, for an
+    index range scan (`path >= low AND path < high`) instead of LIKE.
+    """
+    low = descendants_prefix(path)
+    high = path + chr(ord(PATH_SEPARATOR) + 1)
+    return low, high
+
+def is_descendant_path(path: Optional[str], ancestor_path: Optional[str]) -> bool:
+    """True if `path` lies strictly below `ancestor_path`."""
+    if not path or not ancestor_path:
+        return False
+    return path.startswith(descendants_prefix(ancestor_path))
+
+def parent_path_of(path: str) -> Optional[str]:
+    if PATH_SEPARATOR not in path:
+        return None
+    return path.rsplit(PATH_SEPARATOR, 1)[0]
+
+def ids_from_path(path: str) -> List[UUID]:
+    """Task ids along the path, root first, the task itself last."""
+    return [UUID(hex=seg.rsplit(ID_SEPARATOR, 1)[1]) for seg in path.split(PATH_SEPARATOR)]
+
+def wbs_codes_from_paths(rows: Iterable[Tuple[Hashable, str]]) -> Dict[Hashable, str]:
+    """
+    Assign WBS codes ("1", "1.2", "1.2.3") from (key, path) rows already in path order
+    (e.g. straight from `ORDER BY path`). No per-level sorting is needed: a parent
+    always precedes its children and siblings arrive in sibling-key order.
+    Tasks whose parent is not among the rows are numbered as top-level items.
+    """
+    codes: Dict[Hashable, str] = {}
+    code_by_path: Dict[str, str] = {}
+    child_counts: Dict[Optional[str], int] = {}
+
+    for key, path in rows:
+        parent = parent_path_of(path)
+        if parent not in code_by_path:
+            parent = None
+        child_counts[parent] = child_counts.get(parent, 0) + 1
+        index = child_counts[parent]
+        code = f"{code_by_path[parent]}.{index}" if parent else str(index)
+        code_by_path[path] = code
+        codes[key] = code
+
+    return codes
@@ -0,0 +1,145 @@
+"""
+Resource leveling over the dashboard workload model.
+
+A task puts EFFORT_HOURS of work on each assignee, spread evenly over its
+inclusive start..due span (see dashboard.get_team_workload), and nobody
+should go over `capacity` hours a day. Leveling only delays tasks, and only
+within their total float, so the project finish never moves.
+
+The heuristic is a serial schedule-generation scheme: tasks become eligible
+once all their predecessors are placed, and eligible tasks are placed in
+priority order (least slack first, then task priority, then original start).
+Each task goes to the first day in [earliest, start + slack] where every
+assignee has room for its whole span; a daily load matrix (users x days)
+makes that a couple of vectorized slices per task. Tasks that fit nowhere
+keep the least overloaded position and are reported.
+
+Days are integer offsets from the project origin. Dependencies use the CPM
+edge weights (app.core.cpm) in days; a delayed predecessor only pushes a
+successor by as much as it eats into the gap they originally had, so data
+that already violates a dependency is not "repaired" by leveling.
+"""
+
+import heapq
+from typing import NamedTuple
+
+import numpy as np
+
+from app.core.cpm import _as_arrays, _csr, _edge_weights
+
+EFFORT_HOURS = 8.0
+DEFAULT_CAPACITY = 8.0
+# Floating point tolerance when comparing summed daily effort to capacity
+CAPACITY_TOLERANCE = 1e-6
+
+class Leveling(NamedTuple):
+    # New start day of every task
+    start: np.ndarray
+    # Tasks that could not be placed within capacity (left overloaded)
+    overloaded: np.ndarray
+    # Final daily load, users x days
+    load: np.ndarray
+
+def daily_effort(span: np.ndarray) -> np.ndarray:
+    """Hours per day a task puts on each assignee."""
+    return EFFORT_HOURS / np.maximum(span, 1)
+
+def add_load(load: np.ndarray, start, span, user_ptr, user_idx):
+    """Add the effort of tasks (CSR assignee lists) to a users x days matrix in place."""
+    start = np.asarray(start, dtype=np.int64)
+    span = np.asarray(span, dtype=np.int64)
+    effort = daily_effort(span)
+    counts = np.diff(np.asarray(user_ptr, dtype=np.int64))
+    task = np.repeat(np.arange(len(start)), counts)
+    user = np.asarray(user_idx, dtype=np.int64)
+    # Difference array per user: +effort on the first day, -effort after the last
+    diff = np.zeros((load.shape[0], load.shape[1] + 1))
+    first = np.clip(start[task], 0, load.shape[1])
+    last = np.clip(start[task] + span[task], 0, load.shape[1])
+    np.add.at(diff, (user, first), effort[task])
+    np.add.at(diff, (user, last), -effort[task])
+    load += np.cumsum(diff, axis=1)[:, :-1]
+    return load
+
+def level(
+    start, span, slack, rank, user_ptr, user_idx, durations, pred, succ, dep_type, lag,
+    base_load: np.ndarray, capacity: float = DEFAULT_CAPACITY,
+) -> Leveling:
+    """
+    start/span: current start day and inclusive length in days.
+    slack: whole days a task may slip; negative means fixed in place.
+    rank: task priority, higher first among equal slack.
+    user_ptr/user_idx: assignee rows (indices into base_load) per task, CSR.
+    durations/lag: CPM durations and lags in days for the edge weights.
+    base_load: users x days load of work that is not being leveled.
+    """
+    start = np.asarray(start, dtype=np.int64)
+    span = np.maximum(np.asarray(span, dtype=np.int64), 1)
+    slack = np.asarray(slack, dtype=np.int64)
+    user_ptr = np.asarray(user_ptr, dtype=np.int64)
+    user_idx = np.asarray(user_idx, dtype=np.int64)
+    durations, pred, succ, dep_type, lag = _as_arrays(durations, pred, succ, dep_type, lag)
+    n = len(start)
+
+    horizon = int((start + np.maximum(slack, 0) + span).max()) if n else 0
+    load = np.zeros((base_load.shape[0], max(horizon, base_load.shape[1])))
+    load[:, :base_load.shape[1]] = base_load
+    limit = capacity + CAPACITY_TOLERANCE
+
+    w_fwd, _ = _edge_weights(durations, pred, succ, dep_type, lag)
+    # Where a successor already sits past the constraint, only the part of a
+    # delay that exceeds that gap reaches it
+    bound = np.maximum(start[succ], start[pred] + w_fwd)
+    perm, ptr = _csr(pred, n)
+    out_succ = succ[perm].tolist()
+    out_reach = (w_fwd - bound)[perm].tolist()
+    out_base = start[succ][perm].tolist()
+    ptr = ptr.tolist()
+    indeg = np.bincount(succ, minlength=n).tolist()
+
+    new_start = start.copy()
+    earliest = start.tolist()
+    latest = (start + np.maximum(slack, 0)).tolist()
+    effort = daily_effort(span).tolist()
+    spans = span.tolist()
+    ptr_u = user_ptr.tolist()
+    overloaded = np.zeros(n, dtype=bool)
+
+    heap = [(s, -r, b, i) for i, (s, r, b, d) in enumerate(zip(slack.tolist(), list(rank), start.tolist(), indeg)) if d == 0]
+    heapq.heapify(heap)
+    keys = list(zip(slack.tolist(), [-r for r in rank], start.tolist()))
+
+    while heap:
+        i = heapq.heappop(heap)[3]
+        lo, d, e = earliest[i], spans[i], effort[i]
+        hi = max(lo, latest[i])
+        if hi + d > load.shape[1]:
+            # Pushed past the horizon by predecessors that could not fit either
+            load = np.pad(load, ((0, 0), (0, hi + d - load.shape[1])))
+        users = user_idx[ptr_u[i]:ptr_u[i + 1]]
+        t = lo
+        if len(users):
+            if load[users, lo:lo + d].max() + e > limit:
+                # Busiest assignee per day over every candidate window
+                peak = load[users, lo:hi + d].max(axis=0)
+                full = np.concatenate(([0], np.cumsum(peak + e > limit)))
+                free = np.flatnonzero(full[d:] == full[:-d])
+                if len(free):
+                    t = lo + int(free[0])
+                else:
+                    windows = np.lib.stride_tricks.sliding_window_view(peak, d).max(axis=1)
+                    t = lo + int(windows.argmin())
+                    overloaded[i] = True
+            load[users, t:t + d] += e
+        new_start[i] = t
+
+        for k in range(ptr[i], ptr[i + 1]):
+            s = out_succ[k]
+            needed = out_base[k] + max(0, t + out_reach[k])
+            if needed > earliest[s]:
+                earliest[s] = needed
+            indeg[s] -= 1
+            if indeg[s] == 0:
+                heapq.heappush(heap, (*keys[s], s))
+
+    return Leveling(new_start, overloaded, load)
@@ -1,12 +1,11 @@
 from mcp.server.fastmcp import FastMCP
-from app.crud import crud_project, crud_task, crud_user, crud_whiteboard
+from app.crud import crud_project, crud_task, crud_user, crud_whiteboard, crud_dependency
 from app.db.session import AsyncSessionLocal
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.schemas.task import TaskCreate, TaskUpdate, DependencyCreate
 from app.schemas.project import ProjectCreate, ProjectUpdate
 from app.schemas.whiteboard import WhiteboardCreate
 from app.schemas.idea import IdeaCreate
 from app.core.enums import Status, Priority
-from app.core.cpm import calculate_cpm as run_cpm
 from uuid import UUID
 from datetime import datetime, timedelta
 from typing import List, Optional, Any
@@ -80,27 +79,31 @@ async def calculate_critical_path(project_id: str) -> str:
     async with AsyncSessionLocal() as db:
         try:
             pid = UUID(project_id)
-            tasks = await crud_task.task.get_multi_by_project(db, project_id=pid)
-            if not tasks:
+            # WBS codes and CPM flags, cached per project revision
+            results = await crud_task.task.get_project_results(db, project_id=pid)
+            if not results:
                 return f"No tasks found for project {project_id}"
-
-            # The calculate_cpm tool updates the task objects in-place (if schemas)
-            # or we use the logic from core.cpm
-            from app import schemas
-            schema_tasks = [schemas.Task.from_orm(t) for t in tasks]
-            run_cpm(schema_tasks)
+            t_res = await db.execute(
+                select(Task.id, Task.title, Task.start_date)
+                .filter(Task.project_id == pid, Task.is_archived == False)
+                .order_by(Task.path)
+            )
+            rows = [(*results.get(t_id, (None, None, False)), title, start) for t_id, title, start in t_res.all()]
 
             output = [f"CRITICAL PATH ANALYSIS: {project_id}", "=" * 40]
-            critical = [t for t in schema_tasks if t.is_critical]
-            non_critical = [t for t in schema_tasks if not t.is_critical]
+            skipped = sum(1 for _, slack, _, _, _ in rows if slack is None)
+            if skipped:
+                output.append(f"WARNING: {skipped} tasks on or behind a dependency cycle were skipped.")
+            critical = [r for r in rows if r[2]]
+            non_critical = [r for r in rows if not r[2]]
 
             output.append(f"CRITICAL TASKS ({len(critical)}):")
-            for t in sorted(critical, key=lambda x: x.wbs_code):
-                output.append(f"- [{t.wbs_code}] {t.title} (ES: {t.start_date.date() if t.start_date else 'N/A'})")
+            for code, _, _, title, start in critical:
+                output.append(f"- [{code}] {title} (ES: {start.date() if start else 'N/A'})")
 
             output.append(f"\nNON-CRITICAL TASKS ({len(non_critical)}):")
-            for t in sorted(non_critical, key=lambda x: x.slack_days, reverse=True):
-                output.append(f"- [{t.wbs_code}] {t.title} (Slack: {t.slack_days} days)")
+            for code, slack, _, title, _ in sorted(non_critical, key=lambda r: r[1] or 0, reverse=True):
+                output.append(f"- [{code}] {title} (Slack: {slack} days)")
 
             return "\n".join(output)
         except Exception as e:
@@ -111,22 +114,16 @@ async def get_portfolio_health() -> str:
     """Get health metrics for all active projects, identifying overdue tasks and risks."""
     async with AsyncSessionLocal() as db:
         try:
-            projects = await crud_project.project.get_multi(db, limit=1000)
-            projects = [p for p in projects if not p.is_archived]
-            if not projects: return "No active projects found."
-            
+            health = await crud_task.task.portfolio_health(db)
+            if not health["projects"]: return "No active projects found."
+
             output = [f"PORTFOLIO HEALTH REPORT ({datetime.utcnow().strftime('%Y-%m-%d')})", "=" * 40]
-            now = datetime.utcnow()
-            for p in projects:
-                tasks_stmt = select(Task).filter(Task.project_id == p.id, Task.is_archived == False)
-                tasks_res = await db.execute(tasks_stmt)
-                tasks = tasks_res.scalars().all()
-                overdue = sum(1 for t in tasks if t.due_date and t.due_date < now and t.status != Status.DONE)
-                score = 100.0 - (overdue * 5.0)
-                if p.status == "On hold": score -= 20
-                score = max(0.0, min(100.0, score))
-                risk = "High" if score < 50 or overdue > 5 else "Medium" if score < 80 or overdue > 2 else "Low"
-                output.append(f"- {p.name}: {score:.0f}/100 Health | Risk: {risk} | Overdue: {overdue} | Progress: {p.progress_percent:.1f}%")
+            for p in health["projects"]:
+                output.append(
+                    f"- {p['name']}: {p['health_score']:.0f}/100 Health | Risk: {p['risk_level']} | Overdue: {p['overdue_tasks']} | "
+                    f"Critical: {p['critical_path_tasks']} | Done: {p['done_ratio']:.0%} | Budget variance: {p['budget_variance']:+.2f} | "
+                    f"Progress: {p['progress']:.1f}%"
+                )
             return "\n".join(output)
         except Exception as e:
             return f"Error: {str(e)}"
@@ -216,14 +213,18 @@ async def get_project_details(project_id: str) -> str:
     async with AsyncSessionLocal() as db:
         project = await crud_project.project.get(db, id=UUID(project_id))
         if not project: return f"Project {project_id} not found."
-        tasks = await crud_task.task.get_multi_by_project(db, project_id=UUID(project_id))
-        def build_tree(task_list, parent_id=None, indent=0):
-            res = []
-            for t in [x for x in task_list if x.parent_id == parent_id]:
-                res.append(f"{'  ' * indent}- [{t.wbs_code}] {t.title} ({t.status})")
-                res.extend(build_tree(task_list, t.id, indent + 1))
-            return res
-        return f"Project: {project.name}\nStatus: {project.status} | Progress: {project.progress_percent:.1f}%\nWBS:\n" + "\n".join(build_tree(tasks))
+        # ORDER BY path is already a depth-first WBS walk
+        codes = await crud_task.task.get_wbs_codes(db, project_id=UUID(project_id))
+        t_res = await db.execute(
+            select(Task.id, Task.title, Task.status)
+            .filter(Task.project_id == UUID(project_id), Task.path != None)
+            .order_by(Task.path)
+        )
+        lines = []
+        for t_id, title, status in t_res.all():
+            code = codes.get(t_id, "")
+            lines.append(f"{'  ' * code.count('.')}- [{code}] {title} ({status})")
+        return f"Project: {project.name}\nStatus: {project.status} | Progress: {project.progress_percent:.1f}%\nWBS:\n" + "\n".join(lines)
 
 @mcp.resource("projects://list")
 async def list_projects() -> str:
@@ -264,6 +265,25 @@ async def update_task(task_id: str, **kwargs) -> str:
             return f"Task '{task_obj.title}' updated."
         except Exception as e: return f"Error: {str(e)}"
 
+@mcp.tool()
+async def add_dependencies(dependencies: List[dict]) -> str:
+    """Add many task dependencies at once. Each item: predecessor_id, successor_id, type (FS/SS/FF/SF, default FS), lag_days (default 0)."""
+    async with AsyncSessionLocal() as db:
+        try:
+            objs_in = [DependencyCreate(**d) for d in dependencies]
+            results = await crud_dependency.dependency.create_bulk(db, objs_in=objs_in)
+            created = sum(1 for r in results if r["status"] == "created")
+            output = [f"Dependencies created: {created}/{len(results)}"]
+            for r in results:
+                if r["status"] == "created":
+                    continue
+                line = f"- #{r['index']} {r['predecessor_id']} -> {r['successor_id']}: {r['status']} ({r['detail']})"
+                if r["cycle"]:
+                    line += " path: " + " -> ".join(str(t) for t in r["cycle"])
+                output.append(line)
+            return "\n".join(output)
+        except Exception as e: return f"Error: {str(e)}"
+
 # --- SEARCH ---
 
 @mcp.tool()
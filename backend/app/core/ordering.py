@@ -0,0 +1,71 @@
+"""
+Lexicographic (fractional) sort keys for sibling ordering.
+
+Keys are base62 strings compared byte-wise (column collation "C"). Between any
+two keys another key can always be generated, so moving a task between two
+siblings only rewrites the moved task, never its neighbours.
+
+Tasks that still carry an integer `sort_index` get an order-preserving
+fixed-width key from `index_key`; fractional keys generated around those
+simply grow longer.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+INDEX_KEY_WIDTH = 6  # 62**6 > 2**32
+INDEX_OFFSET = 2 ** 31
+
+# Appended tasks get a time-based sort_index (seconds since this epoch) instead of
+# max(sibling)+10, so no query is needed; it stays in int32 range until 2092
+APPEND_EPOCH = datetime(2024, 1, 1)
+
+def _encode(value: int, width: int) -> str:
+    chars = []
+    for _ in range(width):
+        value, rem = divmod(value, BASE)
+        chars.append(DIGITS[rem])
+    return "".join(reversed(chars))
+
+def index_key(sort_index: Optional[int]) -> str:
+    """Fixed-width key ordered like the (signed 32-bit) integer sort_index."""
+    return _encode((sort_index or 0) + INDEX_OFFSET, INDEX_KEY_WIDTH)
+
+def append_index(now: Optional[datetime] = None) -> int:
+    """Monotonic sort_index for a task appended at the end of its siblings."""
+    now = now or datetime.utcnow()
+    return int((now - APPEND_EPOCH).total_seconds())
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """
+    Shortest-ish key strictly between a and b (b=None means +infinity), reading
+    both as base62 fractions padded with zero digits.
+    """
+    digits = []
+    i = 0
+    while True:
+        digit_a = DIGITS.index(a[i]) if i < len(a) else 0
+        if b is None:
+            digit_b = BASE
+        else:
+            if i >= len(a) and i >= len(b):
+                raise ValueError(f"No key between {a!r} and {b!r}")
+            digit_b = DIGITS.index(b[i]) if i < len(b) else 0
+        if digit_b - digit_a > 1:
+            digits.append((digit_a + digit_b) // 2)
+            return "".join(DIGITS[d] for d in digits)
+        digits.append(digit_a)
+        if digit_b != digit_a:
+            # Already below b from here on; only a still bounds the rest
+            b = None
+        i += 1
+
+def key_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    A key that sorts after `before` and before `after` (either may be None).
+    """
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"Sort keys out of order: {before!r} >= {after!r}")
+    return _midpoint(before or "", after)
@@ -0,0 +1,75 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor is the url-safe base64 of the JSON list of the last row's keyset
+values (e.g. [created_at, id]). The next page is everything strictly after
+that tuple in keyset order, so deep pages cost the same as the first one and
+concurrent inserts do not shift rows between pages.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+from uuid import UUID
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class InvalidCursorError(ValueError):
+    pass
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+def _load(value: Any, python_type: type) -> Any:
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is UUID:
+        return UUID(value)
+    return python_type(value)
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([_dump(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, python_types: Sequence[type]) -> List[Any]:
+    """
+    Keyset values of a cursor, converted to python_types.
+    Raises InvalidCursorError for anything that was not produced by encode_cursor
+    for the same keyset.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(python_types):
+            raise ValueError("keyset length mismatch")
+        return [_load(v, t) for v, t in zip(values, python_types)]
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+class PagedRow(dict):
+    """
+    A flat row as returned to the client, carrying its keyset values on the
+    side when they are not part of the payload.
+    """
+
+    def __init__(self, values: dict, keyset_values: Sequence[Any]):
+        super().__init__(values)
+        self.keyset_values = list(keyset_values)
+
+def cursor_after(item: Any, columns: Sequence[str]) -> Optional[str]:
+    """Cursor pointing just after item (an ORM object, a PagedRow or a row dict)."""
+    if isinstance(item, PagedRow):
+        return encode_cursor(item.keyset_values)
+    if isinstance(item, dict):
+        if not all(c in item for c in columns):
+            return None
+        return encode_cursor([item[c] for c in columns])
+    return encode_cursor([getattr(item, c) for c in columns])
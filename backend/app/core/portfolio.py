@@ -0,0 +1,77 @@
+"""
+Cross-project CPM for a portfolio.
+
+All tasks of the selected projects go into one graph, so dependencies that
+cross project boundaries take part in the passes instead of being dropped.
+A project's due date is a commitment rather than a floor here: it caps the
+late finish of that project's tasks like a task deadline does, so slack is
+global (against both the portfolio finish and every due date) and goes
+negative when a chain cannot make a project's due date.
+
+Per-project roll-ups (projected finish, critical task count) are reductions
+over a task -> project index, so the cost stays one linear CPM run however
+many projects are involved.
+
+health_score/risk_level turn a project's counts into the portfolio health
+rating shown by the REST endpoint and the MCP tool alike.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from app.core.cpm import DAY, NO_DEADLINE, Schedule, schedule, slack_and_critical
+from app.core.enums import Status
+
+class PortfolioResult(NamedTuple):
+    schedule: Schedule
+    slack_days: np.ndarray
+    critical: np.ndarray
+    # Per project: latest early finish of its resolved tasks (-1 without any)
+    projected_finish: np.ndarray
+    critical_tasks: np.ndarray
+    # Critical tasks ordered by early start
+    critical_chain: np.ndarray
+
+def analyze_portfolio(
+    project_of, durations, earliest, deadlines, pred, succ, dep_type, lag, project_due,
+) -> PortfolioResult:
+    """
+    project_of: project index of every task. project_due: per project due
+    time, NO_DEADLINE when absent. The other arguments are as for
+    app.core.cpm.schedule, in the same time unit.
+    """
+    project_of = np.asarray(project_of, dtype=np.int64)
+    project_due = np.asarray(project_due, dtype=np.int64)
+    deadlines = np.minimum(np.asarray(deadlines, dtype=np.int64), project_due[project_of])
+
+    sched = schedule(durations, earliest, deadlines, pred, succ, dep_type, lag)
+    slack_days, critical = slack_and_critical(sched)
+
+    projected_finish = np.full(len(project_due), -1, dtype=np.int64)
+    np.maximum.at(projected_finish, project_of[sched.resolved], sched.ef[sched.resolved])
+    critical_tasks = np.bincount(project_of[critical], minlength=len(project_due))
+
+    chain = np.flatnonzero(critical)
+    chain = chain[np.argsort(sched.es[chain], kind="stable")]
+    return PortfolioResult(sched, slack_days, critical, projected_finish, critical_tasks, chain)
+
+def variance_days(projected_finish: int, due: int) -> int:
+    """Whole days a projected finish lies past the due date (negative: ahead)."""
+    if projected_finish < 0 or due == NO_DEADLINE:
+        return 0
+    return (projected_finish - due) // DAY
+
+def health_score(overdue: int, status) -> float:
+    """100 minus 5 per overdue task and 20 when on hold, within 0..100."""
+    score = 100.0 - overdue * 5.0
+    if status == Status.ON_HOLD:
+        score -= 20
+    return max(0.0, min(100.0, score))
+
+def risk_level(score: float, overdue: int) -> str:
+    if score < 50 or overdue > 5:
+        return "High"
+    if score < 80 or overdue > 2:
+        return "Medium"
+    return "Low"
@@ -0,0 +1,173 @@
+"""
+Delta bookkeeping for the project fields derived from its tasks:
+progress (average over top-level tasks), earliest start, latest due/deadline
+and the topic/type unions.
+
+Each task write is recorded as a before/after TaskSnapshot. ProjectAggregateDelta
+accumulates those into counter deltas, new date candidates and the values that
+disappeared. Only a removed value that may have been the extremum (or the last
+holder of a topic/type) forces the CRUD layer to recompute that field in SQL.
+
+The same snapshots carry the completion day and owner of the task, folded by
+record_completion into count deltas for the daily completion_activity rollup.
+"""
+
+from datetime import date, datetime
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from app.core.enums import Status
+
+STATUS_PROGRESS = {
+    Status.DONE: 100.0,
+    Status.REVIEW: 80.0,
+    Status.IN_PROGRESS: 50.0,
+    Status.ON_HOLD: 25.0,
+}
+
+def task_progress(status: Optional[Status], checklist: Optional[List[dict]]) -> float:
+    """
+    Checklist completion if the task has a checklist, otherwise status-based.
+    """
+    if checklist and len(checklist) > 0:
+        total = len(checklist)
+        done = sum(1 for item in checklist if item.get("is_done", False))
+        return round((done / total) * 100.0, 2)
+    return STATUS_PROGRESS.get(status, 0.0)
+
+class TaskSnapshot(NamedTuple):
+    project_id: Optional[UUID]
+    is_top_level: bool
+    progress: float
+    start_date: Optional[datetime]
+    end_date: Optional[datetime]
+    topic_ids: FrozenSet[UUID]
+    type_ids: FrozenSet[UUID]
+    # Not part of the project aggregates: only read by record_completion
+    completed_on: Optional[date] = None
+    owner_id: Optional[UUID] = None
+
+    def aggregate_fields(self) -> "TaskSnapshot":
+        return self._replace(completed_on=None, owner_id=None)
+
+# (day, project_id, owner_id) of a completion_activity row
+ActivityKey = Tuple[date, Optional[UUID], Optional[UUID]]
+
+def snapshot_task(
+    task,
+    topic_ids: Optional[Iterable[UUID]] = None,
+    type_ids: Optional[Iterable[UUID]] = None
+) -> TaskSnapshot:
+    """
+    Capture the aggregate-relevant fields of a task. topic_ids/type_ids default
+    to the loaded M2M collections; the legacy single FKs are always included.
+    """
+    topics = set(topic_ids) if topic_ids is not None else {t.id for t in task.__dict__.get("topics") or []}
+    types = set(type_ids) if type_ids is not None else {t.id for t in task.__dict__.get("types") or []}
+    if task.topic_id:
+        topics.add(task.topic_id)
+    if task.type_id:
+        types.add(task.type_id)
+
+    ends = [d for d in (task.due_date, task.deadline_at) if d]
+    return TaskSnapshot(
+        project_id=task.project_id,
+        is_top_level=task.parent_id is None,
+        progress=task_progress(task.status, task.checklist),
+        start_date=task.start_date,
+        end_date=max(ends) if ends else None,
+        topic_ids=frozenset(topics),
+        type_ids=frozenset(types),
+        completed_on=task.completed_at.date() if task.completed_at else None,
+        owner_id=task.owner_id,
+    )
+
+def _min(a, b):
+    return b if a is None else a if b is None else min(a, b)
+
+def _max(a, b):
+    return b if a is None else a if b is None else max(a, b)
+
+class ProjectAggregateDelta:
+    """Pending changes to one project's aggregates."""
+
+    def __init__(self):
+        self.top_task_count = 0
+        self.progress_sum = 0.0
+        # Earliest/latest values that appeared, and the ones that went away
+        self.added_start: Optional[datetime] = None
+        self.added_end: Optional[datetime] = None
+        self.removed_start: Optional[datetime] = None
+        self.removed_end: Optional[datetime] = None
+        self.added_topics = set()
+        self.removed_topics = set()
+        self.added_types = set()
+        self.removed_types = set()
+        self.full_recompute = False
+
+    def remove(self, snap: TaskSnapshot):
+        if snap.is_top_level:
+            self.top_task_count -= 1
+            self.progress_sum -= snap.progress
+        self.removed_start = _min(self.removed_start, snap.start_date)
+        self.removed_end = _max(self.removed_end, snap.end_date)
+        self.removed_topics |= snap.topic_ids
+        self.removed_types |= snap.type_ids
+
+    def add(self, snap: TaskSnapshot):
+        if snap.is_top_level:
+            self.top_task_count += 1
+            self.progress_sum += snap.progress
+        self.added_start = _min(self.added_start, snap.start_date)
+        self.added_end = _max(self.added_end, snap.end_date)
+        self.added_topics |= snap.topic_ids
+        self.added_types |= snap.type_ids
+
+    def add_progress(self, delta: float):
+        self.progress_sum += delta
+
+def record_change(
+    pending: Dict[UUID, ProjectAggregateDelta],
+    before: Optional[TaskSnapshot],
+    after: Optional[TaskSnapshot]
+):
+    """
+    Fold one task write (create: before=None, delete: after=None) into the
+    per-project pending deltas. A value present both before and after is a no-op.
+    """
+    if before and after and before.project_id == after.project_id:
+        if before.aggregate_fields() == after.aggregate_fields() or not before.project_id:
+            return
+        # Only record the parts that actually changed
+        unchanged_topics = before.topic_ids & after.topic_ids
+        unchanged_types = before.type_ids & after.type_ids
+        before = before._replace(
+            topic_ids=before.topic_ids - unchanged_topics, type_ids=before.type_ids - unchanged_types,
+            start_date=None if before.start_date == after.start_date else before.start_date,
+            end_date=None if before.end_date == after.end_date else before.end_date,
+        )
+        after = after._replace(topic_ids=after.topic_ids - unchanged_topics, type_ids=after.type_ids - unchanged_types)
+
+    if before and before.project_id:
+        pending.setdefault(before.project_id, ProjectAggregateDelta()).remove(before)
+    if after and after.project_id:
+        pending.setdefault(after.project_id, ProjectAggregateDelta()).add(after)
+
+def _activity_key(snap: Optional[TaskSnapshot]) -> Optional[ActivityKey]:
+    if snap is None or snap.completed_on is None:
+        return None
+    return (snap.completed_on, snap.project_id, snap.owner_id)
+
+def record_completion(pending: Dict[ActivityKey, int], before: Optional[TaskSnapshot], after: Optional[TaskSnapshot]):
+    """
+    Fold one task write into the pending completion_activity count deltas:
+    completing a task counts it on its day, un-completing, deleting or moving
+    it takes it off the day (and project/owner) it was counted on.
+    """
+    old, new = _activity_key(before), _activity_key(after)
+    if old == new:
+        return
+    if old:
+        pending[old] = pending.get(old, 0) - 1
+    if new:
+        pending[new] = pending.get(new, 0) + 1
@@ -0,0 +1,100 @@
+"""
+Cache for derived per-project results (WBS codes, slack, critical flags).
+
+Entries are keyed by (project_id, revision). Every write to a project's tasks,
+its dependencies or the project itself bumps `projects.revision`, so entries
+never need invalidating: a changed project simply asks for a different key.
+The first level is an in-process LRU. The second is the project_result_cache
+table, shared by all workers and trimmed to the most recently used projects
+(see CRUDTask.get_project_results).
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.schemas.task import Task
+
+class LRUCache:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class TTLCache(LRUCache):
+    """
+    LRU whose entries also expire ttl seconds after being stored. Every
+    clear() starts a new generation; a value computed before a clear can be
+    refused by passing the generation read before computing it to put().
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = super().get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            self.pop(key)
+            return None
+        return value
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        if generation is not None and generation != self.generation:
+            return
+        super().put(key, (time.monotonic() + self.ttl, value))
+
+    def clear(self):
+        self._entries.clear()
+        self.generation += 1
+
+# {task_id: (wbs_code, slack_days, is_critical)}
+ProjectResults = Dict[UUID, Tuple[Optional[str], Optional[int], bool]]
+
+project_results = LRUCache(settings.RESULT_CACHE_SIZE)
+
+# GET /dashboard/summary per user. Task writes in this worker clear it once
+# their transaction commits (see CRUDTask.mark_project_changed); the TTL
+# bounds what other workers' writes leave stale.
+dashboard_summaries = TTLCache(settings.DASHBOARD_SUMMARY_CACHE_SIZE, settings.DASHBOARD_SUMMARY_TTL)
+
+# CRUDTask.portfolio_health per portfolio revision: the (project_id, revision)
+# pairs of its projects, so any write to one of them asks for a new key
+portfolio_health = TTLCache(settings.PORTFOLIO_HEALTH_CACHE_SIZE, settings.PORTFOLIO_HEALTH_TTL)
+
+def encode_results(results: ProjectResults) -> dict:
+    return {str(task_id): list(values) for task_id, values in results.items()}
+
+def decode_results(payload: dict) -> ProjectResults:
+    return {UUID(task_id): tuple(values) for task_id, values in payload.items()}
+
+def apply_results(tasks: List[Task], results: ProjectResults) -> List[Task]:
+    """Annotate task trees (schemas) with cached WBS codes and CPM flags."""
+    stack = list(tasks)
+    while stack:
+        t = stack.pop()
+        t.wbs_code, t.slack_days, t.is_critical = results.get(t.id, (None, None, False))
+        stack.extend(t.subtasks or [])
+    return tasks
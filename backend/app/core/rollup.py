@@ -0,0 +1,56 @@
+"""
+Ancestor status rollup.
+
+A parent task's status is derived from its children:
+all children Done -> Done (In Progress while the parent itself is blocked),
+any child started or done -> In Progress, otherwise Todo.
+
+The CRUD layer loads every ancestor of a changed task together with its child
+status counts in one query; `plan_rollup` then walks those ancestors bottom-up,
+propagating each status change into the parent's counts, so no further
+queries are needed to decide the new statuses.
+"""
+
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from app.core.enums import Status
+
+ACTIVE_STATUSES = (Status.IN_PROGRESS, Status.REVIEW)
+
+def derive_status(total: int, done: int, active: int, blocked: bool = False) -> Optional[Status]:
+    """New status of a parent from its child counts, or None if it has no children."""
+    if total <= 0:
+        return None
+    if done >= total:
+        return Status.IN_PROGRESS if blocked else Status.DONE
+    if active > 0 or done > 0:
+        return Status.IN_PROGRESS
+    return Status.TODO
+
+def plan_rollup(
+    nodes: Iterable[Dict],
+    blocked_ids: Set[Hashable] = frozenset()
+) -> List[Tuple[Hashable, Status, Status]]:
+    """
+    nodes: ancestor dicts with keys id, parent_id, status, total, done, active,
+    ordered deepest first. Returns (task_id, old_status, new_status) for every
+    ancestor whose status changes, in bottom-up order.
+    """
+    nodes = list(nodes)
+    by_id = {n["id"]: dict(n) for n in nodes}
+    transitions = []
+
+    for node in nodes:
+        current = by_id[node["id"]]
+        old = current["status"]
+        new = derive_status(current["total"], current["done"], current["active"], current["id"] in blocked_ids)
+        if new is None or new == old:
+            continue
+        transitions.append((current["id"], old, new))
+
+        parent = by_id.get(current["parent_id"])
+        if parent is not None:
+            parent["done"] += (new == Status.DONE) - (old == Status.DONE)
+            parent["active"] += (new in ACTIVE_STATUSES) - (old in ACTIVE_STATUSES)
+
+    return transitions
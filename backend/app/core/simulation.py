@@ -0,0 +1,311 @@
+"""
+Monte Carlo schedule simulation over PERT (beta) duration estimates.
+
+Each iteration samples every task duration from the PERT distribution given
+by its optimistic / most likely / pessimistic estimates and runs the CPM
+forward and backward passes (see app.core.cpm for the edge weights). The
+passes are vectorized across iterations: tasks are grouped by depth in the
+dependency graph, so one level is a handful of array operations over
+(tasks x iterations) blocks, and iterations are processed in chunks to bound
+memory.
+
+Beta sampling uses a per-task inverse CDF table (the PERT shape parameters
+are >= 1, so the density is bounded and the table is accurate), which is
+far cheaper than drawing gamma variates.
+
+Times are float days from the project origin.
+"""
+
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from app.core.cpm import FS, SS, FF, SF
+
+QUANTILE_POINTS = 4096
+# Cells (tasks x iterations) per chunk; bounds memory to a few float32 blocks
+CHUNK_CELLS = 2_000_000
+# Floating point tolerance for "zero total float", in days
+CRITICAL_TOLERANCE = 1e-3
+# Fewest iterations a cell budget cuts a simulation down to
+MIN_ITERATIONS = 100
+
+class Simulation(NamedTuple):
+    # Project finish of every iteration
+    finish: np.ndarray
+    # Fraction of iterations in which each task was critical
+    criticality: np.ndarray
+    # Mean early finish of each task
+    mean_finish: np.ndarray
+    # False for tasks on or behind a dependency cycle (left out)
+    resolved: np.ndarray
+
+def pert_shape(low: np.ndarray, mode: np.ndarray, high: np.ndarray):
+    """Beta shape parameters of the PERT distribution (lambda = 4)."""
+    span = np.where(high > low, high - low, 1.0)
+    alpha = 1 + 4 * (mode - low) / span
+    beta = 1 + 4 * (high - mode) / span
+    return alpha, beta
+
+def beta_quantile_tables(alpha: np.ndarray, beta: np.ndarray, points: int = QUANTILE_POINTS):
+    """
+    Beta quantiles at `points` evenly spaced probabilities, one table per
+    distinct (alpha, beta) pair, by numerically inverting the CDF on a fine
+    grid. Returns (tables, table_of_task).
+    """
+    grid = np.linspace(0.0, 1.0, points * 4, dtype=np.float64)
+    probs = (np.arange(points, dtype=np.float64) + 0.5) / points
+    # Shapes repeat a lot (estimates are usually whole days); invert each once
+    shapes, table_of = np.unique(np.stack([alpha, beta], axis=1), axis=0, return_inverse=True)
+    tables = np.empty((len(shapes), points), dtype=np.float32)
+    for k, (a, b) in enumerate(shapes):
+        density = grid ** (a - 1) * (1 - grid) ** (b - 1)
+        cdf = np.concatenate([[0.0], np.cumsum((density[1:] + density[:-1]) / 2)])
+        tables[k] = np.interp(probs, cdf / cdf[-1], grid)
+    return tables, table_of.reshape(-1)
+
+def _levels(n: int, pred: np.ndarray, succ: np.ndarray):
+    """Kahn pass: longest-path depth of every resolved task, and the resolved mask."""
+    indegree = np.bincount(succ, minlength=n).tolist()
+    perm = np.argsort(pred, kind="stable")
+    ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pred, minlength=n), out=ptr[1:])
+    out = succ[perm].tolist()
+    ptr = ptr.tolist()
+
+    depth = [0] * n
+    order = [i for i in range(n) if indegree[i] == 0]
+    head = 0
+    while head < len(order):
+        u = order[head]
+        head += 1
+        for k in range(ptr[u], ptr[u + 1]):
+            v = out[k]
+            if depth[u] + 1 > depth[v]:
+                depth[v] = depth[u] + 1
+            indegree[v] -= 1
+            if indegree[v] == 0:
+                order.append(v)
+    resolved = np.zeros(n, dtype=bool)
+    resolved[order] = True
+    return np.asarray(depth, dtype=np.int64), resolved
+
+def _plan_levels(level: np.ndarray, target: np.ndarray, edges: np.ndarray):
+    """
+    Group edges by the level of their target node, ascending. Within a level
+    the edges are split into rounds holding at most one edge per target, so
+    each round is a plain elementwise max/min into distinct rows. Returns
+    one (targets, rounds) pair per level.
+    """
+    plan = []
+    if not len(edges):
+        return plan
+    edges = edges[np.lexsort((target[edges], level[target[edges]]))]
+    targets = target[edges]
+    # Rank of each edge among the edges of the same target
+    first = np.concatenate([[True], targets[1:] != targets[:-1]])
+    run_start = np.maximum.accumulate(np.where(first, np.arange(len(edges)), 0))
+    rank = np.arange(len(edges)) - run_start
+    bounds = np.flatnonzero(np.diff(level[targets])) + 1
+    for group, group_rank in zip(np.split(edges, bounds), np.split(rank, bounds)):
+        rounds = [group[group_rank == r] for r in range(int(group_rank.max()) + 1)]
+        plan.append((target[rounds[0]], rounds))
+    return plan
+
+def simulate(
+    low: np.ndarray,
+    mode: np.ndarray,
+    high: np.ndarray,
+    earliest: np.ndarray,
+    pred: np.ndarray,
+    succ: np.ndarray,
+    dep_type: np.ndarray,
+    lag: np.ndarray,
+    iterations: int = 10_000,
+    seed: Optional[int] = None,
+) -> Simulation:
+    """
+    low/mode/high: per task duration estimates in days (equal values give a
+    fixed duration). earliest: per task earliest start in days. pred/succ/
+    dep_type/lag: per dependency, lag in days. The same seed reproduces the
+    same result.
+    """
+    n = len(mode)
+    pred = np.asarray(pred, dtype=np.int64)
+    succ = np.asarray(succ, dtype=np.int64)
+    dep_type = np.asarray(dep_type, dtype=np.int8)
+    lag_col = np.asarray(lag, dtype=np.float32)[:, None]
+    low = np.asarray(low, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    mode = np.clip(np.asarray(mode, dtype=np.float64), low, high)
+
+    depth, resolved = _levels(n, pred, succ)
+    # Height (longest path to a sink) drives the backward pass
+    height, _ = _levels(n, succ, pred)
+    edge_ids = np.flatnonzero(resolved[pred] & resolved[succ])
+    forward_plan = _plan_levels(depth, succ, edge_ids)
+    backward_plan = _plan_levels(height, pred, edge_ids)
+    resolved_ids = np.flatnonzero(resolved)
+
+    # Early times live in one (2n, C) block, ES rows then EF rows, so every
+    # dependency type reads its bound with a single row gather (see
+    # cpm._edge_weights): FS/FF start from the predecessor's finish, and
+    # FF/SF also subtract the successor's duration. The backward pass mirrors
+    # this over an (LS, LF) block.
+    def prepare(plan, source, target, adjust):
+        # Per round: edge ids, target rows, source rows, lag column, and the
+        # rows needing a duration correction (None when empty)
+        prepared = []
+        for nodes, rounds in plan:
+            prepared.append((nodes, [
+                (
+                    group, target[group], source[group],
+                    lag_col[group] if lag_col[group].any() else None,
+                    np.flatnonzero(adjust[group]) if adjust[group].any() else None,
+                )
+                for group in rounds
+            ]))
+        return prepared
+
+    forward_plan = prepare(forward_plan, pred + n * np.isin(dep_type, (FS, FF)), succ, np.isin(dep_type, (FF, SF)))
+    backward_plan = prepare(backward_plan, succ + n * np.isin(dep_type, (FF, SF)), pred + n, np.isin(dep_type, (SS, SF)))
+
+    uncertain = np.flatnonzero(high > low)
+    alpha, beta = pert_shape(low[uncertain], mode[uncertain], high[uncertain])
+    tables, table_of = beta_quantile_tables(alpha, beta)
+    flat_tables = tables.reshape(-1)
+    table_base = (table_of * QUANTILE_POINTS).astype(np.int32)[:, None]
+    scale = (high[uncertain] - low[uncertain]).astype(np.float32)[:, None]
+    offset = low[uncertain].astype(np.float32)[:, None]
+    fixed = low.astype(np.float32)[:, None]
+    earliest_col = np.asarray(earliest, dtype=np.float32)[:, None]
+
+    rng = np.random.default_rng(seed)
+    chunk = max(64, min(iterations, CHUNK_CELLS // max(n, 1)))
+    widest = max((len(g[0]) for _, rounds in forward_plan + backward_plan for g in rounds), default=0)
+    buffer_a = np.empty((widest, chunk), dtype=np.float32)
+    buffer_b = np.empty((widest, chunk), dtype=np.float32)
+    finish = np.zeros(iterations, dtype=np.float32)
+    critical_counts = np.zeros(n, dtype=np.int64)
+    finish_sums = np.zeros(n, dtype=np.float64)
+    if not len(resolved_ids):
+        return Simulation(finish, critical_counts / 1.0, finish_sums, resolved)
+
+    for start in range(0, iterations, chunk):
+        size = min(chunk, iterations - start)
+
+        # Durations: fixed ones broadcast, uncertain ones through the quantile tables
+        dur = np.repeat(fixed, size, axis=1)
+        if len(uncertain):
+            index = rng.integers(0, QUANTILE_POINTS, (len(uncertain), size), dtype=np.int32)
+            index += table_base
+            sample = np.take(flat_tables, index)
+            sample *= scale
+            sample += offset
+            dur[uncertain] = sample
+
+        # Forward pass, one dependency level at a time
+        early = np.empty((2 * n, size), dtype=np.float32)
+        early[:n] = earliest_col
+        early[n:] = early[:n] + dur
+        for nodes, rounds in forward_plan:
+            for r, (group, targets, source, lag_rows, adjust) in enumerate(rounds):
+                k = len(group)
+                candidate = np.take(early, source, axis=0, out=buffer_a[:k, :size])
+                if lag_rows is not None:
+                    candidate += lag_rows
+                if adjust is not None:
+                    candidate[adjust] -= dur[targets[adjust]]
+                if r == 0:
+                    # Nothing has raised these rows yet: compare with the earliest start
+                    np.maximum(candidate, earliest_col[targets], out=candidate)
+                    early[targets] = candidate
+                else:
+                    current = np.take(early, targets, axis=0, out=buffer_b[:k, :size])
+                    np.maximum(current, candidate, out=current)
+                    early[targets] = current
+            early[nodes + n] = early[nodes] + dur[nodes]
+        ef = early[n:]
+        chunk_finish = ef[resolved_ids].max(axis=0)
+
+        # Backward pass from each iteration's own finish
+        late = np.empty((2 * n, size), dtype=np.float32)
+        late[n:] = chunk_finish
+        late[:n] = late[n:] - dur
+        for nodes, rounds in backward_plan:
+            for r, (group, targets, source, lag_rows, adjust) in enumerate(rounds):
+                k = len(group)
+                candidate = np.take(late, source, axis=0, out=buffer_a[:k, :size])
+                if lag_rows is not None:
+                    candidate -= lag_rows
+                if adjust is not None:
+                    candidate[adjust] += dur[targets[adjust] - n]
+                if r == 0:
+                    # LF rows still hold the finish
+                    np.minimum(candidate, chunk_finish, out=candidate)
+                    late[targets] = candidate
+                else:
+                    current = np.take(late, targets, axis=0, out=buffer_b[:k, :size])
+                    np.minimum(current, candidate, out=current)
+                    late[targets] = current
+            late[nodes] = late[nodes + n] - dur[nodes]
+
+        # Zero total float (LF - EF) marks the iteration's critical tasks
+        critical_counts += np.count_nonzero(late[n:] - ef <= CRITICAL_TOLERANCE, axis=1)
+        finish_sums += ef.sum(axis=1, dtype=np.float64)
+        finish[start:start + size] = chunk_finish
+
+    critical_counts[~resolved] = 0
+    return Simulation(
+        finish=finish,
+        criticality=critical_counts / iterations,
+        mean_finish=finish_sums / iterations,
+        resolved=resolved,
+    )
+
+def budget_iterations(iterations: int, task_count: int, cell_budget: int) -> int:
+    """
+    Iterations to run so tasks x iterations stays within cell_budget; the
+    cost of a run is linear in both. Never raises the requested count, and
+    never cuts it below MIN_ITERATIONS.
+    """
+    return min(iterations, max(MIN_ITERATIONS, cell_budget // max(task_count, 1)))
+
+class SimulationSummary(NamedTuple):
+    # Finish percentiles and mean in days (None without any schedulable task)
+    p50: Optional[float]
+    p80: Optional[float]
+    p95: Optional[float]
+    mean: Optional[float]
+    finish_edges: List[float]
+    finish_counts: List[int]
+    criticality_edges: List[float]
+    criticality_counts: List[int]
+
+def summarize(result: Simulation, bins: int = 20) -> SimulationSummary:
+    """Finish percentiles and histograms of a simulation."""
+    criticality_counts, criticality_edges = np.histogram(result.criticality[result.resolved], bins=10, range=(0.0, 1.0))
+    if not result.resolved.any() or not len(result.finish):
+        return SimulationSummary(
+            None, None, None, None, [], [], criticality_edges.round(2).tolist(), criticality_counts.tolist()
+        )
+    finish = result.finish.astype(np.float64)
+    p50, p80, p95 = np.percentile(finish, [50, 80, 95]).tolist()
+    finish_counts, finish_edges = np.histogram(finish, bins=bins)
+    return SimulationSummary(
+        p50, p80, p95, float(finish.mean()), finish_edges.tolist(), finish_counts.tolist(),
+        criticality_edges.round(2).tolist(), criticality_counts.tolist(),
+    )
+
+def estimate_range(optimistic: int, normal: int, pessimistic: int, nominal: float):
+    """
+    (low, mode, high) in days from a task's PERT estimates. Missing values
+    are filled from the others. Without any estimate the nominal duration is
+    used as a fixed value.
+    """
+    if not (optimistic or normal or pessimistic):
+        return nominal, nominal, nominal
+    low = optimistic or normal or pessimistic
+    high = pessimistic or normal or optimistic
+    mode = normal or (low + high) / 2
+    return min(low, mode, high), mode, max(low, mode, high)
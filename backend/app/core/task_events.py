@@ -0,0 +1,79 @@
+"""
+Append-only history of task changes (the task_events table).
+
+A task write is described by the task's state before and after it (see
+task_state); diff_events turns the pair into events, one per kind of change,
+each carrying {field: [old, new]} for the fields of that kind that moved.
+Creating a task records every field that is set, deleting it every field it
+had, so history alone is enough to rebuild burndowns, cycle times and
+"what changed since" for tasks that no longer exist.
+
+Values are stored in their JSON form (ids and enums as strings, datetimes in
+ISO format), as the rows are only ever appended and read back as history.
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+CREATED = "created"
+DELETED = "deleted"
+
+# Event kind -> task fields it tracks
+EVENT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "status": ("status",),
+    "dates": ("start_date", "due_date", "deadline_at", "completed_at"),
+    "assignees": ("assignee_ids",),
+    "moved": ("project_id", "parent_id"),
+}
+TRACKED_FIELDS = tuple(f for fields in EVENT_FIELDS.values() for f in fields)
+
+TaskState = Dict[str, Any]
+
+def task_state(task, assignee_ids: Optional[Iterable[UUID]] = None) -> TaskState:
+    """
+    The tracked fields of a task (ORM object or row-like namespace).
+    assignee_ids defaults to the loaded assignees collection; it is never
+    lazy-loaded, so a task without it loaded tracks no assignees.
+    """
+    state = {f: getattr(task, f, None) for f in TRACKED_FIELDS if f != "assignee_ids"}
+    if assignee_ids is None:
+        assignees = task.__dict__.get("assignees")
+        assignee_ids = [u.id for u in assignees] if assignees is not None else None
+    state["assignee_ids"] = sorted(assignee_ids, key=str) if assignee_ids is not None else None
+    return state
+
+def json_value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return [json_value(v) for v in value]
+    return value
+
+def _changes(before: TaskState, after: TaskState, fields: Iterable[str]) -> Dict[str, list]:
+    return {
+        f: [json_value(before.get(f)), json_value(after.get(f))]
+        for f in fields
+        # assignee_ids None on either side means "not loaded": no known change
+        if before.get(f) != after.get(f) and not (f == "assignee_ids" and None in (before.get(f), after.get(f)))
+    }
+
+def diff_events(before: Optional[TaskState], after: Optional[TaskState]) -> List[Tuple[str, Dict[str, list]]]:
+    """(kind, changes) of one task write; before=None for create, after=None for delete."""
+    if before is None or after is None:
+        state = after if before is None else before
+        values = {f: json_value(state[f]) for f in TRACKED_FIELDS if state.get(f) not in (None, [])}
+        if before is None:
+            return [(CREATED, {f: [None, v] for f, v in values.items()})]
+        return [(DELETED, {f: [v, None] for f, v in values.items()})]
+    events = []
+    for kind, fields in EVENT_FIELDS.items():
+        changes = _changes(before, after, fields)
+        if changes:
+            events.append((kind, changes))
+    return events
@@ -0,0 +1,317 @@
+"""
+In-memory write plans for task forests.
+
+For inserts, ids, created_at stamps, sort indexes and keys, materialized paths,
+M2M rows and dependency rows are all decided here, before touching the database,
+so the CRUD layer can write the whole forest with one executemany INSERT per
+table. Batch reorders are planned the same way: new parents, sort keys and paths
+are computed in memory and written with one UPDATE.
+"""
+
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from app.core.enums import Status
+from app.core.hierarchy import build_path, path_segment, ids_from_path
+from app.core.ordering import append_index, index_key, key_between
+from app.core.utils import clean_dict_datetimes, sync_task_dates
+from app.core.working_calendar import WorkingCalendar
+from app.models.task import Task
+
+SORT_STEP = 10
+
+class TaskInsertPlan:
+    def __init__(self):
+        self.tasks: List[dict] = []
+        self.assignees: List[dict] = []
+        self.topics: List[dict] = []
+        self.types: List[dict] = []
+        self.dependencies: List[dict] = []
+        self.root_ids: List[UUID] = []
+        # Tasks (and the external anchor) whose status must be rolled up afterwards
+        self.parent_ids: List[UUID] = []
+        self.ids_by_ref: Dict[str, UUID] = {}
+
+    def existing_predecessor_ids(self) -> set:
+        new_ids = {t["id"] for t in self.tasks}
+        return {d["predecessor_id"] for d in self.dependencies if d["predecessor_id"] not in new_ids}
+
+def plan_task_forest(
+    items: Iterable,
+    *,
+    project_id: Optional[UUID],
+    parent_id: Optional[UUID] = None,
+    parent_path: Optional[str] = None,
+    owner_id: Optional[UUID] = None,
+    first_sort_index: int = SORT_STEP,
+    calendar: Optional[WorkingCalendar] = None,
+) -> TaskInsertPlan:
+    """
+    items: TaskBulkItem models. Siblings without an explicit sort_index continue
+    in steps of SORT_STEP after the previous sibling; root items start at
+    first_sort_index. calendar: the project's working calendar, if any, for
+    the duration/date sync. Raises ValueError for duplicate or unknown refs and for
+    dependency cycles inside the batch.
+    """
+    plan = TaskInsertPlan()
+    columns = {c.name for c in Task.__table__.columns}
+    now = datetime.utcnow()
+    pending_deps = []
+
+    def add_level(level_items, level_parent_id, level_parent_path, sort_index):
+        for item in level_items:
+            data = clean_dict_datetimes(item.model_dump(include=columns & set(type(item).model_fields)))
+            data = sync_task_dates(data, calendar)
+            if data.get("status") == Status.DONE and not data.get("completed_at"):
+                data["completed_at"] = now
+            if "sort_index" not in item.model_fields_set:
+                data["sort_index"] = sort_index
+            sort_index = (data["sort_index"] or 0) + SORT_STEP
+            data["sort_key"] = index_key(data["sort_index"])
+
+            task_id = uuid4()
+            # Distinct stamps keep siblings with equal sort_index in input order
+            created_at = now + timedelta(microseconds=len(plan.tasks))
+            path = build_path(level_parent_path, path_segment(task_id, data["sort_key"], created_at))
+            data.update(
+                id=task_id,
+                project_id=project_id,
+                parent_id=level_parent_id,
+                owner_id=data.get("owner_id") or owner_id,
+                created_at=created_at,
+                updated_at=created_at,
+                path=path,
+            )
+            plan.tasks.append(data)
+            if level_parent_id is None or level_parent_id == parent_id:
+                plan.root_ids.append(task_id)
+
+            if item.ref:
+                if item.ref in plan.ids_by_ref:
+                    raise ValueError(f"Duplicate task ref in batch: {item.ref}")
+                plan.ids_by_ref[item.ref] = task_id
+
+            plan.assignees.extend({"task_id": task_id, "user_id": u} for u in dict.fromkeys(item.assignee_ids or []))
+            plan.topics.extend({"task_id": task_id, "topic_id": t} for t in dict.fromkeys(item.topic_ids or []))
+            plan.types.extend({"task_id": task_id, "type_id": t} for t in dict.fromkeys(item.type_ids or []))
+            pending_deps.extend((task_id, dep) for dep in item.dependencies or [])
+
+            if item.subtasks:
+                plan.parent_ids.append(task_id)
+                add_level(item.subtasks, task_id, path, SORT_STEP)
+
+    add_level(items, parent_id, parent_path, first_sort_index)
+    if parent_id and plan.tasks:
+        plan.parent_ids.append(parent_id)
+
+    # Resolve dependencies now that every ref has an id
+    for successor_id, dep in pending_deps:
+        if dep.predecessor_ref is not None:
+            if dep.predecessor_ref not in plan.ids_by_ref:
+                raise ValueError(f"Unknown predecessor ref: {dep.predecessor_ref}")
+            predecessor_id = plan.ids_by_ref[dep.predecessor_ref]
+        elif dep.predecessor_id is not None:
+            predecessor_id = dep.predecessor_id
+        else:
+            raise ValueError("Dependency needs predecessor_ref or predecessor_id")
+        if predecessor_id == successor_id:
+            raise ValueError("Item cannot block itself")
+        plan.dependencies.append({
+            "id": uuid4(),
+            "successor_id": successor_id,
+            "predecessor_id": predecessor_id,
+            "type": dep.type,
+            "lag_days": dep.lag_days,
+        })
+
+    # Existing tasks cannot depend on new ones yet, so any cycle lies inside the batch
+    new_ids = {t["id"] for t in plan.tasks}
+    successors = {}
+    indegree = {task_id: 0 for task_id in new_ids}
+    for d in plan.dependencies:
+        if d["predecessor_id"] in new_ids:
+            successors.setdefault(d["predecessor_id"], []).append(d["successor_id"])
+            indegree[d["successor_id"]] += 1
+    queue = deque(task_id for task_id, n in indegree.items() if n == 0)
+    visited = 0
+    while queue:
+        visited += 1
+        for succ in successors.get(queue.popleft(), []):
+            indegree[succ] -= 1
+            if indegree[succ] == 0:
+                queue.append(succ)
+    if visited != len(new_ids):
+        raise ValueError("Circular dependency detected")
+
+    return plan
+
+class ReorderPlan:
+    def __init__(self):
+        # One dict per changed task: id, parent_id, sort_key, sort_index, path
+        self.rows: List[dict] = []
+        # (old_path, new_path) subtree re-prefixes, deepest first
+        self.path_moves: List[Tuple[str, str]] = []
+        # (task_id, old_parent_id, new_parent_id) for re-parented tasks
+        self.parent_changes: List[tuple] = []
+
+def plan_reorder(moves: Iterable, rows: Iterable, now: Optional[datetime] = None) -> ReorderPlan:
+    """
+    moves: TaskMove models, applied in order. rows: the moved tasks, anchors,
+    target parents and every current child of those parents (objects with id,
+    parent_id, project_id, path, sort_key, sort_index, created_at).
+
+    A moved task lands right after `after_id`, right before `before_id`, or at
+    the end of its new siblings, with a key between its new neighbours. Siblings
+    are only re-keyed when legacy rows share the same key at the insertion point.
+    A task moved to the end gets a key below the append key of `now`, so tasks
+    created afterwards (keyed by append_index) still land after it.
+    Raises ValueError for unknown tasks, anchors that are not siblings under the
+    target parent, cross-project moves and hierarchy cycles.
+    """
+    plan = ReorderPlan()
+    by_id = {r.id: r for r in rows}
+    state = {
+        r.id: {"parent_id": r.parent_id, "sort_key": r.sort_key or index_key(r.sort_index), "sort_index": r.sort_index or 0}
+        for r in rows
+    }
+
+    def require(task_id):
+        if task_id not in by_id:
+            raise ValueError(f"Task not found: {task_id}")
+        return by_id[task_id]
+
+    def group_of(task_id):
+        parent_id = state[task_id]["parent_id"]
+        return (parent_id, None) if parent_id else (None, by_id[task_id].project_id)
+
+    def key_of(task_id):
+        return state[task_id]["sort_key"]
+
+    siblings = defaultdict(list)
+    for task_id in by_id:
+        siblings[group_of(task_id)].append(task_id)
+    for ids in siblings.values():
+        # Same order as the paths: key, then creation stamp and id
+        ids.sort(key=lambda i: (key_of(i), by_id[i].path or ""))
+
+    # Keys of tasks appended from now on are at least this
+    append_floor = index_key(append_index(now))
+
+    def upper_bound(ids, start, lower):
+        """First key in ids[start:] strictly above lower (at the end: the append floor)."""
+        for i in ids[start:]:
+            if lower is None or key_of(i) > lower:
+                return key_of(i)
+        return append_floor if lower is None or lower < append_floor else None
+
+    changed = {}
+    for move in moves:
+        task = require(move.task_id)
+        anchor_id = move.after_id or move.before_id
+        if anchor_id is not None:
+            require(anchor_id)
+            if anchor_id == move.task_id:
+                raise ValueError("A task cannot be positioned relative to itself")
+
+        if "parent_id" in move.model_fields_set:
+            parent_id = move.parent_id
+        elif anchor_id is not None:
+            parent_id = state[anchor_id]["parent_id"]
+        else:
+            parent_id = state[move.task_id]["parent_id"]
+        if parent_id == move.task_id:
+            raise ValueError("A task cannot be its own parent")
+        if parent_id is not None and require(parent_id).project_id != task.project_id:
+            raise ValueError("Cannot move a task to another project")
+
+        old_parent_id = changed.get(move.task_id, {}).get("old_parent_id", task.parent_id)
+        siblings[group_of(move.task_id)].remove(move.task_id)
+        state[move.task_id]["parent_id"] = parent_id
+        ids = siblings[group_of(move.task_id)]
+
+        if anchor_id is not None and anchor_id not in ids:
+            raise ValueError(f"Task {anchor_id} is not a sibling under the target parent")
+        if move.after_id is not None:
+            pos = ids.index(move.after_id) + 1
+        elif move.before_id is not None:
+            pos = ids.index(move.before_id)
+        else:
+            pos = len(ids)
+        ids.insert(pos, move.task_id)
+        changed[move.task_id] = {"old_parent_id": old_parent_id}
+
+        # New key for the moved task, then re-key any tie run right behind it
+        for i in range(pos, len(ids)):
+            lower = key_of(ids[i - 1]) if i else None
+            if i > pos and key_of(ids[i]) > lower:
+                break
+            state[ids[i]]["sort_key"] = key_between(lower, upper_bound(ids, i + 1, lower))
+            changed.setdefault(ids[i], {"old_parent_id": by_id[ids[i]].parent_id})
+
+        # Best-effort integer position for clients that still read sort_index
+        prev_index = state[ids[pos - 1]]["sort_index"] if pos else None
+        next_index = state[ids[pos + 1]]["sort_index"] if pos + 1 < len(ids) else None
+        if prev_index is not None and next_index is not None:
+            sort_index = (prev_index + next_index) // 2 if next_index - prev_index > 1 else prev_index
+        elif next_index is not None:
+            sort_index = next_index - SORT_STEP
+        else:
+            sort_index = (prev_index or 0) + SORT_STEP
+        state[move.task_id]["sort_index"] = sort_index
+
+    # Cycle check on the final hierarchy: walk up from each moved task's parent,
+    # following new parents for changed tasks and the stored path otherwise
+    for task_id in changed:
+        seen = set()
+        node = state[task_id]["parent_id"]
+        while node is not None:
+            if node == task_id or node in seen:
+                raise ValueError("Cannot set a descendant as a parent (circular hierarchy)")
+            seen.add(node)
+            if node in changed:
+                node = state[node]["parent_id"]
+                continue
+            next_node = None
+            for ancestor_id in reversed(ids_from_path(require(node).path)[:-1]):
+                if ancestor_id == task_id or ancestor_id in changed:
+                    next_node = ancestor_id
+                    break
+            node = next_node
+
+    final_paths = {}
+
+    def final_path(task_id):
+        if task_id in final_paths:
+            return final_paths[task_id]
+        row = require(task_id)
+        if task_id in changed:
+            parent_id = state[task_id]["parent_id"]
+            segment = path_segment(task_id, key_of(task_id), row.created_at)
+            path = build_path(final_path(parent_id) if parent_id else None, segment)
+        else:
+            path = row.path
+            for ancestor_id in reversed(ids_from_path(row.path)[:-1]):
+                if ancestor_id in changed:
+                    path = final_path(ancestor_id) + row.path[len(by_id[ancestor_id].path):]
+                    break
+        final_paths[task_id] = path
+        return path
+
+    for task_id, info in changed.items():
+        row = by_id[task_id]
+        path = final_path(task_id)
+        plan.rows.append({
+            "id": task_id,
+            "parent_id": state[task_id]["parent_id"],
+            "sort_key": key_of(task_id),
+            "sort_index": state[task_id]["sort_index"],
+            "path": path,
+        })
+        if row.path and path != row.path:
+            plan.path_moves.append((row.path, path))
+        if info["old_parent_id"] != state[task_id]["parent_id"]:
+            plan.parent_changes.append((task_id, info["old_parent_id"], state[task_id]["parent_id"]))
+    plan.path_moves.sort(key=lambda m: m[0].count("."), reverse=True)
+    return plan
@@ -1,7 +1,9 @@
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from typing import Optional, Any
 from uuid import UUID
 
+from app.core.working_calendar import WorkingCalendar
+
 def make_naive(dt: Optional[datetime]) -> Optional[datetime]:
     """
     Ensure a datetime is offset-naive (removes tzinfo).
@@ -38,3 +40,39 @@ def clean_dict_for_json(data: Any) -> Any:
         return data.isoformat()
     else:
         return data
+
+def shift_days(dt: datetime, days: int, calendar: Optional[WorkingCalendar] = None) -> datetime:
+    """
+    dt moved by `days` days. With a working calendar only working days count
+    (from the nearest working day in that direction); the time of day is kept.
+    """
+    if calendar is None:
+        return dt + timedelta(days=days)
+    d = calendar.add(dt.date(), days) if days >= 0 else calendar.subtract(dt.date(), -days)
+    return datetime.combine(d, dt.time())
+
+def span_days(start: datetime, due: datetime, calendar: Optional[WorkingCalendar] = None) -> int:
+    """Inclusive length of start..due (1 = same day), in working days with a calendar."""
+    if calendar is None:
+        return (due - start).days + 1
+    return calendar.count(start.date(), due.date())
+
+def sync_task_dates(data: dict, calendar: Optional[WorkingCalendar] = None) -> dict:
+    """
+    Bidirectional start/due/duration completion for a new task (dur=1 means same day).
+    When all three are given, duration wins and due is recomputed.
+    With a working calendar, duration counts working days.
+    """
+    start = data.get("start_date")
+    due = data.get("due_date")
+    dur = data.get("duration_days")
+
+    if start and dur and dur > 0 and not due:
+        data["due_date"] = shift_days(start, dur - 1, calendar)
+    elif start and due and not dur:
+        data["duration_days"] = span_days(start, due, calendar)
+    elif due and dur and dur > 0 and not start:
+        data["start_date"] = shift_days(due, -(dur - 1), calendar)
+    elif start and due and dur:
+        data["due_date"] = shift_days(start, dur - 1, calendar)
+    return data
@@ -1,13 +1,14 @@
 from typing import List
 from app.schemas.task import Task
+from app.core.ordering import index_key
 
 def apply_wbs_codes(tasks: List[Task], parent_code: str = "") -> List[Task]:
     """
-    Recursively sorts tasks and their subtasks by sort_index and assigns WBS codes.
+    Recursively sorts tasks and their subtasks by sort key and assigns WBS codes.
     Supports infinite nesting.
     """
     # Sort current level
-    tasks.sort(key=lambda x: (x.sort_index or 0, x.created_at))
+    tasks.sort(key=lambda x: (getattr(x, "sort_key", None) or index_key(x.sort_index), x.created_at))
     
     for i, task in enumerate(tasks, 1):
         # Generate code: "1", "1.1", "1.1.1" etc.
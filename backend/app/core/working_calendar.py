@@ -0,0 +1,118 @@
+"""
+Working-day calendars.
+
+A calendar is a set of working weekdays minus holidays, precomputed over a
+fixed range of days as a boolean bitmap, the prefix sum of that bitmap
+(working days before each day) and the list of working days. Converting a
+date to its working-day offset and back is then one array lookup, and both
+directions accept numpy arrays, so CPM and workload spreading stay
+vectorized.
+
+Working time maps a datetime to offset * DAY + time of day (in
+microseconds, like app.core.cpm), so the CPM passes run unchanged on
+working time and the results convert back with from_time. A non-working
+day maps to the start of the next working day.
+"""
+
+import hashlib
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Iterable, Optional
+
+import numpy as np
+
+DAY = 86_400_000_000  # microseconds, as in app.core.cpm
+BASE = date(1970, 1, 1)
+BASE_DATETIME = datetime(1970, 1, 1)
+SPAN_DAYS = 200 * 366  # through the 2160s
+DEFAULT_WEEKDAYS = (0, 1, 2, 3, 4)  # Monday to Friday (date.weekday())
+
+def weekday_mask(weekdays: Iterable[int]) -> int:
+    mask = 0
+    for d in weekdays:
+        mask |= 1 << d
+    return mask
+
+def mask_weekdays(mask: int):
+    return [d for d in range(7) if mask >> d & 1]
+
+class WorkingCalendar:
+    def __init__(self, weekdays: Iterable[int] = DEFAULT_WEEKDAYS, holidays: Iterable[date] = ()):
+        self.weekdays = tuple(sorted(set(weekdays)))
+        if not self.weekdays:
+            raise ValueError("A calendar needs at least one working weekday")
+        self.holidays = tuple(sorted(set(holidays)))
+
+        days = np.arange(SPAN_DAYS)
+        working = np.isin((days + BASE.weekday()) % 7, self.weekdays)
+        off = np.array([(h - BASE).days for h in self.holidays], dtype=np.int64)
+        working[off[(off >= 0) & (off < SPAN_DAYS)]] = False
+
+        self.working = working
+        # before[d]: working days strictly before day d (len SPAN_DAYS + 1)
+        self.before = np.concatenate(([0], np.cumsum(working)))
+        # working_days[k]: day number of the k-th working day
+        self.working_days = np.flatnonzero(working)
+        digest = hashlib.sha1(",".join(h.isoformat() for h in self.holidays).encode()).hexdigest()[:12]
+        # Identifies the calendar contents (see ProjectSchedule.calendar_key)
+        self.key = f"{weekday_mask(self.weekdays)}:{digest}"
+
+    @staticmethod
+    def day_number(d: date) -> int:
+        n = (d - BASE).days
+        if not 0 <= n < SPAN_DAYS:
+            raise ValueError(f"Date {d} is outside the supported calendar range")
+        return n
+
+    def is_working(self, day):
+        """day: day number(s) since BASE."""
+        return self.working[day]
+
+    def offset(self, day):
+        """Working-day offset of day number(s): working days before it."""
+        return self.before[day]
+
+    def day_at(self, offset):
+        """Day number(s) of the working day(s) at offset(s)."""
+        return self.working_days[offset]
+
+    def count(self, start: date, end: date) -> int:
+        """Working days in [start, end] (inclusive); 0 if end < start."""
+        return max(0, int(self.before[self.day_number(end) + 1] - self.before[self.day_number(start)]))
+
+    def between(self, start: date, end: date) -> int:
+        """Working days in [start, end), the working-time analogue of (end - start).days."""
+        return int(self.before[self.day_number(end)] - self.before[self.day_number(start)])
+
+    def add(self, start: date, days: int) -> date:
+        """The working day `days` working days after the first working day on/after start."""
+        k = int(self.before[self.day_number(start)]) + days
+        return BASE + timedelta(days=int(self.working_days[k]))
+
+    def subtract(self, end: date, days: int) -> date:
+        """The working day `days` working days before the last working day on/before end."""
+        k = int(self.before[self.day_number(end) + 1]) - 1 - days
+        return BASE + timedelta(days=int(self.working_days[k]))
+
+    def to_time(self, dt: datetime) -> int:
+        """Working time of a datetime, in microseconds."""
+        day = self.day_number(dt.date())
+        time_of_day = 0
+        if self.working[day]:
+            time_of_day = ((dt.hour * 60 + dt.minute) * 60 + dt.second) * 1_000_000 + dt.microsecond
+        return int(self.before[day]) * DAY + time_of_day
+
+    def from_time(self, value: int) -> datetime:
+        k, rest = divmod(value, DAY)
+        return BASE_DATETIME + timedelta(days=int(self.working_days[k]), microseconds=rest)
+
+@lru_cache(maxsize=64)
+def _cached(weekdays: tuple, holidays: tuple) -> WorkingCalendar:
+    return WorkingCalendar(weekdays, holidays)
+
+def get_calendar(weekdays: Iterable[int], holidays: Iterable[date]) -> WorkingCalendar:
+    """Shared, immutable calendar instance; building one costs a few milliseconds."""
+    return _cached(tuple(sorted(set(weekdays))), tuple(sorted(set(holidays or ()))))
+
+def calendar_key(calendar: Optional[WorkingCalendar]) -> Optional[str]:
+    return calendar.key if calendar else None
@@ -0,0 +1,83 @@
+"""
+Team workload as a users x days matrix.
+
+Every (assignee, open task) pair puts EFFORT_HOURS of work on the assignee,
+spread evenly over the working days of the task's inclusive start..due span
+(all days when the user has no calendar). Spreading is a difference array
+per user (+effort on the first day in the window, -effort after the last)
+followed by a cumulative sum, then masked by each user's working days, so
+the cost is linear in pairs + users x days whatever the task lengths.
+
+Days are day numbers since 1970-01-01, as in app.core.working_calendar.
+"""
+
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from app.core.leveling import CAPACITY_TOLERANCE, DEFAULT_CAPACITY, EFFORT_HOURS
+from app.core.working_calendar import SPAN_DAYS, WorkingCalendar
+
+class Workload(NamedTuple):
+    # Hours per user and day
+    hours: np.ndarray
+    # Tasks active per user and day
+    counts: np.ndarray
+    # Users with a day over capacity
+    overallocated: np.ndarray
+
+def day_numbers(values) -> np.ndarray:
+    """Day numbers of a sequence of dates/datetimes."""
+    days = np.asarray(values, dtype="datetime64[D]")
+    return (days - np.datetime64("1970-01-01", "D")).astype(np.int64)
+
+def spread_workload(
+    user, start, due, n_users: int, first_day: int, days: int,
+    calendars: Optional[List[Optional[WorkingCalendar]]] = None,
+    capacity: float = DEFAULT_CAPACITY,
+) -> Workload:
+    """
+    user: row index (0..n_users) of the assignee of each pair.
+    start/due: first and last day number of each pair's task (inclusive).
+    first_day/days: the window reported.
+    calendars: per user row, a calendar or None (every day is worked).
+    """
+    user = np.asarray(user, dtype=np.int64)
+    start = np.asarray(start, dtype=np.int64)
+    due = np.asarray(due, dtype=np.int64)
+
+    # Task length in days the effort is spread over, per pair
+    span = due - start + 1
+    working = np.ones((n_users, days), dtype=bool)
+    if calendars is not None:
+        # Users sharing a calendar are handled together
+        by_key = {}
+        group = np.full(n_users, -1, dtype=np.int64)
+        for i, calendar in enumerate(calendars):
+            if calendar is not None:
+                group[i] = by_key.setdefault(calendar.key, (len(by_key), calendar))[0]
+        pair_group = group[user]
+        for g, calendar in by_key.values():
+            working[group == g] = calendar.working[first_day:first_day + days]
+            rows = pair_group == g
+            s = np.clip(start[rows], 0, SPAN_DAYS)
+            e = np.clip(due[rows] + 1, 0, SPAN_DAYS)
+            span[rows] = calendar.before[e] - calendar.before[s]
+
+    first = np.clip(start - first_day, 0, days)
+    last = np.clip(due - first_day + 1, 0, days)
+    keep = (span > 0) & (first < last)
+    user, first, last = user[keep], first[keep], last[keep]
+    effort = EFFORT_HOURS / span[keep]
+
+    hours = np.zeros((n_users, days + 1))
+    np.add.at(hours, (user, first), effort)
+    np.add.at(hours, (user, last), -effort)
+    counts = np.zeros((n_users, days + 1), dtype=np.int64)
+    np.add.at(counts, (user, first), 1)
+    np.add.at(counts, (user, last), -1)
+
+    hours = np.cumsum(hours, axis=1)[:, :-1] * working
+    counts = np.cumsum(counts, axis=1)[:, :-1] * working
+    overallocated = (hours > capacity + CAPACITY_TOLERANCE).any(axis=1)
+    return Workload(hours, counts, overallocated)
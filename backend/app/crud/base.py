@@ -1,27 +1,57 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 from uuid import UUID
 from pydantic import BaseModel
+from sqlalchemy import tuple_, literal
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.db.session import Base
 from app.core.utils import clean_dict_datetimes
+from app.core.pagination import decode_cursor, cursor_after
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # List order and keyset for cursor pagination; must end in a unique column
+    keyset: Tuple[str, ...] = ("id",)
+    keyset_descending: bool = False
+
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
+    def paginate(self, query, *, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        """
+        Order query by the keyset and page it. With a cursor the page starts
+        right after the cursor's row (keyset pagination, served by the
+        composite index); otherwise the legacy offset applies.
+        Raises InvalidCursorError for a malformed cursor.
+        """
+        columns = [getattr(self.model, name) for name in self.keyset]
+        if cursor:
+            values = decode_cursor(cursor, [c.type.python_type for c in columns])
+            key = tuple_(*columns)
+            bound = tuple_(*[literal(v, c.type) for v, c in zip(values, columns)])
+            query = query.filter(key < bound if self.keyset_descending else key > bound)
+        elif skip:
+            query = query.offset(skip)
+        order = [c.desc() if self.keyset_descending else c.asc() for c in columns]
+        return query.order_by(*order).limit(limit)
+
+    def next_cursor(self, items: Sequence[Any], limit: int) -> Optional[str]:
+        """Cursor of the page after items, or None if this was the last page."""
+        if not items or len(items) < limit:
+            return None
+        return cursor_after(items[-1], self.keyset)
+
     async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
         result = await db.execute(select(self.model).filter(self.model.id == id))
         return result.scalars().first()
 
     async def get_multi(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
     ) -> List[ModelType]:
-        result = await db.execute(select(self.model).offset(skip).limit(limit))
+        result = await db.execute(self.paginate(select(self.model), skip=skip, limit=limit, cursor=cursor))
         return result.scalars().all()
 
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
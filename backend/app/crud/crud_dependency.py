@@ -1,11 +1,16 @@
-from typing import List, Optional
-from uuid import UUID
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid4
+from sqlalchemy import exists, insert, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import aliased
 from app.crud.base import CRUDBase
 from app.models.dependency import Dependency
+from app.models.task import Task
 from app.schemas.task import DependencyCreate
-from app.core.dependencies import has_cycle
+from app.core.dependencies import find_cycle
+from app.core.dependency_graph import ProjectGraph, dependency_graphs, reaches
+from app.crud.crud_task import _any_of
 
 class CRUDDependency(CRUDBase[Dependency, DependencyCreate, DependencyCreate]):
     async def create(self, db: AsyncSession, *, obj_in: DependencyCreate) -> Dependency:
@@ -13,31 +18,214 @@ class CRUDDependency(CRUDBase[Dependency, DependencyCreate, DependencyCreate]):
         if obj_in.successor_id == obj_in.predecessor_id:
             raise ValueError("Item cannot block itself")
 
-        # 2. Check for circular dependency
-        # We need the full graph to check. 
-        # For simplicity, we fetch all dependencies related to these items or just the whole project?
-        # A more robust check fetches the dependency map.
-        
-        # Build dependency map (Predecessor -> List of Successors)
-        # Actually, has_cycle expects Successor -> List of Predecessors (blockers)
-        all_deps_res = await db.execute(select(Dependency))
-        all_deps = all_deps_res.scalars().all()
-        
-        dep_map = {}
-        for d in all_deps:
-            if d.successor_id not in dep_map:
-                dep_map[d.successor_id] = []
-            dep_map[d.successor_id].append(d.predecessor_id)
-            
-        # Add the candidate dependency
-        if obj_in.successor_id not in dep_map:
-            dep_map[obj_in.successor_id] = []
-        dep_map[obj_in.successor_id].append(obj_in.predecessor_id)
-        
-        if has_cycle(obj_in.successor_id, dep_map):
+        # 2. Check for circular dependency: the new link closes a cycle
+        # if the predecessor is already downstream of the successor
+        if await self.would_create_cycle(db, predecessor_id=obj_in.predecessor_id, successor_id=obj_in.successor_id):
             raise ValueError("Circular dependency detected")
 
-        return await super().create(db, obj_in=obj_in)
+        db_obj = self.model(**obj_in.dict())
+        db.add(db_obj)
+        await db.flush()
+        await self._reschedule_ends(db, db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        await self._update_graph_cache(db, db_obj, added=True)
+        return db_obj
+
+    async def create_bulk(self, db: AsyncSession, *, objs_in: List[DependencyCreate]) -> List[Dict[str, Any]]:
+        """
+        Validate and insert many links at once. One query checks the tasks,
+        one recursive query loads every existing link downstream of the new
+        successors (all a new link could close a cycle through) plus their
+        current predecessors. The links are then validated in order, in
+        memory, each against the existing graph plus the links accepted
+        before it, and the accepted ones are written with a single INSERT.
+
+        Returns one result per input, in order: status is "created",
+        "exists", "invalid" or "cycle" (with the offending path, successor
+        first, following successor links back to it).
+        """
+        results = [
+            {"index": i, "successor_id": d.successor_id, "predecessor_id": d.predecessor_id,
+             "status": None, "detail": None, "dependency_id": None, "cycle": None}
+            for i, d in enumerate(objs_in)
+        ]
+        if not objs_in:
+            return results
+        task_ids = {d.successor_id for d in objs_in} | {d.predecessor_id for d in objs_in}
+        res = await db.execute(select(Task.id, Task.project_id).filter(_any_of(Task.id, task_ids)))
+        project_of = dict(res.all())
+        successor_ids = {d.successor_id for d in objs_in if d.successor_id in project_of}
+
+        successors: Dict[UUID, List[UUID]] = {}
+        existing = set()
+        if successor_ids:
+            downstream = (
+                select(Task.id.label("id")).filter(_any_of(Task.id, successor_ids))
+                .cte("downstream", recursive=True)
+            )
+            downstream = downstream.union(
+                select(Dependency.successor_id).join(downstream, Dependency.predecessor_id == downstream.c.id)
+            )
+            res = await db.execute(
+                select(Dependency.predecessor_id, Dependency.successor_id).filter(or_(
+                    Dependency.predecessor_id.in_(select(downstream.c.id)),
+                    _any_of(Dependency.successor_id, successor_ids),
+                ))
+            )
+            for pred_id, succ_id in res.all():
+                successors.setdefault(pred_id, []).append(succ_id)
+                existing.add((pred_id, succ_id))
+
+        rows = []
+        for obj_in, result in zip(objs_in, results):
+            pred_id, succ_id = obj_in.predecessor_id, obj_in.successor_id
+            if pred_id == succ_id:
+                result.update(status="invalid", detail="Item cannot block itself")
+            elif pred_id not in project_of or succ_id not in project_of:
+                result.update(status="invalid", detail="Task not found")
+            elif (pred_id, succ_id) in existing:
+                result.update(status="exists", detail="Dependency already exists")
+            else:
+                links = successors.setdefault(pred_id, [])
+                links.append(succ_id)
+                # The graph was acyclic, so any cycle now runs through the new link
+                cycle = find_cycle(succ_id, lambda u: successors.get(u, ()))
+                if cycle:
+                    links.pop()
+                    result.update(status="cycle", detail="Circular dependency detected", cycle=cycle)
+                    continue
+                existing.add((pred_id, succ_id))
+                row = {"id": uuid4(), **obj_in.dict()}
+                rows.append(row)
+                result.update(status="created", dependency_id=row["id"])
+
+        if rows:
+            await db.execute(insert(Dependency), rows)
+            await self._reschedule_links(db, rows, project_of)
+            await db.commit()
+        return results
+
+    async def remove(self, db: AsyncSession, *, id: UUID) -> Optional[Dependency]:
+        obj = await self.get(db, id)
+        if obj:
+            await db.delete(obj)
+            await db.flush()
+            await self._reschedule_ends(db, obj)
+            await db.commit()
+            await self._update_graph_cache(db, obj, added=False)
+        return obj
+
+    async def would_create_cycle(self, db: AsyncSession, *, predecessor_id: UUID, successor_id: UUID) -> bool:
+        """
+        Whether predecessor_id is reachable from successor_id along successor
+        links. Walks the cached per-project graphs of the projects actually
+        reached; a cold or outdated project (or a task outside any project)
+        sends the whole question to one recursive query instead.
+        """
+        from app.models.project import Project
+        res = await db.execute(
+            select(Task.project_id, Project.revision)
+            .outerjoin(Project, Project.id == Task.project_id)
+            .filter(Task.id == successor_id)
+        )
+        row = res.first()
+        if row is None:
+            return False
+        project_id, revision = row
+        if project_id is None:
+            return await self._reaches_sql(db, successor_id, predecessor_id)
+
+        visited = {successor_id}
+        pending = {project_id: [successor_id]}
+        revisions = {project_id: revision}
+        while pending:
+            project_id, sources = pending.popitem()
+            if project_id is None:
+                return await self._reaches_sql(db, successor_id, predecessor_id)
+            if project_id not in revisions:
+                revisions[project_id] = await db.scalar(select(Project.revision).filter(Project.id == project_id))
+            graph = dependency_graphs.get(project_id, revisions[project_id])
+            if graph is None:
+                found = await self._reaches_sql(db, successor_id, predecessor_id)
+                # Warm the cold project for the next check that reaches it
+                await self._load_graph(db, project_id, revisions[project_id])
+                return found
+            if any(t not in graph.tasks for t in sources):
+                # A link recorded in another entry points at a task that has moved
+                return await self._reaches_sql(db, successor_id, predecessor_id)
+            found, crossings = reaches(graph, project_id, sources, predecessor_id, visited)
+            if found:
+                return True
+            for other, tasks in crossings.items():
+                pending.setdefault(other, []).extend(tasks)
+        return False
+
+    async def _reaches_sql(self, db: AsyncSession, start_id: UUID, target_id: UUID) -> bool:
+        """Downstream reachability as a recursive CTE. UNION (not UNION ALL)
+        drops rows already seen, so it terminates on any graph, and EXISTS
+        stops reading the CTE at the first hit."""
+        downstream = (
+            select(Dependency.successor_id.label("id"))
+            .filter(Dependency.predecessor_id == start_id)
+            .cte("downstream", recursive=True)
+        )
+        downstream = downstream.union(
+            select(Dependency.successor_id).join(downstream, Dependency.predecessor_id == downstream.c.id)
+        )
+        return bool(await db.scalar(select(exists().where(downstream.c.id == target_id))))
+
+    async def _load_graph(self, db: AsyncSession, project_id: UUID, revision: int) -> ProjectGraph:
+        """Every task of the project with its outgoing links, in one query."""
+        successor = aliased(Task)
+        res = await db.execute(
+            select(Task.id, Dependency.successor_id, successor.project_id)
+            .select_from(Task)
+            .outerjoin(Dependency, Dependency.predecessor_id == Task.id)
+            .outerjoin(successor, successor.id == Dependency.successor_id)
+            .filter(Task.project_id == project_id)
+        )
+        graph = ProjectGraph.from_rows(revision, res.all())
+        dependency_graphs.put(project_id, graph)
+        return graph
+
+    async def _update_graph_cache(self, db: AsyncSession, dep: Dependency, *, added: bool):
+        """Apply a committed link change to the cached graphs of both ends (see apply_link)."""
+        from app.models.project import Project
+        res = await db.execute(
+            select(Task.id, Task.project_id, Project.revision)
+            .join(Project, Project.id == Task.project_id)
+            .filter(Task.id.in_([dep.predecessor_id, dep.successor_id]))
+        )
+        ends = {task_id: (project_id, revision) for task_id, project_id, revision in res.all()}
+        predecessor_project = ends.get(dep.predecessor_id, (None, None))[0]
+        successor_project = ends.get(dep.successor_id, (None, None))[0]
+        dependency_graphs.apply_link(
+            dep.predecessor_id, dep.successor_id, successor_project, predecessor_project,
+            {project_id: revision for project_id, revision in ends.values()}, added=added,
+        )
+
+    async def _reschedule_ends(self, db: AsyncSession, dep: Dependency):
+        """Incremental CPM update and revision bump for the projects on both ends of the link."""
+        res = await db.execute(
+            select(Task.id, Task.project_id).filter(Task.id.in_([dep.predecessor_id, dep.successor_id]))
+        )
+        await self._reschedule_links(
+            db, [{"predecessor_id": dep.predecessor_id, "successor_id": dep.successor_id}], dict(res.all())
+        )
+
+    async def _reschedule_links(self, db: AsyncSession, links: List[Dict[str, Any]], project_of: Dict[UUID, UUID]):
+        """Incremental CPM update and revision bump, once per project, for the ends of these links."""
+        from app.crud.crud_task import task as crud_task
+        changed: Dict[UUID, set] = {}
+        for link in links:
+            for task_id in (link["predecessor_id"], link["successor_id"]):
+                if project_of.get(task_id):
+                    changed.setdefault(project_of[task_id], set()).add(task_id)
+        for project_id, changed_ids in changed.items():
+            await crud_task.refresh_schedule(db, project_id=project_id, changed_ids=list(changed_ids))
+            crud_task.mark_project_changed(db, project_id)
+        await crud_task.flush_project_aggregates(db)
 
     async def get_by_successor(self, db: AsyncSession, successor_id: UUID) -> List[Dependency]:
         result = await db.execute(select(self.model).filter(self.model.successor_id == successor_id))
@@ -19,6 +19,10 @@ from app.models.project import Project as ProjectModel
 from app.schemas.project import ProjectCreate
 
 class CRUDIdea(CRUDBase[Idea, IdeaCreate, IdeaUpdate]):
+    # Newest first
+    keyset = ("created_at", "id")
+    keyset_descending = True
+
     async def get(self, db: AsyncSession, id: Any, current_user_id: Optional[UUID] = None) -> Optional[Idea]:
         query = select(self.model).filter(self.model.id == id).options(
             selectinload(Idea.author),
@@ -59,22 +63,18 @@ class CRUDIdea(CRUDBase[Idea, IdeaCreate, IdeaUpdate]):
         return db_obj
 
     async def get_multi_by_project(
-        self, db: AsyncSession, *, project_id: UUID, task_id: Optional[UUID] = None, skip: int = 0, limit: int = 100, current_user_id: Optional[UUID] = None
+        self, db: AsyncSession, *, project_id: UUID, task_id: Optional[UUID] = None, skip: int = 0, limit: int = 100, current_user_id: Optional[UUID] = None,
+        cursor: Optional[str] = None
     ) -> List[Idea]:
         query = select(self.model).filter(self.model.project_id == project_id)
         if task_id:
             query = query.filter(self.model.task_id == task_id)
             
-        result = await db.execute(
-            query
-            .order_by(self.model.created_at.desc())
-            .options(
-                selectinload(Idea.author),
-                selectinload(Idea.threaded_comments).options(selectinload(Comment.author))
-            )
-            .offset(skip)
-            .limit(limit)
+        query = query.options(
+            selectinload(Idea.author),
+            selectinload(Idea.threaded_comments).options(selectinload(Comment.author))
         )
+        result = await db.execute(self.paginate(query, skip=skip, limit=limit, cursor=cursor))
         ideas = result.scalars().all()
         
         for idea in ideas:
@@ -107,7 +107,8 @@ class CRUDIdea(CRUDBase[Idea, IdeaCreate, IdeaUpdate]):
         return ideas
 
     async def get_multi_by_user(
-        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100, current_user_id: Optional[UUID] = None
+        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100, current_user_id: Optional[UUID] = None,
+        cursor: Optional[str] = None
     ) -> List[Idea]:
         from app.models.project import Project
         from app.models.associations import project_members
@@ -126,16 +127,13 @@ class CRUDIdea(CRUDBase[Idea, IdeaCreate, IdeaUpdate]):
                 )
             )
             .distinct()
-            .order_by(self.model.created_at.desc())
             .options(
                 selectinload(Idea.author),
                 selectinload(Idea.threaded_comments).options(selectinload(Comment.author))
             )
-            .offset(skip)
-            .limit(limit)
         )
 
-        result = await db.execute(query)
+        result = await db.execute(self.paginate(query, skip=skip, limit=limit, cursor=cursor))
         ideas = result.scalars().all()
 
         for idea_obj in ideas:
@@ -8,6 +8,10 @@ from app.models.notification import Notification
 from app.schemas.notification import NotificationCreate, NotificationUpdate, Notification as NotificationSchema
 
 class CRUDNotification(CRUDBase[Notification, NotificationCreate, NotificationUpdate]):
+    # Newest first
+    keyset = ("created_at", "id")
+    keyset_descending = True
+
     async def create(self, db: AsyncSession, *, obj_in: NotificationCreate) -> Notification:
         db_obj = await super().create(db, obj_in=obj_in)
         
@@ -30,15 +34,41 @@ class CRUDNotification(CRUDBase[Notification, NotificationCreate, NotificationUp
             
         return db_obj
 
+    async def create_multi(self, db: AsyncSession, *, objs_in: List[NotificationCreate]) -> List[Notification]:
+        """
+        Insert many notifications in one flush/commit, then push them over the
+        WebSocket in one pass.
+        """
+        if not objs_in:
+            return []
+        db_objs = [self.model(**obj_in.dict()) for obj_in in objs_in]
+        db.add_all(db_objs)
+        await db.commit()
+
+        try:
+            from app.core.websockets import manager
+            from app.core.utils import clean_dict_for_json
+
+            for db_obj in db_objs:
+                notification_data = clean_dict_for_json(NotificationSchema.model_validate(db_obj).model_dump())
+                await manager.send_personal_message(
+                    {"type": "new_notification", "data": notification_data},
+                    user_id=db_obj.user_id
+                )
+        except Exception as e:
+            import logging
+            logging.getLogger(__name__).error(f"WebSocket broadcast failed: {e}")
+
+        return db_objs
+
     async def get_multi_by_user(
-        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100
+        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
     ) -> List[Notification]:
         result = await db.execute(
-            select(self.model)
-            .filter(self.model.user_id == user_id)
-            .order_by(self.model.created_at.desc())
-            .offset(skip)
-            .limit(limit)
+            self.paginate(
+                select(self.model).filter(self.model.user_id == user_id),
+                skip=skip, limit=limit, cursor=cursor
+            )
         )
         return result.scalars().all()
 
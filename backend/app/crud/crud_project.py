@@ -1,7 +1,8 @@
 from typing import List, Optional, Any, Union, Dict
-from uuid import UUID
+from uuid import UUID, uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import insert
 from sqlalchemy.orm import selectinload
 
 from app.crud.base import CRUDBase
@@ -10,10 +11,11 @@ from app.models.metadata import Topic, WorkType
 from app.models.template import ProjectTemplate
 from app.models.user import User
 from app.schemas.project import ProjectCreate, ProjectUpdate
-from app.schemas.task import TaskCreate
 from app.core.utils import clean_dict_datetimes
 
 class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
+    keyset = ("created_at", "id")
+
     async def get(self, db: AsyncSession, id: Any) -> Optional[Project]:
         result = await db.execute(
             select(self.model)
@@ -30,25 +32,21 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
         return result.scalars().first()
 
     async def get_multi(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100, include_archived: bool = False
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100, include_archived: bool = False, cursor: Optional[str] = None
     ) -> List[Project]:
         query = select(self.model)
         if not include_archived:
             query = query.filter(self.model.is_archived == False)
             
-        result = await db.execute(
-            query
-            .options(
-                selectinload(Project.topic_ref),
-                selectinload(Project.type_ref),
-                selectinload(Project.topics),
-                selectinload(Project.types),
-                selectinload(Project.members),
-                selectinload(Project.owner)
-            )
-            .offset(skip)
-            .limit(limit)
+        query = query.options(
+            selectinload(Project.topic_ref),
+            selectinload(Project.type_ref),
+            selectinload(Project.topics),
+            selectinload(Project.types),
+            selectinload(Project.members),
+            selectinload(Project.owner)
         )
+        result = await db.execute(self.paginate(query, skip=skip, limit=limit, cursor=cursor))
         return result.scalars().all()
 
     async def create(self, db: AsyncSession, *, obj_in: ProjectCreate) -> Project:
@@ -111,67 +109,74 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
             return
 
         from app.crud.crud_task import task as crud_task
+        from app.core.task_plan import plan_task_forest
+        from app.schemas.task import TaskBulkItem
 
-        # 1. Instantiate Scoped Topics
+        # 1. Instantiate Scoped Topics & WorkTypes (ids generated up front, one INSERT each)
         topic_map = {} # template_id -> new_id
+        topic_rows = []
         for t_preset in (template.topics_preset or []):
-            new_topic = Topic(
-                name=t_preset["name"],
-                color=t_preset.get("color", "#64748b"),
-                project_id=project_id
-            )
-            db.add(new_topic)
-            await db.flush()
-            topic_map[t_preset.get("id")] = new_topic.id
+            new_id = uuid4()
+            topic_rows.append({
+                "id": new_id,
+                "name": t_preset["name"],
+                "color": t_preset.get("color", "#64748b"),
+                "project_id": project_id
+            })
+            topic_map[t_preset.get("id")] = new_id
 
-        # 2. Instantiate Scoped WorkTypes
         type_map = {}
+        type_rows = []
         for w_preset in (template.work_types_preset or []):
-            new_type = WorkType(
-                name=w_preset["name"],
-                color=w_preset.get("color", "#64748b"),
-                icon=w_preset.get("icon"),
-                project_id=project_id
-            )
-            db.add(new_type)
-            await db.flush()
-            type_map[w_preset.get("id")] = new_type.id
+            new_id = uuid4()
+            type_rows.append({
+                "id": new_id,
+                "name": w_preset["name"],
+                "color": w_preset.get("color", "#64748b"),
+                "icon": w_preset.get("icon"),
+                "project_id": project_id
+            })
+            type_map[w_preset.get("id")] = new_id
 
-        # 3. Instantiate Hierarchical Tasks
-        async def create_recursive_tasks(tasks_data, parent_id=None):
-            for t_data in tasks_data:
-                # Resolve topic/type from maps if they match template IDs
-                t_topic_id = topic_map.get(t_data.get("topic_id"))
-                t_type_id = type_map.get(t_data.get("type_id"))
-                
-                # If not in map, maybe it's already a real UUID (global)
-                if not t_topic_id and t_data.get("topic_id"):
-                    try: t_topic_id = UUID(t_data["topic_id"])
-                    except: pass
-                if not t_type_id and t_data.get("type_id"):
-                    try: t_type_id = UUID(t_data["type_id"])
-                    except: pass
+        if topic_rows:
+            await db.execute(insert(Topic), topic_rows)
+        if type_rows:
+            await db.execute(insert(WorkType), type_rows)
 
-                task_in = TaskCreate(
+        # 2. Compile the task hierarchy into one insert plan
+        def resolve(mapping, value):
+            # Template-scoped id first, otherwise maybe it's already a real UUID (global)
+            if mapping.get(value):
+                return mapping[value]
+            if value:
+                try: return UUID(value)
+                except: pass
+            return None
+
+        def to_items(tasks_data):
+            return [
+                TaskBulkItem(
                     title=t_data["title"],
                     description=t_data.get("description"),
                     status=t_data.get("status", "Todo"),
                     priority=t_data.get("priority", "Medium"),
-                    project_id=project_id,
-                    parent_id=parent_id,
-                    topic_id=t_topic_id,
-                    type_id=t_type_id,
+                    topic_id=resolve(topic_map, t_data.get("topic_id")),
+                    type_id=resolve(type_map, t_data.get("type_id")),
                     is_milestone=t_data.get("is_milestone", False),
-                    sort_index=t_data.get("sort_index", 0)
+                    sort_index=t_data.get("sort_index", 0),
+                    subtasks=to_items(t_data.get("subtasks") or [])
                 )
-                
-                new_task = await crud_task.create(db, obj_in=task_in, owner_id=owner_id)
-                
-                if t_data.get("subtasks"):
-                    await create_recursive_tasks(t_data["subtasks"], parent_id=new_task.id)
+                for t_data in tasks_data
+            ]
 
         if template.tasks_json:
-            await create_recursive_tasks(template.tasks_json)
+            from app.crud.crud_work_calendar import work_calendar
+            plan = plan_task_forest(
+                to_items(template.tasks_json), project_id=project_id, owner_id=owner_id,
+                calendar=await work_calendar.for_project(db, project_id),
+            )
+            # Bulk insert, one rollup and one aggregate update computed from the plan
+            await crud_task.insert_plan(db, plan=plan, notify=False, load=False)
         
         await db.commit()
 
@@ -210,32 +215,29 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
             else:
                 db_obj.members = []
 
+        update_data["revision"] = Project.revision + 1
         return await super().update(db, db_obj=db_obj, obj_in=update_data)
 
     async def get_multi_by_owner(
-        self, db: AsyncSession, *, owner_id: UUID, skip: int = 0, limit: int = 100, include_archived: bool = False
+        self, db: AsyncSession, *, owner_id: UUID, skip: int = 0, limit: int = 100, include_archived: bool = False, cursor: Optional[str] = None
     ) -> List[Project]:
         query = select(self.model).filter(self.model.owner_id == owner_id)
         if not include_archived:
             query = query.filter(self.model.is_archived == False)
             
-        result = await db.execute(
-            query
-            .options(
-                selectinload(Project.topic_ref),
-                selectinload(Project.type_ref),
-                selectinload(Project.topics),
-                selectinload(Project.types),
-                selectinload(Project.members),
-                selectinload(Project.owner)
-            )
-            .offset(skip)
-            .limit(limit)
+        query = query.options(
+            selectinload(Project.topic_ref),
+            selectinload(Project.type_ref),
+            selectinload(Project.topics),
+            selectinload(Project.types),
+            selectinload(Project.members),
+            selectinload(Project.owner)
         )
+        result = await db.execute(self.paginate(query, skip=skip, limit=limit, cursor=cursor))
         return result.scalars().all()
 
     async def get_multi_by_user(
-        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100, include_archived: bool = False
+        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100, include_archived: bool = False, cursor: Optional[str] = None
     ) -> List[Project]:
         """
         Fetch projects where the user is either the owner OR a member.
@@ -268,10 +270,8 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
                 selectinload(Project.members),
                 selectinload(Project.owner)
             )
-            .offset(skip)
-            .limit(limit)
         )
-        result = await db.execute(query)
+        result = await db.execute(self.paginate(query, skip=skip, limit=limit, cursor=cursor))
         return result.scalars().all()
 
 project = CRUDProject(Project)
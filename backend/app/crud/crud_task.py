@@ -1,82 +1,117 @@
-from typing import List, Union, Dict, Any, Optional
-from uuid import UUID
-from datetime import datetime
+from typing import Iterable, List, Union, Dict, Any, Optional
+from uuid import UUID, uuid4
+from datetime import datetime, timedelta
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+import numpy as np
+from sqlalchemy import and_, or_, any_, bindparam, event, true, false, func, case, literal, null, insert, delete, update as sql_update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import Session, selectinload, aliased
+from sqlalchemy.orm.attributes import set_committed_value
+from starlette.concurrency import run_in_threadpool
 
 from app.crud.base import CRUDBase
 from app.models.task import Task
 from app.models.metadata import Topic, WorkType
-from app.schemas.task import TaskCreate, TaskUpdate
-from app.core.enums import Status
-from app.core.utils import clean_dict_datetimes
+from app.models.associations import task_assignees, task_topics, task_types
+from app.schemas.task import Task as TaskSchema, TaskCreate, TaskUpdate, TaskBulkCreate, TaskMove
+from app.core.enums import Priority, Status
+from app.core.utils import clean_dict_datetimes, sync_task_dates, shift_days, span_days
+from app.core.hierarchy import path_segment, build_path, descendants_range, is_descendant_path, ids_from_path, wbs_codes_from_paths
+from app.core.rollup import plan_rollup, ACTIVE_STATUSES
+from app.core.project_aggregates import (
+    task_progress, snapshot_task, record_change, record_completion, ProjectAggregateDelta, TaskSnapshot, ActivityKey,
+)
+from app.core.task_plan import TaskInsertPlan, plan_task_forest, plan_reorder
+from app.core.task_events import TaskState, diff_events, task_state
+from app.core.ordering import index_key, append_index
+from app.core.config import settings
+from app.core import result_cache
+from app.core.result_cache import ProjectResults
+from app.core.pagination import PagedRow
+from app.core.simulation import simulate, summarize, estimate_range, budget_iterations
+from app.core.leveling import DEFAULT_CAPACITY, add_load, level
+from app.core.portfolio import analyze_portfolio, health_score, risk_level, variance_days
+from app.core.working_calendar import calendar_key
+from app.crud.crud_work_calendar import work_calendar
+from app.core.cpm import (
+    DAY, DEPENDENCY_CODES, FS, NO_DEADLINE, from_micros, reschedule, schedule, slack_and_critical, task_duration, to_micros,
+)
+
+# Session.info keys for the per-session project aggregate accumulator
+PENDING_AGGREGATES_KEY = "pending_project_aggregates"
+AGGREGATE_BATCH_KEY = "project_aggregate_batch_depth"
+PENDING_REVISIONS_KEY = "pending_project_revisions"
+PENDING_ACTIVITY_KEY = "pending_completion_activity"
+PENDING_EVENTS_KEY = "pending_task_events"
+# Set when the transaction wrote tasks; the dashboard summaries are cleared once it commits
+DASHBOARD_STALE_KEY = "dashboard_summaries_stale"
+
+# task_events rows per INSERT statement (5 parameters each, asyncpg allows 32767)
+EVENT_INSERT_ROWS = 1000
+
+# Columns returned by view=compact (list/Kanban cards)
+COMPACT_FIELDS = (
+    "id", "project_id", "parent_id", "title", "status", "priority", "is_milestone",
+    "start_date", "due_date", "deadline_at", "completed_at", "sort_index", "assignee_ids",
+)
+# Fields a projection may return: the Task response schema's own columns,
+# so internal ones (path, sort_key) stay out of API responses
+PROJECTION_FIELDS = frozenset(
+    name for name, field in TaskSchema.model_fields.items()
+    if not field.exclude and name in Task.__table__.columns
+) | {"assignee_ids"}
+
+# Tie-break among equal slack when leveling resources (higher goes first)
+PRIORITY_RANK = {Priority.LOW: 0, Priority.MEDIUM: 1, Priority.HIGH: 2, Priority.CRITICAL: 3}
+
+# Projects rated by one portfolio health report
+PORTFOLIO_HEALTH_LIMIT = 1000
+
+# Days covered by the contribution heatmaps, today included
+HEATMAP_DAYS = 366
+
+# Predecessor states that satisfy a start-based link (SS/SF); FS/FF need Done
+STARTED_STATUSES = (*ACTIVE_STATUSES, Status.DONE)
+
+# Task columns synced against each other by create/update
+DATE_FIELDS = {"start_date", "due_date", "duration_days"}
+
+# Task columns that feed the persisted CPM schedule (see CRUDTask.refresh_schedule)
+SCHEDULE_FIELDS = {"start_date", "due_date", "duration_days", "completed_at", "deadline_at", "is_archived"}
+
+def _any_of(column, values):
+    # A single array parameter instead of one bind per id
+    return column == any_(bindparam(None, list(values), type_=ARRAY(PG_UUID(as_uuid=True))))
+
+@event.listens_for(Session, "after_commit")
+def _clear_dashboards_after_commit(session: Session):
+    if session.info.pop(DASHBOARD_STALE_KEY, False):
+        result_cache.dashboard_summaries.clear()
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_dashboards_on_rollback(session: Session, previous_transaction):
+    # Only a rollback of the whole transaction undoes its writes
+    if previous_transaction.parent is None:
+        session.info.pop(DASHBOARD_STALE_KEY, None)
 
 class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
+    # Paths are unique and follow the displayed (WBS) order
+    keyset = ("path", "id")
+
     async def get(self, db: AsyncSession, id: Any) -> Optional[Task]:
-        # Deep eager loading for recursive task structure (up to 3 levels)
-        result = await db.execute(
-            select(self.model)
-            .filter(self.model.id == id)
-            .options(
-                selectinload(Task.owner),
-                selectinload(Task.assignees),
-                selectinload(Task.blocked_by),
-                selectinload(Task.blocking),
-                selectinload(Task.topic_ref),
-                selectinload(Task.type_ref),
-                selectinload(Task.topics),
-                selectinload(Task.types),
-                selectinload(Task.project),
-                selectinload(Task.subtasks).options(
-                    selectinload(Task.owner),
-                    selectinload(Task.assignees),
-                    selectinload(Task.blocked_by),
-                    selectinload(Task.blocking),
-                    selectinload(Task.topic_ref),
-                    selectinload(Task.type_ref),
-                    selectinload(Task.topics),
-                    selectinload(Task.types),
-                    selectinload(Task.subtasks).options(
-                        selectinload(Task.owner),
-                        selectinload(Task.assignees),
-                        selectinload(Task.blocked_by),
-                        selectinload(Task.blocking),
-                        selectinload(Task.topic_ref),
-                        selectinload(Task.type_ref),
-                        selectinload(Task.topics),
-                        selectinload(Task.types),
-                        selectinload(Task.subtasks).options(
-                            selectinload(Task.owner),
-                            selectinload(Task.assignees),
-                            selectinload(Task.blocked_by),
-                            selectinload(Task.blocking),
-                            selectinload(Task.topic_ref),
-                            selectinload(Task.type_ref),
-                            selectinload(Task.topics),
-                            selectinload(Task.types),
-                            selectinload(Task.subtasks)
-                        )
-                    )
-                )
-            )
-        )
-        obj = result.scalars().first()
-        # Sort subtasks recursively
-        def sort_recursive(task):
-            if task.subtasks:
-                task.subtasks.sort(key=lambda x: (x.sort_index or 0, x.created_at))
-                for st in task.subtasks:
-                    sort_recursive(st)
-        
-        if obj:
-            sort_recursive(obj)
-        return obj
+        # Full subtree of arbitrary depth, loaded in a constant number of queries
+        roots = await self._load_forest(db, select(self.model.id).filter(self.model.id == id))
+        return roots[0] if roots else None
 
     async def get_multi_by_project(
-        self, db: AsyncSession, *, project_id: UUID, skip: int = 0, limit: int = 100, parent_id: Optional[UUID] = None, include_archived: bool = False
-    ) -> List[Task]:
-        query = select(self.model).filter(self.model.project_id == project_id)
+        self, db: AsyncSession, *, project_id: UUID, skip: int = 0, limit: int = 100, parent_id: Optional[UUID] = None, include_archived: bool = False,
+        fields: Optional[List[str]] = None, cursor: Optional[str] = None
+    ) -> Union[List[Task], List[dict]]:
+        query = select(self.model.id).filter(self.model.project_id == project_id)
         
         if not include_archived:
             query = query.filter(self.model.is_archived == False)
@@ -86,66 +121,308 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
         else:
             # Only top-level tasks by default
             query = query.filter(self.model.parent_id == None)
-            
+
+        # Paging applies to the roots; every root comes back with its whole subtree
+        query = self.paginate(query, skip=skip, limit=limit, cursor=cursor)
+        if fields:
+            return await self.get_projection(db, ids_query=query, fields=fields)
+        return await self._load_forest(db, query)
+
+    async def get_multi_by_assignee(
+        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100, fields: Optional[List[str]] = None,
+        cursor: Optional[str] = None
+    ) -> Union[List[Task], List[dict]]:
+        """
+        Active tasks assigned to user_id (outside archived projects), each with its full subtree.
+        With `fields`, flat rows holding only those fields (see get_projection).
+        """
+        from app.models.project import Project
+
+        query = (
+            select(self.model.id)
+            .join(task_assignees)
+            .outerjoin(Project, self.model.project_id == Project.id)
+            .filter(task_assignees.c.user_id == user_id)
+            .filter(self.model.is_archived == False)
+            .filter(or_(Project.id == None, Project.is_archived == False))
+        )
+        query = self.paginate(query, skip=skip, limit=limit, cursor=cursor)
+        if fields:
+            return await self.get_projection(db, ids_query=query, fields=fields)
+        return await self._load_forest(db, query)
+
+    def projection_fields(self, view: str = "full", fields: Optional[str] = None) -> Optional[List[str]]:
+        """
+        Resolve the `view` / `fields` query parameters of the list endpoints.
+        Returns None for the full nested representation, otherwise the field
+        names to select. Raises ValueError for unknown fields.
+        """
+        if fields:
+            requested = [f.strip() for f in fields.split(",") if f.strip()]
+        elif view == "compact":
+            requested = list(COMPACT_FIELDS)
+        else:
+            return None
+        unknown = [f for f in requested if f not in PROJECTION_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown task fields: {', '.join(unknown)}")
+        return list(dict.fromkeys(["id"] + requested))
+
+    async def get_projection(self, db: AsyncSession, *, ids_query, fields: List[str]) -> List[dict]:
+        """
+        Flat rows for the tasks selected by ids_query (a select of Task.id,
+        already filtered and paged), carrying only `fields`. The projection is
+        pushed into the SELECT and no relationship is loaded; "assignee_ids"
+        costs one extra query on the association table. The keyset columns are
+        selected too, and kept on the rows (PagedRow) for the next cursor
+        rather than returned.
+        """
+        columns = [getattr(self.model, f) for f in fields if f != "assignee_ids"]
+        keyset = [getattr(self.model, name).label(f"keyset_{name}") for name in self.keyset]
+        res = await db.execute(
+            select(*columns, *keyset)
+            .filter(self.model.id.in_(ids_query.scalar_subquery()))
+            .order_by(self.model.path.asc())
+        )
+        names, width = [c.key for c in columns], len(columns)
+        rows = [PagedRow(dict(zip(names, r[:width])), r[width:]) for r in res.all()]
+
+        if "assignee_ids" in fields and rows:
+            assignees = defaultdict(list)
+            res = await db.execute(
+                select(task_assignees.c.task_id, task_assignees.c.user_id)
+                .filter(_any_of(task_assignees.c.task_id, [r["id"] for r in rows]))
+            )
+            for task_id, user_id in res.all():
+                assignees[task_id].append(user_id)
+            for r in rows:
+                r["assignee_ids"] = assignees.get(r["id"], [])
+        return rows
+
+    async def get_tree(
+        self, db: AsyncSession, *, project_id: Optional[UUID] = None, root_id: Optional[UUID] = None, include_archived: bool = True
+    ) -> List[Task]:
+        """
+        Load a whole project (all top-level tasks) or the subtree under root_id,
+        with no depth limit. Subtasks are assembled in memory in sibling order.
+        """
+        if root_id:
+            query = select(self.model.id).filter(self.model.id == root_id)
+        else:
+            query = select(self.model.id).filter(
+                self.model.project_id == project_id,
+                self.model.parent_id == None
+            )
+            if not include_archived:
+                query = query.filter(self.model.is_archived == False)
+        return await self._load_forest(db, query)
+
+    async def _load_forest(self, db: AsyncSession, roots_query) -> List[Task]:
+        """
+        Fetch every task below the roots selected by roots_query with a single
+        recursive CTE, then one batched query per relationship
+        (assignees, dependencies, topics, types, owners, topic/type refs, projects).
+        The subtasks collections are wired up in memory, so no lazy load is
+        ever needed when serializing the returned trees.
+        """
+        from app.models.user import User
+        from app.models.project import Project
+        from app.models.dependency import Dependency
+
+        tree = (
+            select(self.model.id, true().label("is_root"))
+            .filter(self.model.id.in_(roots_query.scalar_subquery()))
+            .cte("task_tree", recursive=True)
+        )
+        # UNION (not UNION ALL) so a corrupted parent cycle cannot recurse forever
+        tree = tree.union(
+            select(self.model.id, false())
+            .join(tree, self.model.parent_id == tree.c.id)
+        )
+
+        # Ordering by the materialized path returns parents before children and
+        # siblings in (sort_key, created_at) order, so no sort is needed below
         result = await db.execute(
-            query
-            .order_by(self.model.sort_index.asc(), self.model.created_at.asc())
-            .options(
-                selectinload(Task.owner),
-                selectinload(Task.assignees),
-                selectinload(Task.blocked_by),
-                selectinload(Task.blocking),
-                selectinload(Task.topic_ref),
-                selectinload(Task.type_ref),
-                selectinload(Task.topics),
-                selectinload(Task.types),
-                selectinload(Task.project),
-                selectinload(Task.subtasks).options(
-                    selectinload(Task.owner),
-                    selectinload(Task.assignees),
-                    selectinload(Task.blocked_by),
-                    selectinload(Task.blocking),
-                    selectinload(Task.topic_ref),
-                    selectinload(Task.type_ref),
-                    selectinload(Task.topics),
-                    selectinload(Task.types),
-                    selectinload(Task.subtasks).options(
-                        selectinload(Task.owner),
-                        selectinload(Task.assignees),
-                        selectinload(Task.blocked_by),
-                        selectinload(Task.blocking),
-                        selectinload(Task.topic_ref),
-                        selectinload(Task.type_ref),
-                        selectinload(Task.topics),
-                        selectinload(Task.types),
-                        selectinload(Task.subtasks).options(
-                            selectinload(Task.owner),
-                            selectinload(Task.assignees),
-                            selectinload(Task.blocked_by),
-                            selectinload(Task.blocking),
-                            selectinload(Task.topic_ref),
-                            selectinload(Task.type_ref),
-                            selectinload(Task.topics),
-                            selectinload(Task.types),
-                            selectinload(Task.subtasks)
-                        )
-                    )
+            select(self.model, tree.c.is_root)
+            .join(tree, self.model.id == tree.c.id)
+            .order_by(self.model.path.asc())
+            .execution_options(populate_existing=True)
+        )
+        by_id: Dict[UUID, Task] = {}
+        root_ids = set()
+        for t, is_root in result.all():
+            by_id[t.id] = t
+            if is_root:
+                root_ids.add(t.id)
+        if not by_id:
+            return []
+
+        tasks = list(by_id.values())
+        ids = [t.id for t in tasks]
+
+        # M2M: assignees, topics, types
+        assignees = defaultdict(list)
+        res = await db.execute(
+            select(task_assignees.c.task_id, User)
+            .join(User, User.id == task_assignees.c.user_id)
+            .filter(_any_of(task_assignees.c.task_id, ids))
+        )
+        for task_id, user in res.all():
+            assignees[task_id].append(user)
+
+        topics = defaultdict(list)
+        res = await db.execute(
+            select(task_topics.c.task_id, Topic)
+            .join(Topic, Topic.id == task_topics.c.topic_id)
+            .filter(_any_of(task_topics.c.task_id, ids))
+        )
+        for task_id, topic in res.all():
+            topics[task_id].append(topic)
+
+        types = defaultdict(list)
+        res = await db.execute(
+            select(task_types.c.task_id, WorkType)
+            .join(WorkType, WorkType.id == task_types.c.type_id)
+            .filter(_any_of(task_types.c.task_id, ids))
+        )
+        for task_id, wtype in res.all():
+            types[task_id].append(wtype)
+
+        # Dependencies in both directions
+        blocked_by = defaultdict(list)
+        blocking = defaultdict(list)
+        res = await db.execute(
+            select(Dependency).filter(
+                or_(
+                    _any_of(Dependency.successor_id, ids),
+                    _any_of(Dependency.predecessor_id, ids)
                 )
             )
-            .offset(skip)
-            .limit(limit)
         )
-        tasks = result.scalars().all()
-        
-        def sort_recursive(task):
-            if task.subtasks:
-                task.subtasks.sort(key=lambda x: (x.sort_index or 0, x.created_at))
-                for st in task.subtasks:
-                    sort_recursive(st)
+        for dep in res.scalars().all():
+            blocked_by[dep.successor_id].append(dep)
+            blocking[dep.predecessor_id].append(dep)
+
+        # Many-to-one references
+        async def fetch_by_id(model, wanted):
+            wanted = {w for w in wanted if w}
+            if not wanted:
+                return {}
+            res = await db.execute(select(model).filter(_any_of(model.id, wanted)))
+            return {obj.id: obj for obj in res.scalars().all()}
+
+        owners = await fetch_by_id(User, (t.owner_id for t in tasks))
+        topic_refs = await fetch_by_id(Topic, (t.topic_id for t in tasks))
+        type_refs = await fetch_by_id(WorkType, (t.type_id for t in tasks))
+        projects = await fetch_by_id(Project, (t.project_id for t in tasks))
+
+        # Assemble the forest (rows already arrive in sort order)
+        children = defaultdict(list)
+        for t in tasks:
+            if t.parent_id in by_id:
+                children[t.parent_id].append(t)
 
         for t in tasks:
-            sort_recursive(t)
-        return tasks
+            set_committed_value(t, "subtasks", children.get(t.id, []))
+            set_committed_value(t, "assignees", assignees.get(t.id, []))
+            set_committed_value(t, "topics", topics.get(t.id, []))
+            set_committed_value(t, "types", types.get(t.id, []))
+            set_committed_value(t, "blocked_by", blocked_by.get(t.id, []))
+            set_committed_value(t, "blocking", blocking.get(t.id, []))
+            set_committed_value(t, "owner", owners.get(t.owner_id))
+            set_committed_value(t, "topic_ref", topic_refs.get(t.topic_id))
+            set_committed_value(t, "type_ref", type_refs.get(t.type_id))
+            set_committed_value(t, "project", projects.get(t.project_id))
+
+        return [t for t in tasks if t.id in root_ids]
+
+    async def get_wbs_codes(self, db: AsyncSession, *, project_id: UUID, include_archived: bool = True) -> Dict[UUID, str]:
+        """
+        WBS codes for every task of a project, from a single ORDER BY path scan.
+        """
+        query = select(self.model.id, self.model.path).filter(self.model.project_id == project_id, self.model.path != None)
+        if not include_archived:
+            query = query.filter(self.model.is_archived == False)
+        result = await db.execute(query.order_by(self.model.path.asc()))
+        return wbs_codes_from_paths(result.all())
+
+    async def get_project_results(self, db: AsyncSession, *, project_id: UUID) -> ProjectResults:
+        """
+        {task_id: (wbs_code, slack_days, is_critical)} for the non-archived tasks
+        of a project, cached by (project_id, revision): in process first, then
+        in the shared project_result_cache table, computed only on a miss.
+        """
+        from app.models.project import Project
+        from app.models.schedule import ProjectResultCache
+
+        res = await db.execute(select(Project.revision).filter(Project.id == project_id))
+        revision = res.scalar()
+        if revision is None:
+            return {}
+        key = (project_id, revision)
+        results = result_cache.project_results.get(key)
+        if results is not None:
+            return results
+
+        table = ProjectResultCache.__table__
+        now = datetime.utcnow()
+        res = await db.execute(
+            sql_update(table)
+            .where(table.c.project_id == project_id, table.c.revision == revision)
+            .values(last_used_at=now)
+            .returning(table.c.payload)
+        )
+        payload = res.scalar()
+        if payload is not None:
+            results = result_cache.decode_results(payload)
+        else:
+            codes = await self.get_wbs_codes(db, project_id=project_id, include_archived=False)
+            cpm = await self.refresh_schedule(db, project_id=project_id)
+            results = {
+                task_id: (codes.get(task_id), *cpm.get(task_id, (None, False)))
+                for task_id in codes.keys() | cpm.keys()
+            }
+            stmt = pg_insert(table).values(
+                project_id=project_id, revision=revision, payload=result_cache.encode_results(results), last_used_at=now
+            )
+            await db.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.project_id],
+                set_={"revision": stmt.excluded.revision, "payload": stmt.excluded.payload, "last_used_at": now},
+                # A slow reader that computed an older revision must not replace a newer row
+                where=table.c.revision < stmt.excluded.revision,
+            ))
+            # LRU eviction of the shared level
+            stale = (
+                select(table.c.project_id)
+                .order_by(table.c.last_used_at.desc())
+                .offset(settings.RESULT_CACHE_SHARED_SIZE)
+            )
+            await db.execute(delete(table).where(table.c.project_id.in_(stale.scalar_subquery())))
+        await db.commit()
+        result_cache.project_results.put(key, results)
+        return results
+
+    async def compute_path(
+        self, db: AsyncSession, *, task_id: UUID, parent_id: Optional[UUID], sort_key: str, created_at: Optional[datetime]
+    ) -> str:
+        segment = path_segment(task_id, sort_key, created_at)
+        if not parent_id:
+            return segment
+        res = await db.execute(select(self.model.path).filter(self.model.id == parent_id))
+        return build_path(res.scalar(), segment)
+
+    async def move_subtree_paths(self, db: AsyncSession, *, old_path: str, new_path: str):
+        """
+        Re-prefix every descendant of old_path in one UPDATE (index range scan).
+        Does not commit; the caller's commit covers it together with the moved task.
+        """
+        low, high = descendants_range(old_path)
+        await db.execute(
+            sql_update(self.model)
+            .where(self.model.path >= low, self.model.path < high)
+            .values(path=func.concat(new_path, func.substr(self.model.path, len(old_path) + 1)))
+            .execution_options(synchronize_session=False)
+        )
 
     def calculate_task_progress(self, task: Task) -> float:
         """
@@ -153,175 +430,1061 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
         If checklist exists, progress = (done_items / total_items).
         Otherwise, progress is status-based.
         """
-        if task.checklist and len(task.checklist) > 0:
-            total = len(task.checklist)
-            done = sum(1 for item in task.checklist if item.get("is_done", False))
-            return round((done / total) * 100.0, 2)
-        
-        # Fallback to status-based progress
-        if task.status == Status.DONE:
-            return 100.0
-        elif task.status == Status.REVIEW:
-            return 80.0
-        elif task.status == Status.IN_PROGRESS:
-            return 50.0
-        elif task.status == Status.ON_HOLD:
-            return 25.0
-        return 0.0
+        return task_progress(task.status, task.checklist)
+
+    def _pending_aggregates(self, db: AsyncSession) -> Dict[UUID, ProjectAggregateDelta]:
+        return db.info.setdefault(PENDING_AGGREGATES_KEY, {})
+
+    def _pending_activity(self, db: AsyncSession) -> Dict[ActivityKey, int]:
+        return db.info.setdefault(PENDING_ACTIVITY_KEY, {})
+
+    def record_project_change(self, db: AsyncSession, before=None, after=None):
+        """
+        Queue the aggregate and completion_activity deltas of one task write
+        (TaskSnapshot before/after, None for create/delete). Applied by
+        flush_project_aggregates.
+        """
+        record_change(self._pending_aggregates(db), before, after)
+        record_completion(self._pending_activity(db), before, after)
+        self.mark_project_changed(db, *(snap.project_id for snap in (before, after) if snap))
+
+    def record_events(self, db: AsyncSession, task_id: UUID, before: Optional[TaskState], after: Optional[TaskState]):
+        """
+        Queue the task_events of one task write (task_state before/after,
+        None for create/delete). Written by flush_project_aggregates. A move
+        to another project is recorded in the history of both.
+        """
+        now = datetime.utcnow()
+        project_id = (after if after is not None else before).get("project_id")
+        pending = db.info.setdefault(PENDING_EVENTS_KEY, [])
+        for kind, changes in diff_events(before, after):
+            project_ids = [project_id]
+            if before and after and "project_id" in changes and before.get("project_id"):
+                project_ids.insert(0, before["project_id"])
+            for p_id in project_ids:
+                pending.append({"task_id": task_id, "project_id": p_id, "kind": kind, "changes": changes, "occurred_at": now})
+
+    def mark_project_changed(self, db: AsyncSession, *project_ids: Optional[UUID]):
+        """
+        Queue a revision bump (see app.core.result_cache) for writes that do not
+        go through record_project_change. Applied by flush_project_aggregates.
+        """
+        db.info.setdefault(PENDING_REVISIONS_KEY, set()).update(p for p in project_ids if p)
+        # Status counts and deadlines on the dashboards may have moved. Cleared
+        # after commit: clearing now would let a concurrent request cache the
+        # pre-commit state for the whole TTL
+        db.info[DASHBOARD_STALE_KEY] = True
+
+    @asynccontextmanager
+    async def project_aggregate_batch(self, db: AsyncSession):
+        """
+        Coalesce the project aggregate updates of every task write inside the
+        block into a single update per project, applied and committed on exit.
+        """
+        db.info[AGGREGATE_BATCH_KEY] = db.info.get(AGGREGATE_BATCH_KEY, 0) + 1
+        try:
+            yield
+        except Exception:
+            db.info[AGGREGATE_BATCH_KEY] -= 1
+            if not db.info[AGGREGATE_BATCH_KEY]:
+                db.info.pop(PENDING_AGGREGATES_KEY, None)
+                db.info.pop(PENDING_REVISIONS_KEY, None)
+                db.info.pop(PENDING_ACTIVITY_KEY, None)
+                db.info.pop(PENDING_EVENTS_KEY, None)
+            raise
+        db.info[AGGREGATE_BATCH_KEY] -= 1
+        if not db.info[AGGREGATE_BATCH_KEY]:
+            await self.flush_project_aggregates(db)
+            await db.commit()
+
+    async def flush_project_aggregates(self, db: AsyncSession):
+        """
+        Apply the queued deltas and revision bumps to their projects, the
+        completion counts to completion_activity and append the queued
+        task_events (no-op inside a batch). Does not commit; the caller's
+        commit covers it.
+        """
+        if db.info.get(AGGREGATE_BATCH_KEY):
+            return
+        pending = db.info.pop(PENDING_AGGREGATES_KEY, None)
+        # Fixed order: each delta locks its project row until commit
+        for project_id, delta in sorted((pending or {}).items(), key=lambda item: str(item[0])):
+            await self._apply_project_delta(db, project_id, delta)
+        changed_projects = db.info.pop(PENDING_REVISIONS_KEY, None)
+        if changed_projects:
+            from app.models.project import Project
+            await db.execute(
+                sql_update(Project)
+                .where(_any_of(Project.id, changed_projects))
+                # Keep updated_at: a revision bump is not an edit of the project itself
+                .values(revision=Project.revision + 1, updated_at=Project.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+        activity = db.info.pop(PENDING_ACTIVITY_KEY, None)
+        rows = [
+            {"id": uuid4(), "day": day, "project_id": project_id, "user_id": user_id, "count": delta}
+            for (day, project_id, user_id), delta in (activity or {}).items() if delta
+        ]
+        if rows:
+            from app.models.completion_activity import CompletionActivity
+            stmt = pg_insert(CompletionActivity).values(rows)
+            await db.execute(stmt.on_conflict_do_update(
+                index_elements=[CompletionActivity.day, CompletionActivity.project_id, CompletionActivity.user_id],
+                set_={"count": CompletionActivity.count + stmt.excluded.count},
+            ))
+        events = db.info.pop(PENDING_EVENTS_KEY, None)
+        if events:
+            from app.models.task_event import TaskEvent
+            # Multi-row INSERTs: one statement for a normal request
+            for i in range(0, len(events), EVENT_INSERT_ROWS):
+                await db.execute(insert(TaskEvent).values(events[i:i + EVENT_INSERT_ROWS]))
+
+    def completion_activity_query(self, *, project_id: Optional[UUID] = None, project_owner_id: Optional[UUID] = None):
+        """
+        (date, count) of tasks completed per day over the last HEATMAP_DAYS
+        days, from completion_activity. project_owner_id limits it to the
+        projects of that user.
+        """
+        from app.models.completion_activity import CompletionActivity
+        from app.models.project import Project
+
+        since = datetime.utcnow().date() - timedelta(days=HEATMAP_DAYS - 1)
+        query = select(CompletionActivity.day.label("date"), func.sum(CompletionActivity.count).label("count"))
+        if project_id:
+            query = query.filter(CompletionActivity.project_id == project_id)
+        if project_owner_id:
+            query = query.join(Project, Project.id == CompletionActivity.project_id).filter(Project.owner_id == project_owner_id)
+        return (
+            query.filter(CompletionActivity.day >= since)
+            .group_by(CompletionActivity.day)
+            .having(func.sum(CompletionActivity.count) > 0)
+            .order_by(CompletionActivity.day)
+        )
+
+    async def get_events(
+        self, db: AsyncSession, *, project_id: UUID, task_id: Optional[UUID] = None,
+        since: Optional[datetime] = None, limit: int = 500
+    ) -> list:
+        """
+        task_events of a project (or of one of its tasks), oldest first,
+        from `since` on. Served by the (project_id|task_id, occurred_at) indexes.
+        """
+        from app.models.task_event import TaskEvent
+
+        query = select(TaskEvent).filter(TaskEvent.project_id == project_id)
+        if task_id:
+            query = query.filter(TaskEvent.task_id == task_id)
+        if since:
+            query = query.filter(TaskEvent.occurred_at >= since)
+        res = await db.execute(query.order_by(TaskEvent.occurred_at, TaskEvent.id).limit(limit))
+        return res.scalars().all()
+
+    async def rebuild_completion_activity(self, db: AsyncSession) -> int:
+        """
+        Recount completion_activity from the tasks (backfill, or repair after
+        writes that bypassed the CRUD layer). Returns the number of rows.
+        """
+        from app.models.completion_activity import CompletionActivity
+
+        day = func.date(self.model.completed_at)
+        await db.execute(delete(CompletionActivity))
+        res = await db.execute(
+            insert(CompletionActivity).from_select(
+                ["id", "day", "project_id", "user_id", "count"],
+                select(func.gen_random_uuid(), day, self.model.project_id, self.model.owner_id, func.count())
+                .filter(self.model.completed_at != None)
+                .group_by(day, self.model.project_id, self.model.owner_id)
+            )
+        )
+        await db.commit()
+        return res.rowcount
 
     async def sync_project_from_tasks(self, db: AsyncSession, project_id: UUID):
+        """
+        Full recompute of a project's task-derived fields, in SQL.
+        Normal writes go through the delta path; this is the fallback and the backfill.
+        """
         if not project_id:
             return
-            
-        from app.crud.crud_project import project as project_crud
-        
-        # Get all tasks for the project to aggregate data
+        delta = ProjectAggregateDelta()
+        delta.full_recompute = True
+        await self._apply_project_delta(db, project_id, delta)
+        await db.commit()
+
+    async def _apply_project_delta(self, db: AsyncSession, project_id: UUID, delta: ProjectAggregateDelta):
+        from app.models.project import Project
+
+        # Row lock: the fields below are read, adjusted and written back, so a
+        # concurrent transaction must wait and then see this one's result
         result = await db.execute(
-            select(self.model)
+            select(Project)
+            .filter(Project.id == project_id)
+            .options(selectinload(Project.topics), selectinload(Project.types))
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        project_obj = result.scalars().first()
+        if not project_obj:
+            return
+
+        in_project = self.model.project_id == project_id
+        full = delta.full_recompute or project_obj.top_task_count is None or project_obj.progress_sum is None
+
+        # 1. Progress: running count and sum over top-level tasks
+        if full:
+            res = await db.execute(
+                select(self.model.status, self.model.checklist).filter(in_project, self.model.parent_id == None)
+            )
+            rows = res.all()
+            total = len(rows)
+            score_sum = sum(task_progress(status, checklist) for status, checklist in rows)
+        else:
+            total = project_obj.top_task_count + delta.top_task_count
+            score_sum = project_obj.progress_sum + delta.progress_sum
+        project_obj.top_task_count = total
+        project_obj.progress_sum = round(score_sum, 4)
+
+        if total > 0:
+            progress = round(float(score_sum) / total, 2)
+            if abs((project_obj.progress_percent or 0.0) - progress) > 0.01:
+                project_obj.progress_percent = progress
+
+        # 2. Date extrema: rescan only if the removed value may have been the extremum
+        new_start_date = delta.added_start
+        if full or (delta.removed_start and project_obj.start_date and delta.removed_start <= project_obj.start_date):
+            res = await db.execute(select(func.min(self.model.start_date)).filter(in_project))
+            new_start_date = res.scalar()
+        elif new_start_date and project_obj.start_date and project_obj.start_date <= new_start_date:
+            new_start_date = None
+
+        new_due_date = delta.added_end
+        if full or (delta.removed_end and project_obj.due_date and delta.removed_end >= project_obj.due_date):
+            res = await db.execute(
+                select(func.max(func.greatest(self.model.due_date, self.model.deadline_at))).filter(in_project)
+            )
+            new_due_date = res.scalar()
+        elif new_due_date and project_obj.due_date and project_obj.due_date >= new_due_date:
+            new_due_date = None
+
+        if new_start_date and project_obj.start_date != new_start_date:
+            project_obj.start_date = new_start_date
+        if new_due_date and project_obj.due_date != new_due_date:
+            project_obj.due_date = new_due_date
+
+        # 3. Topic & Type inheritance: rescan only if a current member lost a holder
+        current_topic_ids = {t.id for t in project_obj.topics}
+        topic_ids = current_topic_ids | delta.added_topics
+        if full or delta.removed_topics & current_topic_ids:
+            res = await db.execute(
+                select(task_topics.c.topic_id)
+                .join(self.model, self.model.id == task_topics.c.task_id)
+                .filter(in_project)
+                .union(select(self.model.topic_id).filter(in_project, self.model.topic_id != None))
+            )
+            topic_ids = set(res.scalars().all())
+        if topic_ids and topic_ids != current_topic_ids:
+            res = await db.execute(select(Topic).filter(_any_of(Topic.id, topic_ids)))
+            project_obj.topics = res.scalars().all()
+
+        current_type_ids = {t.id for t in project_obj.types}
+        type_ids = current_type_ids | delta.added_types
+        if full or delta.removed_types & current_type_ids:
+            res = await db.execute(
+                select(task_types.c.type_id)
+                .join(self.model, self.model.id == task_types.c.task_id)
+                .filter(in_project)
+                .union(select(self.model.type_id).filter(in_project, self.model.type_id != None))
+            )
+            type_ids = set(res.scalars().all())
+        if type_ids and type_ids != current_type_ids:
+            res = await db.execute(select(WorkType).filter(_any_of(WorkType.id, type_ids)))
+            project_obj.types = res.scalars().all()
+
+        db.add(project_obj)
+        await db.flush()
+
+    async def refresh_schedule(
+        self, db: AsyncSession, *, project_id: UUID, changed_ids: Iterable[UUID] = ()
+    ) -> Dict[UUID, tuple]:
+        """
+        Bring the persisted CPM state of a project up to date and return
+        {task_id: (slack_days, is_critical)} for its non-archived tasks.
+
+        changed_ids: tasks whose dates changed and both ends of added/removed
+        dependencies. New tasks (no stored row) and neighbours of archived ones
+        are picked up on their own. Only their downstream/upstream cones are
+        recomputed and only rows whose values changed are written; a new
+        project start or due date, a different working calendar, or a stored
+        cycle forces a full run. Does not commit.
+        """
+        from app.models.dependency import Dependency
+        from app.models.project import Project
+        from app.models.schedule import ProjectSchedule, TaskSchedule
+
+        res = await db.execute(
+            select(
+                self.model.id, self.model.start_date, self.model.due_date, self.model.completed_at,
+                self.model.deadline_at, self.model.is_archived, TaskSchedule.task_id.label("scheduled"),
+                TaskSchedule.es, TaskSchedule.ef, TaskSchedule.ls, TaskSchedule.lf,
+                TaskSchedule.slack_days, TaskSchedule.is_critical,
+            )
+            .outerjoin(TaskSchedule, TaskSchedule.task_id == self.model.id)
             .filter(self.model.project_id == project_id)
-            .options(
-                selectinload(Task.topics),
-                selectinload(Task.types)
+        )
+        rows = res.all()
+        res = await db.execute(
+            select(Dependency.predecessor_id, Dependency.successor_id, Dependency.type, Dependency.lag_days)
+            .join(self.model, self.model.id == Dependency.successor_id)
+            .filter(self.model.project_id == project_id)
+        )
+        edges = res.all()
+        # Plain columns, not the entity: the row is written with an upsert
+        # below, which an identity-mapped instance would not see
+        res = await db.execute(
+            select(
+                Project.due_date, ProjectSchedule.project_id.label("scheduled"), ProjectSchedule.project_start,
+                ProjectSchedule.finish_floor, ProjectSchedule.calendar_key, ProjectSchedule.project_finish,
             )
+            .outerjoin(ProjectSchedule, ProjectSchedule.project_id == Project.id)
+            .filter(Project.id == project_id)
         )
-        all_tasks = result.scalars().all()
-        if not all_tasks:
-            return
+        state = res.one_or_none()
+        due_date = state.due_date if state else None
+        if state is not None and state.scheduled is None:
+            state = None
+        # Working time when a calendar applies, calendar time otherwise
+        calendar = await work_calendar.for_project(db, project_id)
+        to_time = calendar.to_time if calendar else to_micros
+        from_time = calendar.from_time if calendar else from_micros
 
-        # 1. Progress calculation (Top-level tasks only for progress)
-        top_tasks = [t for t in all_tasks if t.parent_id is None]
-        total = len(top_tasks)
-        score_sum = 0
-        for t in top_tasks:
-            score_sum += self.calculate_task_progress(t)
-        
-        progress = round(float(score_sum) / total, 2) if total > 0 else 0.0
+        live = [r for r in rows if not r.is_archived]
+        index = {r.id: i for i, r in enumerate(live)}
+        dropped = {r.id for r in rows if r.is_archived and r.scheduled is not None}
+        changed = {index[i] for i in changed_ids if i in index}
+        changed.update(i for i, r in enumerate(live) if r.scheduled is None)
 
-        # 2. Date aggregation
-        start_dates = [t.start_date for t in all_tasks if t.start_date]
-        due_dates = [t.due_date for t in all_tasks if t.due_date]
-        deadline_dates = [t.deadline_at for t in all_tasks if t.deadline_at]
-        
-        # end_date fallback logic: use due_date or deadline_at
-        effective_end_dates = due_dates + deadline_dates
-        
-        new_start_date = min(start_dates) if start_dates else None
-        new_due_date = max(effective_end_dates) if effective_end_dates else None
-
-        # 3. Topic & Type inheritance (Aggregation)
-        topic_ids = set()
-        type_ids = set()
-        for t in all_tasks:
-            for topic in t.topics:
-                topic_ids.add(topic.id)
-            for wtype in t.types:
-                type_ids.add(wtype.id)
-            # Support legacy single FKs too
-            if t.topic_id: topic_ids.add(t.topic_id)
-            if t.type_id: type_ids.add(t.type_id)
-
-        project_obj = await project_crud.get(db, id=project_id)
-        if project_obj:
-            update_data = {}
-            if abs(project_obj.progress_percent - progress) > 0.01:
-                update_data["progress_percent"] = progress
-            
-            if new_start_date and project_obj.start_date != new_start_date:
-                update_data["start_date"] = new_start_date
-                
-            if new_due_date and project_obj.due_date != new_due_date:
-                update_data["due_date"] = new_due_date
+        project_start = min(
+            (r.start_date for r in live if r.start_date),
+            default=state.project_start if state else datetime.utcnow(),
+        )
+        durations = [task_duration(r.start_date, r.due_date, r.completed_at, calendar) for r in live]
+        earliest = [to_time(r.start_date or project_start) for r in live]
+        deadlines = [to_time(r.deadline_at) if r.deadline_at else NO_DEADLINE for r in live]
+        pred, succ, dep_type, lag = [], [], [], []
+        for predecessor_id, successor_id, type_, lag_days in edges:
+            if predecessor_id in dropped and successor_id in index:
+                changed.add(index[successor_id])
+            if successor_id in dropped and predecessor_id in index:
+                changed.add(index[predecessor_id])
+            if predecessor_id in index and successor_id in index:
+                pred.append(index[predecessor_id])
+                succ.append(index[successor_id])
+                dep_type.append(DEPENDENCY_CODES.get(type_, FS))
+                lag.append(lag_days * DAY if lag_days else 0)
+        finish_floor = to_time(due_date) if due_date else None
+
+        full = (
+            state is None
+            or state.project_start != project_start
+            or state.finish_floor != due_date
+            or state.calendar_key != calendar_key(calendar)
+            or any(r.scheduled is not None and r.es is None for r in live)
+        )
+        if not full and not changed and not dropped:
+            return {r.id: (r.slack_days, r.is_critical) for r in live}
 
-            # Add aggregated topic/type IDs to update
-            if topic_ids:
-                update_data["topic_ids"] = list(topic_ids)
-            if type_ids:
-                update_data["type_ids"] = list(type_ids)
+        if full:
+            sched = schedule(durations, earliest, deadlines, pred, succ, dep_type, lag, finish_floor)
+            touched = [True] * len(live)
+        else:
+            sched, touched = reschedule(
+                durations, earliest, deadlines, pred, succ, dep_type, lag,
+                [to_time(r.es) if r.es else 0 for r in live],
+                [to_time(r.lf) if r.lf else 0 for r in live],
+                to_time(state.project_finish), sorted(changed), finish_floor,
+            )
+            touched = touched.tolist()
+        slack_days, critical = slack_and_critical(sched)
+
+        result = {}
+        values = []
+        for i, (r, es, ef, ls, lf, slack, is_critical, resolved) in enumerate(zip(
+            live, sched.es.tolist(), sched.ef.tolist(), sched.ls.tolist(), sched.lf.tolist(),
+            slack_days.tolist(), critical.tolist(), sched.resolved.tolist(),
+        )):
+            if resolved:
+                times = (from_time(es), from_time(ef), from_time(ls), from_time(lf))
+            else:
+                times, slack = (None, None, None, None), None
+            result[r.id] = (slack, is_critical)
+            if touched[i] and (r.scheduled is None or (r.es, r.ef, r.ls, r.lf, r.slack_days, r.is_critical) != (*times, slack, is_critical)):
+                values.append({
+                    "task_id": r.id, "project_id": project_id,
+                    "es": times[0], "ef": times[1], "ls": times[2], "lf": times[3],
+                    "slack_days": slack, "is_critical": is_critical,
+                })
+
+        if values:
+            stmt = pg_insert(TaskSchedule)
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[TaskSchedule.task_id],
+                    set_={c: stmt.excluded[c] for c in ("es", "ef", "ls", "lf", "slack_days", "is_critical")},
+                ),
+                values,
+            )
+        if dropped:
+            await db.execute(delete(TaskSchedule).where(_any_of(TaskSchedule.task_id, dropped)))
+
+        # Upsert: concurrent first reads of a project both get here with no row
+        stmt = pg_insert(ProjectSchedule).values(
+            project_id=project_id, project_start=project_start, finish_floor=due_date,
+            calendar_key=calendar_key(calendar), project_finish=from_time(sched.finish),
+            computed_at=datetime.utcnow(),
+        )
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[ProjectSchedule.project_id],
+            set_={c: stmt.excluded[c] for c in ("project_start", "finish_floor", "calendar_key", "project_finish", "computed_at")},
+        ))
+        return result
+
+    async def get_schedule(self, db: AsyncSession, *, project_id: UUID) -> Dict[UUID, tuple]:
+        """Stored CPM results of a project, catching up on unrecorded changes first."""
+        result = await self.refresh_schedule(db, project_id=project_id)
+        await db.commit()
+        return result
+
+    async def simulate_schedule(
+        self, db: AsyncSession, *, project_id: UUID, iterations: int = 10_000, seed: Optional[int] = None, bins: int = 20
+    ) -> dict:
+        """
+        Monte Carlo PERT forecast of a project's non-archived tasks (see
+        app.core.simulation). Completed tasks have no remaining duration; tasks
+        without estimates keep their nominal (date-derived) duration. Large
+        projects run fewer iterations than requested to stay within
+        SIMULATION_CELL_BUDGET; the result reports the count actually run.
+        """
+        from app.models.dependency import Dependency
+
+        res = await db.execute(
+            select(
+                self.model.id, self.model.title, self.model.start_date, self.model.due_date, self.model.completed_at,
+                self.model.optimistic_days, self.model.normal_days, self.model.pessimistic_days,
+            )
+            .filter(self.model.project_id == project_id, self.model.is_archived == False)
+            .order_by(self.model.path.asc())
+        )
+        rows = res.all()
+        res = await db.execute(
+            select(Dependency.predecessor_id, Dependency.successor_id, Dependency.type, Dependency.lag_days)
+            .join(self.model, self.model.id == Dependency.successor_id)
+            .filter(self.model.project_id == project_id)
+        )
+        edges = res.all()
+
+        index = {r.id: i for i, r in enumerate(rows)}
+        origin = min((r.start_date for r in rows if r.start_date), default=datetime.utcnow())
+        low, mode, high, earliest = [], [], [], []
+        for r in rows:
+            if r.completed_at:
+                estimate = (0, 0, 0)
+            else:
+                nominal = task_duration(r.start_date, r.due_date, None) / DAY
+                estimate = estimate_range(r.optimistic_days, r.normal_days, r.pessimistic_days, nominal)
+            for column, value in zip((low, mode, high), estimate):
+                column.append(value)
+            earliest.append(to_micros(r.start_date, origin) / DAY if r.start_date else 0.0)
+        pred, succ, dep_type, lag = [], [], [], []
+        for predecessor_id, successor_id, type_, lag_days in edges:
+            if predecessor_id in index and successor_id in index:
+                pred.append(index[predecessor_id])
+                succ.append(index[successor_id])
+                dep_type.append(DEPENDENCY_CODES.get(type_, FS))
+                lag.append(lag_days or 0)
+
+        iterations = budget_iterations(iterations, len(rows), settings.SIMULATION_CELL_BUDGET)
+        # CPU-bound; keep the event loop free
+        result = await run_in_threadpool(
+            simulate, low, mode, high, earliest, pred, succ, dep_type, lag, iterations=iterations, seed=seed
+        )
 
-            if update_data:
-                await project_crud.update(db, db_obj=project_obj, obj_in=update_data)
+        summary = summarize(result, bins=bins)
+
+        def to_date(days: Optional[float]) -> Optional[datetime]:
+            return from_micros(int(round(days * DAY)), origin) if days is not None else None
+
+        return {
+            "project_id": project_id,
+            "iterations": iterations,
+            "seed": seed,
+            "task_count": len(rows),
+            "skipped_tasks": int((~result.resolved).sum()),
+            "finish_p50": to_date(summary.p50),
+            "finish_p80": to_date(summary.p80),
+            "finish_p95": to_date(summary.p95),
+            "finish_mean": to_date(summary.mean),
+            "finish_histogram": {
+                "bin_edges": [to_date(e) for e in summary.finish_edges],
+                "counts": summary.finish_counts,
+            },
+            "criticality_histogram": {
+                "bin_edges": summary.criticality_edges,
+                "counts": summary.criticality_counts,
+            },
+            "tasks": [
+                {
+                    "task_id": r.id,
+                    "title": r.title,
+                    "criticality_index": round(criticality, 4),
+                    "mean_finish": to_date(mean_finish),
+                }
+                for r, criticality, mean_finish, ok in zip(
+                    rows, result.criticality.tolist(), result.mean_finish.tolist(), result.resolved.tolist()
+                )
+                if ok
+            ],
+        }
+
+    async def portfolio_schedule(self, db: AsyncSession, *, project_ids: Optional[Iterable[UUID]] = None) -> dict:
+        """
+        One CPM run over the non-archived tasks of every active project (or of
+        project_ids), cross-project dependencies included (see
+        app.core.portfolio). Dependencies to tasks outside the selection are
+        left out. Three queries regardless of the number of projects.
+        """
+        from app.models.dependency import Dependency
+        from app.models.project import Project
+
+        scope = [Project.is_archived == False]
+        if project_ids is not None:
+            scope.append(_any_of(Project.id, list(project_ids)))
+        res = await db.execute(select(Project.id, Project.due_date).filter(*scope))
+        projects = res.all()
+        project_index = {p.id: k for k, p in enumerate(projects)}
+
+        res = await db.execute(
+            select(
+                self.model.id, self.model.project_id, self.model.title, self.model.start_date,
+                self.model.due_date, self.model.completed_at, self.model.deadline_at,
+            )
+            .join(Project, Project.id == self.model.project_id)
+            .filter(self.model.is_archived == False, *scope)
+        )
+        rows = res.all()
+        index = {r.id: i for i, r in enumerate(rows)}
+        res = await db.execute(
+            select(Dependency.predecessor_id, Dependency.successor_id, Dependency.type, Dependency.lag_days)
+            .join(self.model, self.model.id == Dependency.successor_id)
+            .join(Project, Project.id == self.model.project_id)
+            .filter(*scope)
+        )
+        edges = res.all()
+
+        origin = min((r.start_date for r in rows if r.start_date), default=datetime.utcnow())
+        project_of = [project_index[r.project_id] for r in rows]
+        durations = [task_duration(r.start_date, r.due_date, r.completed_at) for r in rows]
+        earliest = [to_micros(r.start_date or origin) for r in rows]
+        deadlines = [to_micros(r.deadline_at) if r.deadline_at else NO_DEADLINE for r in rows]
+        project_due = [to_micros(p.due_date) if p.due_date else NO_DEADLINE for p in projects]
+        pred, succ, dep_type, lag = [], [], [], []
+        cross = 0
+        for predecessor_id, successor_id, type_, lag_days in edges:
+            if predecessor_id in index and successor_id in index:
+                p, s = index[predecessor_id], index[successor_id]
+                pred.append(p)
+                succ.append(s)
+                dep_type.append(DEPENDENCY_CODES.get(type_, FS))
+                lag.append(lag_days * DAY if lag_days else 0)
+                cross += project_of[p] != project_of[s]
+
+        # CPU-bound; keep the event loop free
+        result = await run_in_threadpool(
+            analyze_portfolio, project_of, durations, earliest, deadlines, pred, succ, dep_type, lag, project_due
+        )
+        sched = result.schedule
+
+        return {
+            "project_count": len(projects),
+            "task_count": len(rows),
+            "cross_project_dependencies": cross,
+            "skipped_tasks": int((~sched.resolved).sum()),
+            "finish": from_micros(sched.finish) if rows else None,
+            "projects": [
+                {
+                    "project_id": p.id,
+                    "due_date": p.due_date,
+                    "projected_finish": from_micros(finish) if finish >= 0 else None,
+                    "variance_days": variance_days(finish, due),
+                    "critical_tasks": critical_tasks,
+                }
+                for p, finish, due, critical_tasks in zip(
+                    projects, result.projected_finish.tolist(), project_due, result.critical_tasks.tolist()
+                )
+            ],
+            "critical_chain": [
+                {
+                    "task_id": rows[i].id,
+                    "project_id": rows[i].project_id,
+                    "title": rows[i].title,
+                    "early_start": from_micros(es),
+                    "early_finish": from_micros(ef),
+                    "slack_days": slack,
+                }
+                for i, es, ef, slack in zip(
+                    result.critical_chain.tolist(), sched.es[result.critical_chain].tolist(),
+                    sched.ef[result.critical_chain].tolist(), result.slack_days[result.critical_chain].tolist(),
+                )
+            ],
+        }
+
+    async def portfolio_health(self, db: AsyncSession, *, owner_id: Optional[UUID] = None) -> dict:
+        """
+        Health of every active project (owner_id's only, if given), shaped
+        as PortfolioHealthResponse. Overdue, done and total task counts and the
+        budget variance come from one query grouped by project; critical task
+        counts and schedule variance from the cross-project CPM run of
+        portfolio_schedule. Cached per portfolio revision (see
+        app.core.result_cache.portfolio_health).
+        """
+        from app.models.project import Project
+
+        scope = [Project.is_archived == False]
+        if owner_id:
+            scope.append(Project.owner_id == owner_id)
+        res = await db.execute(
+            select(Project.id, Project.revision).filter(*scope)
+            .order_by(Project.created_at, Project.id).limit(PORTFOLIO_HEALTH_LIMIT)
+        )
+        revisions = tuple((project_id, revision) for project_id, revision in res.all())
+        cached = result_cache.portfolio_health.get(revisions)
+        if cached is not None:
+            return cached
+
+        project_ids = [project_id for project_id, _ in revisions]
+        now = datetime.utcnow()
+        open_task = self.model.status != Status.DONE
+        res = await db.execute(
+            select(
+                Project.id, Project.name, Project.status, Project.progress_percent,
+                func.count(self.model.id).label("total"),
+                func.count(self.model.id).filter(self.model.status == Status.DONE).label("done"),
+                func.count(self.model.id).filter(self.model.due_date < now, open_task).label("overdue"),
+                (func.coalesce(func.sum(self.model.budget), 0.0) - func.coalesce(func.sum(self.model.real_cost), 0.0))
+                .label("budget_variance"),
+            )
+            .outerjoin(self.model, and_(self.model.project_id == Project.id, self.model.is_archived == False))
+            .filter(_any_of(Project.id, project_ids))
+            .group_by(Project.id)
+        )
+        rows = {r.id: r for r in res.all()}
+        schedules = {s["project_id"]: s for s in (await self.portfolio_schedule(db, project_ids=project_ids))["projects"]}
+
+        projects = []
+        for project_id in project_ids:
+            r, sched = rows[project_id], schedules[project_id]
+            score = health_score(r.overdue, r.status)
+            projects.append({
+                "id": r.id,
+                "name": r.name,
+                "progress": r.progress_percent or 0.0,
+                "status": r.status.value if hasattr(r.status, "value") else str(r.status),
+                "health_score": score,
+                "overdue_tasks": r.overdue,
+                "critical_path_tasks": sched["critical_tasks"],
+                "risk_level": risk_level(score, r.overdue),
+                "variance_days": sched["variance_days"],
+                "done_ratio": r.done / r.total if r.total else 0.0,
+                "budget_variance": float(r.budget_variance),
+            })
+
+        health = {
+            "projects": projects,
+            "total_active": len(projects),
+            "average_progress": sum(p["progress"] for p in projects) / len(projects) if projects else 0.0,
+            "critical_projects": sum(1 for p in projects if p["risk_level"] == "High"),
+        }
+        result_cache.portfolio_health.put(revisions, health)
+        return health
+
+    async def level_resources(
+        self, db: AsyncSession, *, project_id: UUID, capacity_hours: float = DEFAULT_CAPACITY, apply: bool = False
+    ) -> dict:
+        """
+        Propose start/due dates that keep every assignee at or under
+        capacity_hours a day (see app.core.leveling). Only open, dated tasks
+        move, and only within their CPM slack; the assignees' work in other
+        projects counts as fixed load. With apply=True the new dates are
+        written with one executemany UPDATE, recorded as "dates" task events,
+        the schedule is refreshed and the assignees of moved tasks are notified.
+        """
+        from app.models.dependency import Dependency
+
+        slack = await self.refresh_schedule(db, project_id=project_id)
+        res = await db.execute(
+            select(
+                self.model.id, self.model.title, self.model.start_date, self.model.due_date,
+                self.model.deadline_at, self.model.priority,
+            )
+            .filter(
+                self.model.project_id == project_id,
+                self.model.is_archived == False,
+                self.model.status != Status.DONE,
+                self.model.completed_at.is_(None),
+                self.model.start_date.isnot(None),
+                self.model.due_date.isnot(None),
+                self.model.due_date >= self.model.start_date,
+            )
+            .order_by(self.model.path.asc())
+        )
+        rows = res.all()
+        index = {r.id: i for i, r in enumerate(rows)}
+        res = await db.execute(
+            select(Dependency.predecessor_id, Dependency.successor_id, Dependency.type, Dependency.lag_days)
+            .join(self.model, self.model.id == Dependency.successor_id)
+            .filter(self.model.project_id == project_id)
+        )
+        edges = res.all()
+        res = await db.execute(
+            select(task_assignees.c.task_id, task_assignees.c.user_id)
+            .join(self.model, self.model.id == task_assignees.c.task_id)
+            .filter(self.model.project_id == project_id)
+        )
+        assigned = defaultdict(list)
+        for task_id, user_id in res.all():
+            if task_id in index:
+                assigned[task_id].append(user_id)
+        users = sorted({u for ids in assigned.values() for u in ids})
+        user_index = {u: k for k, u in enumerate(users)}
+
+        origin = min((r.start_date.date() for r in rows), default=None)
+        start, span, slack_days, rank, durations, user_ptr, user_idx = [], [], [], [], [], [0], []
+        for r in rows:
+            start.append((r.start_date.date() - origin).days)
+            span.append((r.due_date.date() - r.start_date.date()).days + 1)
+            task_slack = slack.get(r.id, (None, False))[0]
+            slack_days.append(task_slack if task_slack is not None else -1)
+            rank.append(PRIORITY_RANK.get(r.priority, 0))
+            durations.append(task_duration(r.start_date, r.due_date, None) // DAY)
+            user_idx.extend(user_index[u] for u in assigned[r.id])
+            user_ptr.append(len(user_idx))
+        pred, succ, dep_type, lag = [], [], [], []
+        for predecessor_id, successor_id, type_, lag_days in edges:
+            if predecessor_id in index and successor_id in index:
+                pred.append(index[predecessor_id])
+                succ.append(index[successor_id])
+                dep_type.append(DEPENDENCY_CODES.get(type_, FS))
+                lag.append(lag_days or 0)
+
+        # Fixed load: the same people's open work in other projects
+        horizon = max((s + max(k, 0) + d for s, k, d in zip(start, slack_days, span)), default=0)
+        base_load = np.zeros((len(users), horizon))
+        if users:
+            res = await db.execute(
+                select(task_assignees.c.user_id, self.model.start_date, self.model.due_date)
+                .join(self.model, self.model.id == task_assignees.c.task_id)
+                .filter(
+                    _any_of(task_assignees.c.user_id, users),
+                    or_(self.model.project_id != project_id, self.model.project_id.is_(None)),
+                    self.model.is_archived == False,
+                    self.model.status != Status.DONE,
+                    self.model.start_date.isnot(None),
+                    self.model.due_date >= datetime.combine(origin, datetime.min.time()),
+                )
+            )
+            other = [o for o in res.all() if o.due_date.date() >= o.start_date.date()]
+            add_load(
+                base_load,
+                [(o.start_date.date() - origin).days for o in other],
+                [(o.due_date.date() - o.start_date.date()).days + 1 for o in other],
+                range(len(other) + 1),
+                [user_index[o.user_id] for o in other],
+            )
+
+        # CPU-bound; keep the event loop free
+        result = await run_in_threadpool(
+            level, start, span, slack_days, rank, user_ptr, user_idx, durations, pred, succ, dep_type, lag,
+            base_load, capacity=capacity_hours,
+        )
+
+        changes = []
+        for r, old, new in zip(rows, start, result.start.tolist()):
+            if new != old:
+                delay = timedelta(days=new - old)
+                changes.append({
+                    "task_id": r.id, "title": r.title,
+                    "start_date": r.start_date, "due_date": r.due_date,
+                    "new_start_date": r.start_date + delay, "new_due_date": r.due_date + delay,
+                    "delay_days": new - old,
+                })
+
+        if apply and changes:
+            table = self.model.__table__
+            await db.execute(
+                sql_update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values(start_date=bindparam("b_start_date"), due_date=bindparam("b_due_date")),
+                [{"b_id": c["task_id"], "b_start_date": c["new_start_date"], "b_due_date": c["new_due_date"]} for c in changes]
+            )
+            for c in changes:
+                deadline = rows[index[c["task_id"]]].deadline_at or datetime.min
+                snap = TaskSnapshot(project_id, False, 0.0, c["start_date"], max(c["due_date"], deadline), frozenset(), frozenset())
+                self.record_project_change(
+                    db, before=snap, after=snap._replace(start_date=c["new_start_date"], end_date=max(c["new_due_date"], deadline))
+                )
+                # Same "dates" history as an edit through update()
+                self.record_events(
+                    db, c["task_id"],
+                    {"project_id": project_id, "start_date": c["start_date"], "due_date": c["due_date"]},
+                    {"project_id": project_id, "start_date": c["new_start_date"], "due_date": c["new_due_date"]},
+                )
+            await self.refresh_schedule(db, project_id=project_id, changed_ids=[c["task_id"] for c in changes])
+            await self.flush_project_aggregates(db)
+            await db.commit()
+            await self.notify_rescheduled(db, project_id, changes, assigned)
+
+        return {
+            "project_id": project_id,
+            "capacity_hours": capacity_hours,
+            "applied": apply and bool(changes),
+            "task_count": len(rows),
+            "changes": changes,
+            "overloaded_task_ids": [r.id for r, over in zip(rows, result.overloaded.tolist()) if over],
+        }
+
+    async def reschedule_moved_task(
+        self, db: AsyncSession, *, task_id: UUID, old_project_id: Optional[UUID], new_project_id: Optional[UUID]
+    ) -> None:
+        """
+        Keep both stored schedules current when a task changes project.
+
+        The task's schedule row belongs to the old project, so it is dropped:
+        the old project reschedules what the task was linked to, and the new
+        project sees the task as new and schedules it along with its links.
+        """
+        from app.models.schedule import TaskSchedule
+        neighbours = await self._dependency_neighbours(db, [task_id])
+        await db.execute(delete(TaskSchedule).where(TaskSchedule.task_id == task_id))
+        if old_project_id:
+            await self.refresh_schedule(db, project_id=old_project_id, changed_ids=list(neighbours))
+        if new_project_id:
+            await self.refresh_schedule(db, project_id=new_project_id, changed_ids=[task_id, *neighbours])
+
+    async def _dependency_neighbours(self, db: AsyncSession, task_ids: List[UUID]) -> set:
+        """Tasks linked by a dependency to any of task_ids, outside that set."""
+        from app.models.dependency import Dependency
+        res = await db.execute(
+            select(Dependency.predecessor_id, Dependency.successor_id)
+            .filter(or_(_any_of(Dependency.predecessor_id, task_ids), _any_of(Dependency.successor_id, task_ids)))
+        )
+        return {task_id for row in res.all() for task_id in row} - set(task_ids)
 
     async def update_parent_status_recursive(self, db: AsyncSession, parent_id: UUID):
         """
         Updates the status of a parent task based on its children's status.
         Bubbles up to the root.
         """
-        # Load parent with its children
-        parent = await self.get(db, id=parent_id)
-        if not parent or not parent.subtasks:
-            return
+        return await self.rollup_ancestors(db, [parent_id])
 
-        total = len(parent.subtasks)
-        done_count = sum(1 for s in parent.subtasks if s.status == Status.DONE)
-        in_progress_count = sum(1 for s in parent.subtasks if s.status in [Status.IN_PROGRESS, Status.REVIEW])
-        
-        new_status = Status.TODO
-        if done_count == total:
-            # Check if parent itself is blocked before moving to DONE
-            active_blockers = await self.check_for_active_blockers(db, parent_id)
-            if active_blockers:
-                new_status = Status.IN_PROGRESS
-            else:
-                new_status = Status.DONE
-        elif in_progress_count > 0 or done_count > 0:
-            new_status = Status.IN_PROGRESS
-        
-        if parent.status != new_status:
-            # Use direct update to avoid triggering another loop if not needed, 
-            # but we NEED to bubble up, so we call update which calls this again.
-            await self.update(db, db_obj=parent, obj_in={"status": new_status})
-            # The .update() call will handle the next level up if parent.parent_id exists.
+    async def rollup_ancestors(self, db: AsyncSession, parent_ids: List[Optional[UUID]]) -> List[tuple]:
+        """
+        Recompute the status of the given parents and all of their ancestors.
+
+        The ancestor chain comes from the materialized paths, child status counts
+        for every ancestor come from one GROUP BY query, blockers are checked once
+        for the whole chain, and every changed ancestor is written with a single
+        UPDATE. Nothing is committed here; the caller's commit covers the rollup
+        together with the change that triggered it.
 
-    async def is_blocked_by_recursive(self, db: AsyncSession, item_id: UUID, blocker_candidate_id: UUID, visited: set) -> bool:
+        Returns the (task_id, old_status, new_status) transitions, bottom-up.
+        """
+        from app.models.dependency import Dependency
+
+        parent_ids = [p for p in dict.fromkeys(parent_ids) if p]
+        if not parent_ids:
+            return []
+
+        # 1. Ancestor chains (root first, parent last) straight from the paths
+        res = await db.execute(select(self.model.path).filter(_any_of(self.model.id, parent_ids)))
+        depth: Dict[UUID, int] = {}
+        for (path,) in res.all():
+            if path:
+                for level, ancestor_id in enumerate(ids_from_path(path)):
+                    depth[ancestor_id] = level
+        if not depth:
+            return []
+
+        # 2. Current status and child status counts of every ancestor
+        child = aliased(Task)
+        res = await db.execute(
+            select(
+                self.model.id,
+                self.model.parent_id,
+                self.model.project_id,
+                self.model.status,
+                self.model.checklist,
+                self.model.owner_id,
+                self.model.completed_at,
+                func.count(child.id),
+                func.count(child.id).filter(child.status == Status.DONE),
+                func.count(child.id).filter(child.status.in_(ACTIVE_STATUSES)),
+            )
+            .outerjoin(child, child.parent_id == self.model.id)
+            .filter(_any_of(self.model.id, depth.keys()))
+            .group_by(self.model.id)
+        )
+        nodes = [
+            {
+                "id": t_id, "parent_id": p_id, "project_id": project_id, "status": status, "checklist": checklist,
+                "owner_id": owner_id, "completed_at": completed_at, "total": total, "done": done, "active": active
+            }
+            for t_id, p_id, project_id, status, checklist, owner_id, completed_at, total, done, active in res.all()
+        ]
+        nodes.sort(key=lambda n: depth[n["id"]], reverse=True)
+
+        # 3. Blockers, checked once for every ancestor that could complete
+        # (at most one child per starting parent can still flip to Done)
+        candidates = [n["id"] for n in nodes if n["total"] and n["total"] - n["done"] <= len(parent_ids)]
+        blocked_ids = set()
+        if candidates:
+            blocker = aliased(Task)
+            dep_blocked = (
+                select(Dependency.successor_id)
+                .join(blocker, blocker.id == Dependency.predecessor_id)
+                .filter(_any_of(Dependency.successor_id, candidates), blocker.status != Status.DONE)
+            )
+            legacy_blocked = (
+                select(self.model.id)
+                .join(blocker, blocker.id == any_(self.model.blocked_by_ids))
+                .filter(_any_of(self.model.id, candidates), blocker.status != Status.DONE)
+            )
+            res = await db.execute(dep_blocked.union(legacy_blocked))
+            blocked_ids = set(res.scalars().all())
+
+        # 4. Bottom-up propagation in memory, then one write for the whole chain
+        transitions = plan_rollup(nodes, blocked_ids)
+        if transitions:
+            status_type = self.model.__table__.c.status.type
+            values = {
+                "status": case(
+                    {t_id: literal(new, status_type) for t_id, _, new in transitions},
+                    value=self.model.id
+                )
+            }
+            # completed_at is set when entering Done and cleared when leaving it
+            now = datetime.utcnow()
+            completed_whens = [
+                (self.model.id == t_id, func.coalesce(self.model.completed_at, now) if new == Status.DONE else null())
+                for t_id, old, new in transitions if Status.DONE in (old, new)
+            ]
+            if completed_whens:
+                values["completed_at"] = case(*completed_whens, else_=self.model.completed_at)
+
+            await db.execute(
+                sql_update(self.model)
+                .where(_any_of(self.model.id, [t_id for t_id, _, _ in transitions]))
+                .values(**values)
+                .execution_options(synchronize_session="fetch")
+            )
+
+            # A top-level ancestor changing status moves its project's progress;
+            # entering/leaving Done moves the completion counts
+            node_by_id = {n["id"]: n for n in nodes}
+            pending = self._pending_aggregates(db)
+            activity = self._pending_activity(db)
+            for t_id, old, new in transitions:
+                n = node_by_id[t_id]
+                if n["parent_id"] is None and n["project_id"]:
+                    pending.setdefault(n["project_id"], ProjectAggregateDelta()).add_progress(
+                        task_progress(new, n["checklist"]) - task_progress(old, n["checklist"])
+                    )
+                if Status.DONE in (old, new):
+                    completed_on = n["completed_at"].date() if n["completed_at"] else None
+                    before = TaskSnapshot(n["project_id"], False, 0.0, None, None, frozenset(), frozenset(), completed_on, n["owner_id"])
+                    after = before._replace(completed_on=(completed_on or now.date()) if new == Status.DONE else None)
+                    record_completion(activity, before, after)
+                state = {"project_id": n["project_id"], "status": old, "completed_at": n["completed_at"]}
+                if Status.DONE in (old, new):
+                    completed_at = (n["completed_at"] or now) if new == Status.DONE else None
+                else:
+                    completed_at = n["completed_at"]
+                self.record_events(db, t_id, state, {**state, "status": new, "completed_at": completed_at})
+        return transitions
+
+    def _blocker_scope(self, column, task_ids: Optional[Iterable[UUID]], project_id: Optional[UUID]):
+        if task_ids is not None:
+            return _any_of(column, task_ids)
+        return column.in_(select(self.model.id).filter(self.model.project_id == project_id))
+
+    async def get_transitive_blockers(
+        self, db: AsyncSession, *, task_ids: Optional[Iterable[UUID]] = None, project_id: Optional[UUID] = None
+    ) -> Dict[UUID, set]:
+        """
+        {task_id: every task upstream of it}, through dependencies and the
+        legacy blocked_by_ids, for the given tasks or a whole project, in one
+        recursive query. UNION drops (root, task) pairs already seen, so
+        cycles in legacy data terminate.
+        """
+        from app.models.dependency import Dependency
+        upstream = (
+            select(self.model.id.label("root_id"), self.model.id.label("id"))
+            .filter(self._blocker_scope(self.model.id, task_ids, project_id))
+            .cte("upstream", recursive=True)
+        )
+        predecessors = (
+            select(Dependency.predecessor_id.label("id"))
+            .filter(Dependency.successor_id == upstream.c.id)
+            .union_all(
+                select(func.unnest(self.model.blocked_by_ids)).filter(self.model.id == upstream.c.id)
+            )
+            .subquery()
+            .lateral("predecessors")
+        )
+        upstream = upstream.union(
+            select(upstream.c.root_id, predecessors.c.id).select_from(upstream.join(predecessors, true()))
+        )
+        res = await db.execute(select(upstream.c.root_id, upstream.c.id).filter(upstream.c.id != upstream.c.root_id))
+        result: Dict[UUID, set] = {}
+        for root_id, task_id in res.all():
+            result.setdefault(root_id, set()).add(task_id)
+        return result
+
+    async def is_blocked_by_recursive(self, db: AsyncSession, item_id: UUID, blocker_candidate_id: UUID) -> bool:
+        """Whether blocker_candidate_id is item_id itself or anywhere upstream of it."""
         if item_id == blocker_candidate_id:
             return True
-        if item_id in visited:
-            return False
-        visited.add(item_id)
-        
-        # Check Dependency table (preferred)
-        from app.models.dependency import Dependency
-        res = await db.execute(select(Dependency.predecessor_id).filter(Dependency.successor_id == item_id))
-        predecessors = res.scalars().all()
-        for pred_id in predecessors:
-            if await self.is_blocked_by_recursive(db, pred_id, blocker_candidate_id, visited):
-                return True
-                
-        # Fallback to old blocked_by_ids
-        res = await db.execute(select(Task.blocked_by_ids).filter(Task.id == item_id))
-        row = res.first()
-        if row and row[0]:
-            for b_id in row[0]:
-                if await self.is_blocked_by_recursive(db, b_id, blocker_candidate_id, visited):
-                    return True
-        return False
+        upstream = await self.get_transitive_blockers(db, task_ids=[item_id])
+        return blocker_candidate_id in upstream.get(item_id, ())
 
-    async def check_for_active_blockers(self, db: AsyncSession, item_id: UUID) -> List[str]:
-        active_blocker_titles = []
-        
+    async def get_active_blockers(
+        self, db: AsyncSession, *, task_ids: Optional[Iterable[UUID]] = None, project_id: Optional[UUID] = None
+    ) -> Dict[UUID, List[Dict[str, Any]]]:
+        """
+        {task_id: [{id, title, status}]} of the direct blockers (dependencies
+        and legacy blocked_by_ids) that are not Done, for the given tasks or a
+        whole project (Kanban boards), in one query. Unblocked tasks are absent.
+        """
         from app.models.dependency import Dependency
-        res = await db.execute(
-            select(Task)
-            .join(Dependency, Task.id == Dependency.predecessor_id)
-            .filter(Dependency.successor_id == item_id)
+        blocker = aliased(Task)
+        columns = (blocker.id, blocker.title, blocker.status)
+        dep_blockers = (
+            select(Dependency.successor_id.label("task_id"), *columns)
+            .join(blocker, blocker.id == Dependency.predecessor_id)
+            .filter(self._blocker_scope(Dependency.successor_id, task_ids, project_id), blocker.status != Status.DONE)
         )
-        tasks = res.scalars().all()
-        for t in tasks:
-            if t.status != Status.DONE:
-                active_blocker_titles.append(t.title)
-        
-        # Check legacy field
-        res = await db.execute(select(Task.blocked_by_ids).filter(Task.id == item_id))
-        row = res.first()
-        if row and row[0]:
-            for b_id in row[0]:
-                res = await db.execute(select(Task).filter(Task.id == b_id))
-                obj = res.scalars().first()
-                if obj and obj.status != Status.DONE:
-                    if obj.title not in active_blocker_titles:
-                        active_blocker_titles.append(obj.title)
-                        
-        return active_blocker_titles
+        legacy_blockers = (
+            select(self.model.id.label("task_id"), *columns)
+            .join(blocker, blocker.id == any_(self.model.blocked_by_ids))
+            .filter(self._blocker_scope(self.model.id, task_ids, project_id), blocker.status != Status.DONE)
+        )
+        res = await db.execute(dep_blockers.union(legacy_blockers).order_by("task_id", "title"))
+        result: Dict[UUID, List[Dict[str, Any]]] = {}
+        for task_id, blocker_id, title, status in res.all():
+            result.setdefault(task_id, []).append({"id": blocker_id, "title": title, "status": status})
+        return result
+
+    async def check_for_active_blockers(self, db: AsyncSession, item_id: UUID) -> List[str]:
+        blockers = await self.get_active_blockers(db, task_ids=[item_id])
+        return list(dict.fromkeys(b["title"] for b in blockers.get(item_id, [])))
 
     async def create(self, db: AsyncSession, *, obj_in: TaskCreate, owner_id: Optional[UUID] = None) -> Task:
         obj_data = clean_dict_datetimes(obj_in.dict(exclude_unset=True, exclude={'topic_ids', 'type_ids'}))
@@ -331,46 +1494,34 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
         topic_ids = getattr(obj_in, 'topic_ids', [])
         type_ids = getattr(obj_in, 'type_ids', [])
         
-        # 1. Bidirectional Date/Duration logic
-        from datetime import timedelta
-        start = obj_data.get("start_date")
-        due = obj_data.get("due_date")
-        dur = obj_data.get("duration_days")
-
-        if start and dur and dur > 0 and not due:
-            # Calculate due from start + dur (dur=1 means same day)
-            obj_data["due_date"] = start + timedelta(days=dur - 1)
-        elif start and due and not dur:
-            # Calculate dur from start/due
-            obj_data["duration_days"] = (due - start).days + 1
-        elif due and dur and dur > 0 and not start:
-            # Calculate start from due - dur
-            obj_data["start_date"] = due - timedelta(days=dur - 1)
-        elif start and due and dur:
-            # All 3 provided: prioritize duration to keep sync
-            obj_data["due_date"] = start + timedelta(days=dur - 1)
+        # 1. Bidirectional Date/Duration logic (working days if a calendar applies)
+        calendar = None
+        if obj_data.keys() & DATE_FIELDS:
+            calendar = await work_calendar.for_project(db, obj_data.get("project_id"))
+        obj_data = sync_task_dates(obj_data, calendar)
 
         # Status logic: set completed_at if created as DONE and not provided
         if obj_data.get("status") == Status.DONE and not obj_data.get("completed_at"):
             obj_data["completed_at"] = datetime.utcnow()
         
-        # Calculate next sort_index
+        # Append after existing siblings without looking them up
         if "sort_index" not in obj_data:
-            query = select(self.model.sort_index).filter(self.model.parent_id == obj_data.get("parent_id"))
-            if obj_data.get("project_id"):
-                query = query.filter(self.model.project_id == obj_data["project_id"])
-            else:
-                query = query.filter(self.model.project_id == None)
-                
-            result = await db.execute(
-                query.order_by(self.model.sort_index.desc()).limit(1)
-            )
-            max_idx = result.scalar()
-            obj_data["sort_index"] = (max_idx or 0) + 10
+            obj_data["sort_index"] = append_index()
+        obj_data["sort_key"] = index_key(obj_data["sort_index"])
             
         db_obj = self.model(**obj_data)
         if owner_id:
             db_obj.owner_id = owner_id
+
+        # id and created_at are part of the path segment, so fix them up front
+        if db_obj.id is None:
+            db_obj.id = uuid4()
+        if db_obj.created_at is None:
+            db_obj.created_at = datetime.utcnow()
+        db_obj.path = await self.compute_path(
+            db, task_id=db_obj.id, parent_id=db_obj.parent_id,
+            sort_key=db_obj.sort_key, created_at=db_obj.created_at
+        )
         
         if assignee_ids:
             from app.models.user import User
@@ -386,7 +1537,9 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
             db_obj.types = res.scalars().all()
 
         db.add(db_obj)
-        await db.commit()
+        await db.flush()
+        self.record_project_change(db, after=snapshot_task(db_obj, topic_ids=topic_ids or [], type_ids=type_ids or []))
+        self.record_events(db, db_obj.id, None, task_state(db_obj, [u.id for u in db_obj.assignees] if assignee_ids else []))
         await db.refresh(db_obj)
         
         # Handle recursive subtasks
@@ -402,10 +1555,11 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
                 )
                 await self.create(db, obj_in=st_create)
         
+        # Roll the new task's status up the hierarchy in the same transaction
         if db_obj.parent_id:
-            await self.update_parent_status_recursive(db, db_obj.parent_id)
-        
-        await self.sync_project_from_tasks(db, db_obj.project_id)
+            await self.rollup_ancestors(db, [db_obj.parent_id])
+        await self.flush_project_aggregates(db)
+        await db.commit()
             
         if assignee_ids:
             await self.notify_assignees(db, db_obj.id, assignee_ids, db_obj.title)
@@ -413,6 +1567,159 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
         # Refetch to get all relationships loaded
         return await self.get(db, db_obj.id)
 
+    async def create_bulk(self, db: AsyncSession, *, obj_in: TaskBulkCreate, owner_id: Optional[UUID] = None) -> List[Task]:
+        """
+        Create a forest of tasks (with assignees, topics, types and dependencies)
+        in one transaction. Returns the created root tasks with their subtrees.
+        """
+        project_id = obj_in.project_id
+        parent_path = None
+        if obj_in.parent_id:
+            res = await db.execute(
+                select(self.model.path, self.model.project_id).filter(self.model.id == obj_in.parent_id)
+            )
+            row = res.first()
+            if not row:
+                raise ValueError("Parent task not found")
+            parent_path = row[0]
+            if project_id is None:
+                project_id = row[1]
+
+        # Root items continue after the current last sibling
+        query = select(func.max(self.model.sort_index)).filter(self.model.parent_id == obj_in.parent_id)
+        if project_id:
+            query = query.filter(self.model.project_id == project_id)
+        else:
+            query = query.filter(self.model.project_id == None)
+        res = await db.execute(query)
+        max_idx = res.scalar()
+
+        plan = plan_task_forest(
+            obj_in.tasks,
+            project_id=project_id,
+            parent_id=obj_in.parent_id,
+            parent_path=parent_path,
+            owner_id=owner_id,
+            first_sort_index=(max_idx or 0) + 10,
+            calendar=await work_calendar.for_project(db, project_id),
+        )
+        return await self.insert_plan(db, plan=plan)
+
+    async def insert_plan(
+        self, db: AsyncSession, *, plan: TaskInsertPlan, notify: bool = True, load: bool = True
+    ) -> List[Task]:
+        """
+        Write a TaskInsertPlan with one executemany INSERT per table, then roll up
+        statuses, apply the project aggregates and commit once.
+        """
+        from app.models.user import User
+        from app.models.dependency import Dependency
+
+        if not plan.tasks:
+            return []
+
+        # Drop unknown users/topics/types like create() does; unknown predecessors are an error
+        async def known_ids(model, ids):
+            ids = set(ids)
+            if not ids:
+                return ids
+            res = await db.execute(select(model.id).filter(_any_of(model.id, ids)))
+            return set(res.scalars().all())
+
+        users = await known_ids(User, (r["user_id"] for r in plan.assignees))
+        topic_ids = await known_ids(Topic, (r["topic_id"] for r in plan.topics))
+        type_ids = await known_ids(WorkType, (r["type_id"] for r in plan.types))
+        external_preds = plan.existing_predecessor_ids()
+        pred_projects = {}
+        if external_preds:
+            res = await db.execute(select(self.model.id, self.model.project_id).filter(_any_of(self.model.id, external_preds)))
+            pred_projects = dict(res.all())
+        missing = external_preds - pred_projects.keys()
+        if missing:
+            raise ValueError(f"Predecessor tasks not found: {', '.join(str(m) for m in missing)}")
+
+        assignee_rows = [r for r in plan.assignees if r["user_id"] in users]
+        topic_rows = [r for r in plan.topics if r["topic_id"] in topic_ids]
+        type_rows = [r for r in plan.types if r["type_id"] in type_ids]
+
+        await db.execute(insert(self.model), plan.tasks)
+        for table, rows in ((task_assignees, assignee_rows), (task_topics, topic_rows), (task_types, type_rows)):
+            if rows:
+                await db.execute(insert(table), rows)
+        if plan.dependencies:
+            await db.execute(insert(Dependency), plan.dependencies)
+            # The new links are outgoing edges of the existing predecessors, held
+            # in their projects' cached graphs (see app.core.dependency_graph)
+            self.mark_project_changed(db, *pred_projects.values())
+
+        await self.rollup_ancestors(db, plan.parent_ids)
+
+        topics_by_task = defaultdict(list)
+        for r in topic_rows:
+            topics_by_task[r["task_id"]].append(r["topic_id"])
+        types_by_task = defaultdict(list)
+        for r in type_rows:
+            types_by_task[r["task_id"]].append(r["type_id"])
+        assignees_by_task = defaultdict(list)
+        for r in assignee_rows:
+            assignees_by_task[r["task_id"]].append(r["user_id"])
+        for row in plan.tasks:
+            task_row = SimpleNamespace(**row)
+            self.record_project_change(db, after=snapshot_task(
+                task_row, topic_ids=topics_by_task[row["id"]], type_ids=types_by_task[row["id"]]
+            ))
+            self.record_events(db, row["id"], None, task_state(task_row, assignees_by_task[row["id"]]))
+        await self.flush_project_aggregates(db)
+        await db.commit()
+
+        if notify and assignee_rows:
+            await self.notify_assignees_bulk(db, plan.tasks, assignee_rows)
+
+        if not load:
+            return []
+        return await self._load_forest(db, select(self.model.id).filter(_any_of(self.model.id, plan.root_ids)))
+
+    async def notify_assignees_bulk(self, db: AsyncSession, task_rows: List[dict], assignee_rows: List[dict]):
+        from app.crud.crud_notification import notification as notification_crud
+        from app.schemas.notification import NotificationCreate
+
+        by_id = {t["id"]: t for t in task_rows}
+        notifications = []
+        for r in assignee_rows:
+            t = by_id[r["task_id"]]
+            link = f"/projects/{t['project_id']}?task_id={t['id']}" if t["project_id"] else f"/tasks?task_id={t['id']}"
+            notifications.append(NotificationCreate(
+                user_id=r["user_id"],
+                title="New Assignment",
+                message=f"You have been assigned to task '{t['title']}'.",
+                type="assignment",
+                link=link
+            ))
+        await notification_crud.create_multi(db, objs_in=notifications)
+
+    async def notify_rescheduled(
+        self, db: AsyncSession, project_id: UUID, changes: List[dict], assigned: Dict[UUID, List[UUID]]
+    ):
+        """Tell the assignees of tasks moved by leveling (see level_resources) their new dates, in one batch."""
+        from app.crud.crud_notification import notification as notification_crud
+        from app.schemas.notification import NotificationCreate
+
+        notifications = [
+            NotificationCreate(
+                user_id=user_id,
+                title="Task Rescheduled",
+                message=(
+                    f"Task '{c['title']}' was moved by {c['delay_days']} day(s) to balance workload: "
+                    f"{c['new_start_date']:%Y-%m-%d} to {c['new_due_date']:%Y-%m-%d}."
+                ),
+                type="rescheduled",
+                link=f"/projects/{project_id}?task_id={c['task_id']}",
+            )
+            for c in changes
+            for user_id in assigned.get(c["task_id"], ())
+        ]
+        return await notification_crud.create_multi(db, objs_in=notifications)
+
     async def notify_assignees(self, db: AsyncSession, item_id: UUID, user_ids: List[UUID], item_title: str):
         # Refetch or use db_obj if available to get project_id
         res = await db.execute(select(Task.project_id).filter(Task.id == item_id))
@@ -435,12 +1742,83 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
                 )
             )
 
+    async def notify_unblocked_tasks(self, db: AsyncSession, completed: Dict[UUID, Status]):
+        """
+        Notify the assignees (else the owner) of every open successor that the
+        completion of these tasks ({task_id: status before}) leaves with no
+        unsatisfied predecessor. A link is satisfied once its predecessor is
+        Done (FS/FF) or started (SS/SF, so completing a task that was already
+        under way does not re-trigger those). Legacy blocked_by_ids must all be
+        Done too. One query finds the tasks and recipients; the notifications
+        are inserted and pushed as one batch.
+        """
+        from app.models.dependency import Dependency
+        from app.crud.crud_notification import notification as notification_crud
+        from app.schemas.notification import NotificationCreate
+        from app.core.enums import DependencyType
+
+        if not completed:
+            return []
+        finish_types = (DependencyType.FS, DependencyType.FF)
+        newly_started = [t_id for t_id, old in completed.items() if old not in STARTED_STATUSES]
+        triggered = or_(Dependency.type.in_(finish_types), _any_of(Dependency.predecessor_id, newly_started))
+        candidates = select(Dependency.successor_id).filter(_any_of(Dependency.predecessor_id, completed), triggered)
+
+        link = aliased(Dependency)
+        blocker = aliased(Task)
+        unsatisfied = (
+            select(link.id)
+            .join(blocker, blocker.id == link.predecessor_id)
+            .filter(
+                link.successor_id == self.model.id,
+                or_(
+                    and_(link.type.in_(finish_types), blocker.status != Status.DONE),
+                    and_(link.type.notin_(finish_types), blocker.status.notin_(STARTED_STATUSES)),
+                ),
+            )
+            .exists()
+        )
+        legacy_blocker = aliased(Task)
+        legacy_unfinished = (
+            select(legacy_blocker.id)
+            .filter(legacy_blocker.id == any_(self.model.blocked_by_ids), legacy_blocker.status != Status.DONE)
+            .exists()
+        )
+        res = await db.execute(
+            select(
+                self.model.id, self.model.title, self.model.project_id,
+                func.coalesce(task_assignees.c.user_id, self.model.owner_id),
+            )
+            .outerjoin(task_assignees, task_assignees.c.task_id == self.model.id)
+            .filter(
+                self.model.id.in_(candidates),
+                self.model.status != Status.DONE,
+                self.model.is_archived == false(),
+                ~unsatisfied,
+                ~legacy_unfinished,
+            )
+        )
+        notifications = []
+        for t_id, title, project_id, user_id in res.all():
+            if user_id is None:
+                continue
+            notifications.append(NotificationCreate(
+                user_id=user_id,
+                title="Task Unblocked",
+                message=f"Task '{title}' has been unblocked and can proceed.",
+                type="unblocked",
+                link=f"/projects/{project_id}?task_id={t_id}" if project_id else f"/tasks?task_id={t_id}",
+            ))
+        return await notification_crud.create_multi(db, objs_in=notifications)
+
     async def update(
         self, db: AsyncSession, *, db_obj: Task, obj_in: Union[TaskUpdate, Dict[str, Any]]
     ) -> Task:
         # Capture IDs early to avoid lazy-loading issues during async operations
-        project_id = db_obj.project_id
         old_parent_id = db_obj.parent_id
+        old_status = db_obj.status
+        before = snapshot_task(db_obj)
+        before_state = task_state(db_obj)
         
         if isinstance(obj_in, TaskUpdate):
             obj_data = obj_in.dict(exclude_unset=True)
@@ -457,29 +1835,31 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
         # 1. Clean data and naivify dates
         obj_data = clean_dict_datetimes(obj_data)
         
-        # 2. Bidirectional Date/Duration logic
-        from datetime import timedelta
+        # 2. Bidirectional Date/Duration logic (working days if a calendar applies)
         start = obj_data.get("start_date", db_obj.start_date)
         due = obj_data.get("due_date", db_obj.due_date)
         dur = obj_data.get("duration_days", db_obj.duration_days)
 
         # Detect what changed to decide calculation priority
         changed = obj_data.keys()
+        calendar = None
+        if changed & DATE_FIELDS:
+            calendar = await work_calendar.for_project(db, obj_data.get("project_id", db_obj.project_id))
         
         if "duration_days" in changed:
             # If duration changed, update due date (dur=1 means same day)
             if start and dur and dur > 0:
-                obj_data["due_date"] = start + timedelta(days=dur - 1)
+                obj_data["due_date"] = shift_days(start, dur - 1, calendar)
         elif "start_date" in changed:
             # If start changed, either update due (if dur exists) or dur (if due exists)
             if dur and dur > 0:
-                obj_data["due_date"] = start + timedelta(days=dur - 1)
+                obj_data["due_date"] = shift_days(start, dur - 1, calendar)
             elif due:
-                obj_data["duration_days"] = (due - start).days + 1
+                obj_data["duration_days"] = span_days(start, due, calendar)
         elif "due_date" in changed:
             # If due changed, update duration
             if start:
-                obj_data["duration_days"] = (due - start).days + 1
+                obj_data["duration_days"] = span_days(start, due, calendar)
 
         # 3. Status logic: check blockers ONLY if moving TO Done
         if obj_data.get("status") == Status.DONE and db_obj.status != Status.DONE:
@@ -494,10 +1874,11 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
 
         # 4. Dependency Logic: prevent circularity
         if new_blocker_ids is not None:
+            if db_obj.id in new_blocker_ids:
+                raise ValueError("Item cannot block itself")
+            upstream = await self.get_transitive_blockers(db, task_ids=new_blocker_ids) if new_blocker_ids else {}
             for b_id in new_blocker_ids:
-                if b_id == db_obj.id:
-                    raise ValueError("Item cannot block itself")
-                if await self.is_blocked_by_recursive(db, b_id, db_obj.id, set()):
+                if db_obj.id in upstream.get(b_id, ()):
                     raise ValueError(f"Circular dependency detected with item ID: {b_id}")
             db_obj.blocked_by_ids = new_blocker_ids
 
@@ -528,25 +1909,61 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
             if new_p_id == db_obj.id:
                 raise ValueError("A task cannot be its own parent")
             
-            async def is_descendant(parent_candidate_id: UUID, task_id: UUID) -> bool:
-                res = await db.execute(select(self.model.id).filter(self.model.parent_id == task_id))
-                children_ids = res.scalars().all()
-                for c_id in children_ids:
-                    if c_id == parent_candidate_id or await is_descendant(parent_candidate_id, c_id):
-                        return True
-                return False
-            
-            if await is_descendant(new_p_id, db_obj.id):
+            # The candidate is a descendant iff its path starts with ours
+            res = await db.execute(select(self.model.path).filter(self.model.id == new_p_id))
+            if is_descendant_path(res.scalar(), db_obj.path):
                 raise ValueError("Cannot set a descendant as a parent (circular hierarchy)")
 
-        # 8. Call base update for remaining fields
-        db_obj = await super().update(db, db_obj=db_obj, obj_in=obj_data)
+        # 7b. Keep the materialized path in sync with parent/sort order changes.
+        # Clients send sort_index back unchanged with every edit; re-keying then
+        # would undo the fractional key a reorder gave the task
+        if obj_data.get("sort_index", db_obj.sort_index) == db_obj.sort_index:
+            obj_data.pop("sort_index", None)
+        if "parent_id" in obj_data or "sort_index" in obj_data:
+            if "sort_index" in obj_data:
+                obj_data["sort_key"] = index_key(obj_data["sort_index"])
+            old_path = db_obj.path
+            new_parent_id = obj_data.get("parent_id", db_obj.parent_id)
+            new_path = await self.compute_path(
+                db, task_id=db_obj.id,
+                parent_id=UUID(str(new_parent_id)) if new_parent_id else None,
+                sort_key=obj_data.get("sort_key") or db_obj.sort_key or index_key(db_obj.sort_index),
+                created_at=db_obj.created_at
+            )
+            if new_path != old_path:
+                if old_path:
+                    await self.move_subtree_paths(db, old_path=old_path, new_path=new_path)
+                obj_data["path"] = new_path
+
+        # 8. Apply remaining fields
+        for field in obj_data:
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, obj_data[field])
+        db.add(db_obj)
+        await db.flush()
         
-        # 9. Post-update bubbles
-        if old_parent_id:
-            await self.update_parent_status_recursive(db, old_parent_id)
-        if db_obj.parent_id and db_obj.parent_id != old_parent_id:
-            await self.update_parent_status_recursive(db, db_obj.parent_id)
+        # 9. Roll status up the old and new parent chains, committed with the change
+        transitions = []
+        if "status" in obj_data or "parent_id" in obj_data:
+            transitions = await self.rollup_ancestors(db, [old_parent_id, db_obj.parent_id])
+        self.record_project_change(db, before=before, after=snapshot_task(db_obj))
+        self.record_events(db, db_obj.id, before_state, task_state(db_obj))
+        await self.flush_project_aggregates(db)
+        # 9b. Incremental CPM update for date/completion/archive changes
+        if before.project_id != db_obj.project_id:
+            await self.reschedule_moved_task(
+                db, task_id=db_obj.id, old_project_id=before.project_id, new_project_id=db_obj.project_id
+            )
+        elif db_obj.project_id and SCHEDULE_FIELDS & obj_data.keys():
+            await self.refresh_schedule(db, project_id=db_obj.project_id, changed_ids=[db_obj.id])
+        await db.commit()
+        await db.refresh(db_obj)
+
+        # 9c. Successors left without unfinished predecessors (ancestors completed by the rollup count too)
+        completed = {t_id: old for t_id, old, new in transitions if new == Status.DONE and old != Status.DONE}
+        if db_obj.status == Status.DONE and old_status != Status.DONE:
+            completed[db_obj.id] = old_status
+        await self.notify_unblocked_tasks(db, completed)
         
         # 10. Handle recursive subtasks
         if subtasks_data:
@@ -558,11 +1975,98 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
                     **st_data
                 )
                 await self.create(db, obj_in=st_create)
-
-        await self.sync_project_from_tasks(db, project_id)
         
         return await self.get(db, db_obj.id)
 
+    async def reorder(self, db: AsyncSession, *, moves: List[TaskMove]) -> List[Task]:
+        """
+        Apply a batch of moves (reorder among siblings and/or re-parent) in one
+        transaction. Each moved task gets a fractional sort key between its new
+        neighbours, so siblings are not renumbered. Two queries load the tasks
+        involved and the target sibling lists, the plan is computed in memory,
+        and all rows are written with one executemany UPDATE plus one
+        path re-prefix per moved subtree.
+
+        Returns the moved tasks with their subtrees.
+        """
+        if not moves:
+            return []
+        cols = [
+            self.model.id, self.model.parent_id, self.model.project_id, self.model.path,
+            self.model.sort_key, self.model.sort_index, self.model.created_at,
+        ]
+
+        # 1. Moved tasks, anchors and explicit new parents
+        moved_ids = [m.task_id for m in moves]
+        wanted = set(moved_ids) | {i for m in moves for i in (m.after_id, m.before_id, m.parent_id) if i}
+        res = await db.execute(
+            select(*cols, self.model.status, self.model.checklist).filter(_any_of(self.model.id, wanted))
+        )
+        known = {r.id: r for r in res.all()}
+        missing = set(moved_ids) - known.keys()
+        if missing:
+            raise ValueError(f"Tasks not found: {', '.join(str(i) for i in missing)}")
+
+        # 2. Every sibling list a task can land in, plus those lists' parents
+        involved = [known[i] for i in wanted if i in known and i not in {m.parent_id for m in moves}]
+        parent_ids = {m.parent_id for m in moves if m.parent_id} | {r.parent_id for r in involved if r.parent_id}
+        root_projects = {known[m.task_id].project_id for m in moves if "parent_id" in m.model_fields_set and not m.parent_id}
+        root_projects |= {r.project_id for r in involved if not r.parent_id}
+
+        conditions = []
+        if parent_ids:
+            conditions += [_any_of(self.model.id, parent_ids), _any_of(self.model.parent_id, parent_ids)]
+        if root_projects - {None}:
+            conditions.append(and_(self.model.parent_id.is_(None), _any_of(self.model.project_id, root_projects - {None})))
+        if None in root_projects:
+            conditions.append(and_(self.model.parent_id.is_(None), self.model.project_id.is_(None)))
+        rows = dict(known)
+        res = await db.execute(select(*cols).filter(or_(*conditions)))
+        for r in res.all():
+            rows.setdefault(r.id, r)
+
+        plan = plan_reorder(moves, rows.values())
+
+        # 3. Descendant paths first (deepest first), then the changed rows themselves
+        for old_path, new_path in plan.path_moves:
+            await self.move_subtree_paths(db, old_path=old_path, new_path=new_path)
+        if plan.rows:
+            table = self.model.__table__
+            await db.execute(
+                sql_update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values(
+                    parent_id=bindparam("b_parent_id"),
+                    sort_key=bindparam("b_sort_key"),
+                    sort_index=bindparam("b_sort_index"),
+                    path=bindparam("b_path"),
+                ),
+                [{f"b_{k}": v for k, v in row.items()} for row in plan.rows]
+            )
+
+        # 4. Status rollup and top-level counts for re-parented tasks
+        if plan.parent_changes:
+            await self.rollup_ancestors(db, [p for _, old, new in plan.parent_changes for p in (old, new)])
+        for task_id, old_parent_id, new_parent_id in plan.parent_changes:
+            row = known.get(task_id)
+            if row is None:
+                continue
+            self.record_events(
+                db, task_id, {"project_id": row.project_id, "parent_id": old_parent_id},
+                {"project_id": row.project_id, "parent_id": new_parent_id}
+            )
+            if (old_parent_id is None) == (new_parent_id is None):
+                continue
+            progress = task_progress(row.status, row.checklist)
+            snap = TaskSnapshot(row.project_id, old_parent_id is None, progress, None, None, frozenset(), frozenset())
+            self.record_project_change(db, before=snap, after=snap._replace(is_top_level=new_parent_id is None))
+        # Sibling order changes the WBS codes even without re-parenting
+        self.mark_project_changed(db, *(known[task_id].project_id for task_id in moved_ids))
+        await self.flush_project_aggregates(db)
+        await db.commit()
+
+        return await self._load_forest(db, select(self.model.id).filter(_any_of(self.model.id, moved_ids)))
+
     async def update_assignees(self, db: AsyncSession, *, task_id: UUID, user_ids: List[UUID]) -> Task:
         db_obj = await self.get(db, id=task_id)
         if not db_obj:
@@ -570,6 +2074,7 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
         
         current_ids = [u.id for u in db_obj.assignees]
         added_ids = [uid for uid in user_ids if uid not in current_ids]
+        before_state = task_state(db_obj)
         
         from app.models.user import User
         res = await db.execute(select(User).filter(User.id.in_(user_ids)))
@@ -579,6 +2084,9 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
             await self.notify_assignees(db, db_obj.id, added_ids, db_obj.title)
             
         db.add(db_obj)
+        self.mark_project_changed(db, db_obj.project_id)
+        self.record_events(db, db_obj.id, before_state, task_state(db_obj))
+        await self.flush_project_aggregates(db)
         await db.commit()
         await db.refresh(db_obj)
         return db_obj
@@ -590,15 +2098,29 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
             return None
             
         parent_id = db_obj.parent_id
-        project_id = db_obj.project_id
         
-        obj = await super().remove(db, id=id)
+        # The whole loaded subtree goes with it
+        removed_ids = []
+        stack = [db_obj]
+        while stack:
+            t = stack.pop()
+            removed_ids.append(t.id)
+            self.record_project_change(db, before=snapshot_task(t))
+            self.record_events(db, t.id, task_state(t), None)
+            stack.extend(t.subtasks)
+        # Their dependencies cascade away; the other ends need rescheduling
+        neighbour_ids = await self._dependency_neighbours(db, removed_ids) if db_obj.project_id else set()
         
-        if parent_id:
-            await self.update_parent_status_recursive(db, parent_id)
+        await db.delete(db_obj)
+        await db.flush()
         
-        await self.sync_project_from_tasks(db, project_id)
-        return obj
+        if parent_id:
+            await self.rollup_ancestors(db, [parent_id])
+        await self.flush_project_aggregates(db)
+        if db_obj.project_id:
+            await self.refresh_schedule(db, project_id=db_obj.project_id, changed_ids=neighbour_ids)
+        await db.commit()
+        return db_obj
 
 task = CRUDTask(Task)
 # Point subtask to task for backward compatibility during migration
@@ -11,6 +11,8 @@ from app.schemas.template import ProjectTemplateCreate, ProjectTemplateUpdate
 from app.core.utils import clean_dict_for_json
 
 class CRUDProjectTemplate(CRUDBase[ProjectTemplate, ProjectTemplateCreate, ProjectTemplateUpdate]):
+    keyset = ("name", "id")
+
     async def get(self, db: AsyncSession, id: Any) -> Optional[ProjectTemplate]:
         result = await db.execute(
             select(self.model)
@@ -20,30 +22,25 @@ class CRUDProjectTemplate(CRUDBase[ProjectTemplate, ProjectTemplateCreate, Proje
         return result.scalars().first()
 
     async def get_multi(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
     ) -> List[ProjectTemplate]:
-        result = await db.execute(
-            select(self.model)
-            .options(selectinload(ProjectTemplate.shared_with), selectinload(ProjectTemplate.owner))
-            .offset(skip)
-            .limit(limit)
-        )
+        query = select(self.model).options(selectinload(ProjectTemplate.shared_with), selectinload(ProjectTemplate.owner))
+        result = await db.execute(self.paginate(query, skip=skip, limit=limit, cursor=cursor))
         return result.scalars().all()
 
     async def get_multi_by_owner(
-        self, db: AsyncSession, *, owner_id: UUID, skip: int = 0, limit: int = 100
+        self, db: AsyncSession, *, owner_id: UUID, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
     ) -> List[ProjectTemplate]:
-        result = await db.execute(
+        query = (
             select(self.model)
             .filter(self.model.owner_id == owner_id)
             .options(selectinload(ProjectTemplate.shared_with), selectinload(ProjectTemplate.owner))
-            .offset(skip)
-            .limit(limit)
         )
+        result = await db.execute(self.paginate(query, skip=skip, limit=limit, cursor=cursor))
         return result.scalars().all()
 
     async def get_multi_by_user(
-        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100
+        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
     ) -> List[ProjectTemplate]:
         """
         Fetch templates where the user is either the owner OR it's shared OR it's public.
@@ -62,10 +59,8 @@ class CRUDProjectTemplate(CRUDBase[ProjectTemplate, ProjectTemplateCreate, Proje
             )
             .distinct()
             .options(selectinload(ProjectTemplate.shared_with), selectinload(ProjectTemplate.owner))
-            .offset(skip)
-            .limit(limit)
         )
-        result = await db.execute(query)
+        result = await db.execute(self.paginate(query, skip=skip, limit=limit, cursor=cursor))
         return result.scalars().all()
 
     async def create_with_owner(
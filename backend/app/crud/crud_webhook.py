@@ -8,6 +8,8 @@ from app.models.webhook import Webhook
 from app.schemas.webhook import WebhookCreate, WebhookUpdate
 
 class CRUDWebhook(CRUDBase[Webhook, WebhookCreate, WebhookUpdate]):
+    keyset = ("created_at", "id")
+
     async def create_with_owner(
         self, db: AsyncSession, *, obj_in: WebhookCreate, owner_id: UUID
     ) -> Webhook:
@@ -19,13 +21,13 @@ class CRUDWebhook(CRUDBase[Webhook, WebhookCreate, WebhookUpdate]):
         return db_obj
 
     async def get_multi_by_owner(
-        self, db: AsyncSession, *, owner_id: UUID, skip: int = 0, limit: int = 100
+        self, db: AsyncSession, *, owner_id: UUID, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
     ) -> List[Webhook]:
         result = await db.execute(
-            select(self.model)
-            .filter(self.model.owner_id == owner_id)
-            .offset(skip)
-            .limit(limit)
+            self.paginate(
+                select(self.model).filter(self.model.owner_id == owner_id),
+                skip=skip, limit=limit, cursor=cursor
+            )
         )
         return result.scalars().all()
 
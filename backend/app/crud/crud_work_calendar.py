@@ -0,0 +1,107 @@
+from typing import Dict, Iterable, Optional
+from uuid import UUID
+from sqlalchemy import or_, and_, delete, update as sql_update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.crud.base import CRUDBase
+from app.models.work_calendar import WorkCalendar
+from app.schemas.work_calendar import WorkCalendarUpdate
+from app.core.working_calendar import WorkingCalendar, get_calendar, weekday_mask, mask_weekdays
+
+def _scope(model, project_id: Optional[UUID], user_id: Optional[UUID]):
+    return and_(
+        model.project_id == project_id if project_id else model.project_id.is_(None),
+        model.user_id == user_id if user_id else model.user_id.is_(None),
+    )
+
+class CRUDWorkCalendar(CRUDBase[WorkCalendar, WorkCalendarUpdate, WorkCalendarUpdate]):
+    def as_calendar(self, row: Optional[WorkCalendar]) -> Optional[WorkingCalendar]:
+        if row is None:
+            return None
+        return get_calendar(mask_weekdays(row.working_weekdays), row.holidays or ())
+
+    def as_dict(self, row: WorkCalendar) -> dict:
+        return {
+            "id": row.id,
+            "project_id": row.project_id,
+            "user_id": row.user_id,
+            "working_weekdays": mask_weekdays(row.working_weekdays),
+            "holidays": sorted(row.holidays or []),
+            "updated_at": row.updated_at,
+        }
+
+    async def get_scoped(
+        self, db: AsyncSession, *, project_id: Optional[UUID] = None, user_id: Optional[UUID] = None
+    ) -> Optional[WorkCalendar]:
+        """The calendar row of exactly this scope (both None: the global calendar)."""
+        result = await db.execute(select(self.model).filter(_scope(self.model, project_id, user_id)))
+        return result.scalars().first()
+
+    async def set_scoped(
+        self, db: AsyncSession, *, obj_in: WorkCalendarUpdate,
+        project_id: Optional[UUID] = None, user_id: Optional[UUID] = None
+    ) -> WorkCalendar:
+        db_obj = await self.get_scoped(db, project_id=project_id, user_id=user_id)
+        if db_obj is None:
+            db_obj = self.model(project_id=project_id, user_id=user_id)
+            db.add(db_obj)
+        db_obj.working_weekdays = weekday_mask(obj_in.working_weekdays)
+        db_obj.holidays = sorted(set(obj_in.holidays))
+        await self._calendar_changed(db, project_id=project_id, user_id=user_id)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove_scoped(
+        self, db: AsyncSession, *, project_id: Optional[UUID] = None, user_id: Optional[UUID] = None
+    ) -> bool:
+        res = await db.execute(delete(self.model).where(_scope(self.model, project_id, user_id)))
+        if not res.rowcount:
+            return False
+        await self._calendar_changed(db, project_id=project_id, user_id=user_id)
+        await db.commit()
+        return True
+
+    async def _calendar_changed(self, db: AsyncSession, *, project_id: Optional[UUID], user_id: Optional[UUID]):
+        """Project results depend on the project's calendar; invalidate them.
+        The stored CPM state notices the new calendar on its own (calendar_key)."""
+        from app.models.project import Project
+        if user_id:
+            return  # User calendars only affect workload, which is not cached
+        stmt = sql_update(Project).values(revision=Project.revision + 1, updated_at=Project.updated_at)
+        if project_id:
+            stmt = stmt.where(Project.id == project_id)
+        else:
+            # Projects with their own calendar do not see the global one
+            stmt = stmt.where(~Project.id.in_(select(self.model.project_id).filter(self.model.project_id.isnot(None))))
+        await db.execute(stmt)
+
+    async def for_project(self, db: AsyncSession, project_id: Optional[UUID]) -> Optional[WorkingCalendar]:
+        """The project's calendar, else the global one, else None (calendar days)."""
+        result = await db.execute(
+            select(self.model).filter(
+                self.model.user_id.is_(None),
+                or_(self.model.project_id == project_id, self.model.project_id.is_(None)) if project_id
+                else self.model.project_id.is_(None),
+            )
+        )
+        rows = result.scalars().all()
+        row = next((r for r in rows if r.project_id), None) or next(iter(rows), None)
+        return self.as_calendar(row)
+
+    async def for_users(
+        self, db: AsyncSession, user_ids: Iterable[UUID]
+    ) -> Dict[Optional[UUID], Optional[WorkingCalendar]]:
+        """{user_id: calendar} for users with their own calendar, plus None: the global one."""
+        user_ids = list(user_ids)
+        conditions = [and_(self.model.project_id.is_(None), self.model.user_id.is_(None))]
+        if user_ids:
+            conditions.append(self.model.user_id.in_(user_ids))
+        result = await db.execute(select(self.model).filter(or_(*conditions)))
+        calendars = {None: None}
+        for row in result.scalars().all():
+            calendars[row.user_id] = self.as_calendar(row)
+        return calendars
+
+work_calendar = CRUDWorkCalendar(WorkCalendar)
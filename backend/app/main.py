@@ -1,10 +1,12 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 from app.api.api_v1.api import api_router
 from app.api.api_v1.endpoints.mcp import mcp
 from app.core.config import settings
+from app.core.pagination import InvalidCursorError, NEXT_CURSOR_HEADER
 
 app = FastAPI(title="Monolith Project Planner API", version="0.1.0")
 
@@ -18,8 +20,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
 app.include_router(api_router, prefix="/api/v1")
 app.mount("/mcp", mcp.sse_app)
 app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
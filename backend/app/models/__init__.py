@@ -11,3 +11,7 @@ from .workflow import Workflow
 from .comment import Comment
 from .whiteboard import Whiteboard
 from .webhook import Webhook
+from .schedule import ProjectSchedule, TaskSchedule, ProjectResultCache
+from .work_calendar import WorkCalendar
+from .completion_activity import CompletionActivity
+from .task_event import TaskEvent
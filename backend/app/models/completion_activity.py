@@ -0,0 +1,25 @@
+import uuid
+from sqlalchemy import Column, ForeignKey, Integer, Date, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.session import Base
+
+class CompletionActivity(Base):
+    """
+    Completed tasks per day, project and task owner: the contribution heatmaps
+    read this instead of grouping the task history. Kept up to date by the
+    task writes (see CRUDTask.flush_project_aggregates); rebuilt from the tasks
+    by rebuild_completion_activity.py. A task counts on the day of its
+    completed_at; personal tasks have no project_id.
+    """
+    __tablename__ = "completion_activity"
+    __table_args__ = (
+        # Upsert target; tasks without a project or owner share the NULL key
+        Index("uq_completion_activity_key", "day", "project_id", "user_id", unique=True, postgresql_nulls_not_distinct=True),
+        Index("ix_completion_activity_project_day", "project_id", "day"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    day = Column(Date, nullable=False)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum as SAEnum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum as SAEnum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db.session import Base
@@ -8,6 +8,8 @@ from app.core.enums import IdeaStatus
 
 class Idea(Base):
     __tablename__ = "ideas"
+    # Keyset pagination order (see CRUDBase.paginate)
+    __table_args__ = (Index("ix_ideas_project_id_created_at_id", "project_id", "created_at", "id"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
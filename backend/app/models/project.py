@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Table, Boolean, Integer, Enum as SAEnum
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Table, Boolean, Integer, Enum as SAEnum, Index
 from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
 from sqlalchemy.orm import relationship
 from app.db.session import Base
@@ -9,6 +9,8 @@ from app.models.associations import project_topics, project_types, project_membe
 
 class Project(Base):
     __tablename__ = "projects"
+    # Keyset pagination order (see CRUDBase.paginate)
+    __table_args__ = (Index("ix_projects_created_at_id", "created_at", "id"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     name = Column(String, index=True, nullable=False)
@@ -24,6 +26,13 @@ class Project(Base):
     
     status = Column(SAEnum(Status), default=Status.TODO)
     progress_percent = Column(Float, default=0.0)
+    # Running aggregates behind progress_percent (NULL = not backfilled yet,
+    # forces a full recompute on the next task write)
+    top_task_count = Column(Integer, nullable=True, default=0)
+    progress_sum = Column(Float, nullable=True, default=0.0)
+    # Bumped by every write to the project, its tasks or their dependencies;
+    # keys the derived-result cache (see app.core.result_cache)
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,40 @@
+from datetime import datetime
+from sqlalchemy import Column, ForeignKey, DateTime, Integer, Boolean, String
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.db.session import Base
+
+class ProjectSchedule(Base):
+    """Inputs of the last CPM run that affect every task of the project."""
+    __tablename__ = "project_schedules"
+
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    project_start = Column(DateTime, nullable=False)  # Earliest task start; ES of undated tasks
+    finish_floor = Column(DateTime, nullable=True)    # Project due date
+    calendar_key = Column(String, nullable=True)      # WorkingCalendar.key; NULL = calendar days
+    project_finish = Column(DateTime, nullable=False)
+    computed_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class TaskSchedule(Base):
+    """Persisted CPM times of one task (see CRUDTask.refresh_schedule)."""
+    __tablename__ = "task_schedules"
+
+    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # NULL for tasks on or behind a dependency cycle
+    es = Column(DateTime, nullable=True)
+    ef = Column(DateTime, nullable=True)
+    ls = Column(DateTime, nullable=True)
+    lf = Column(DateTime, nullable=True)
+    slack_days = Column(Integer, nullable=True)
+    is_critical = Column(Boolean, default=False, nullable=False)
+
+class ProjectResultCache(Base):
+    """Shared level of the (project_id, revision) result cache (see app.core.result_cache)."""
+    __tablename__ = "project_result_cache"
+
+    # Revisions only grow, so one row per project (the latest) is enough
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    revision = Column(Integer, nullable=False)
+    payload = Column(JSONB, nullable=False)
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Table, Enum as SAEnum, Integer, Boolean, Float
+from sqlalchemy import Column, String, DateTime, ForeignKey, Table, Enum as SAEnum, Integer, Boolean, Float, Index
 from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
 from sqlalchemy.orm import relationship
 from app.db.session import Base
@@ -9,12 +9,19 @@ from app.models.associations import task_topics, task_types, task_assignees, sub
 
 class Task(Base):
     __tablename__ = "tasks"
+    # Keyset pagination order (see CRUDBase.paginate)
+    __table_args__ = (Index("ix_tasks_project_id_path", "project_id", "path"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=True)
     parent_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id"), nullable=True)
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     
+    # Materialized hierarchy path (see app.core.hierarchy). "C" collation keeps
+    # byte-wise ordering so ORDER BY path is a depth-first WBS walk and subtree
+    # lookups are plain index range scans.
+    path = Column(String(collation="C"), index=True, nullable=True)
+    
     title = Column(String, index=True, nullable=False)
     description = Column(String, nullable=True)
     topic = Column(String, index=True)
@@ -47,6 +54,8 @@ class Task(Base):
     # Unified dependency storage
     blocked_by_ids = Column(ARRAY(UUID(as_uuid=True)), default=[])
     sort_index = Column(Integer, default=0)
+    # Authoritative sibling order (app.core.ordering); sort_index is kept for API compatibility
+    sort_key = Column(String(collation="C"), index=True, nullable=True)
     
     # PERT Estimation Fields
     optimistic_days = Column(Integer, default=0)
@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, DateTime, Identity, Index, String
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.db.session import Base
+
+class TaskEvent(Base):
+    """
+    Append-only history of task changes (see app.core.task_events), written
+    by CRUDTask in one multi-row INSERT per flush. Rows are never updated,
+    so they land in occurred_at order and a BRIN index serves time ranges
+    over the whole table; the btree indexes serve one task's or one project's
+    history. No foreign keys: the history outlives deleted tasks and projects.
+    """
+    __tablename__ = "task_events"
+    __table_args__ = (
+        Index("ix_task_events_occurred_at_brin", "occurred_at", postgresql_using="brin"),
+        Index("ix_task_events_task_id_occurred_at", "task_id", "occurred_at"),
+        Index("ix_task_events_project_id_occurred_at", "project_id", "occurred_at"),
+    )
+
+    # Sequential ids keep inserts at the end of the primary key index
+    id = Column(BigInteger, Identity(), primary_key=True)
+    task_id = Column(UUID(as_uuid=True), nullable=False)
+    project_id = Column(UUID(as_uuid=True), nullable=True)
+    # created / deleted / status / dates / assignees / moved
+    kind = Column(String, nullable=False)
+    # {field: [old, new]}
+    changes = Column(JSONB, nullable=False, default={})
+    occurred_at = Column(DateTime, nullable=False, default=datetime.utcnow)
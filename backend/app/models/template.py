@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, JSON, ForeignKey
+from sqlalchemy import Column, String, Boolean, JSON, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db.session import Base
@@ -7,6 +7,8 @@ from app.models.associations import template_shares
 
 class ProjectTemplate(Base):
     __tablename__ = "project_templates"
+    # Keyset pagination order (see CRUDBase.paginate)
+    __table_args__ = (Index("ix_project_templates_name_id", "name", "id"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     name = Column(String, index=True, nullable=False)
@@ -1,12 +1,14 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
 class Webhook(Base):
     __tablename__ = "webhooks"
+    # Keyset pagination order (see CRUDBase.paginate)
+    __table_args__ = (Index("ix_webhooks_owner_id_created_at_id", "owner_id", "created_at", "id"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     name = Column(String, index=True, nullable=False)
@@ -0,0 +1,31 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, ForeignKey, DateTime, Integer, Date, Index, text
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from app.db.session import Base
+
+class WorkCalendar(Base):
+    """
+    Working weekdays and holidays (see app.core.working_calendar). A row with
+    neither project_id nor user_id is the global calendar; project and user
+    calendars override it. Without any row, scheduling uses calendar days.
+    """
+    __tablename__ = "work_calendars"
+    __table_args__ = (
+        # At most one global calendar
+        Index(
+            "uq_work_calendars_global", text("(project_id IS NULL AND user_id IS NULL)"), unique=True,
+            postgresql_where=text("project_id IS NULL AND user_id IS NULL"),
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=True, unique=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=True, unique=True)
+
+    # Bit d set = date.weekday() d is a working day; 31 = Monday to Friday
+    working_weekdays = Column(Integer, nullable=False, default=31)
+    holidays = Column(ARRAY(Date), nullable=False, default=[])
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,5 +1,6 @@
 from typing import List, Optional
 from uuid import UUID
+from datetime import datetime
 from pydantic import BaseModel
 
 class ProjectHealth(BaseModel):
@@ -12,9 +13,35 @@ class ProjectHealth(BaseModel):
     critical_path_tasks: int
     risk_level: str # "Low", "Medium", "High"
     variance_days: int # Planned vs Actual/Current
+    done_ratio: float = 0.0 # Done share of the non-archived tasks, 0 to 1
+    budget_variance: float = 0.0 # Task budgets minus real costs (negative: over budget)
 
 class PortfolioHealthResponse(BaseModel):
     projects: List[ProjectHealth]
     total_active: int
     average_progress: float
     critical_projects: int
+
+class ProjectScheduleSummary(BaseModel):
+    project_id: UUID
+    due_date: Optional[datetime] = None
+    projected_finish: Optional[datetime] = None  # latest early finish of its tasks
+    variance_days: int  # projected finish past the due date (negative: ahead)
+    critical_tasks: int
+
+class CriticalChainTask(BaseModel):
+    task_id: UUID
+    project_id: UUID
+    title: str
+    early_start: datetime
+    early_finish: datetime
+    slack_days: int  # negative when a project due date cannot be met
+
+class PortfolioSchedule(BaseModel):
+    project_count: int
+    task_count: int
+    cross_project_dependencies: int
+    skipped_tasks: int  # on or behind a dependency cycle
+    finish: Optional[datetime] = None
+    projects: List[ProjectScheduleSummary]
+    critical_chain: List[CriticalChainTask]
@@ -0,0 +1,32 @@
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime
+from pydantic import BaseModel
+
+class FinishHistogram(BaseModel):
+    bin_edges: List[datetime]  # len(counts) + 1
+    counts: List[int]
+
+class CriticalityHistogram(BaseModel):
+    bin_edges: List[float]  # criticality index, 0 to 1
+    counts: List[int]
+
+class TaskSimulation(BaseModel):
+    task_id: UUID
+    title: str
+    criticality_index: float  # share of iterations with zero total float
+    mean_finish: datetime
+
+class ScheduleSimulation(BaseModel):
+    project_id: UUID
+    iterations: int
+    seed: Optional[int] = None
+    task_count: int
+    skipped_tasks: int  # on or behind a dependency cycle
+    finish_p50: Optional[datetime] = None
+    finish_p80: Optional[datetime] = None
+    finish_p95: Optional[datetime] = None
+    finish_mean: Optional[datetime] = None
+    finish_histogram: FinishHistogram
+    criticality_histogram: CriticalityHistogram
+    tasks: List[TaskSimulation]
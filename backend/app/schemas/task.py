@@ -1,7 +1,7 @@
-from typing import List, Optional, ForwardRef
+from typing import Any, Dict, List, Optional, ForwardRef
 from datetime import datetime
 from uuid import UUID
-from pydantic import BaseModel, ConfigDict, computed_field
+from pydantic import BaseModel, ConfigDict, Field, computed_field
 from app.core.enums import Status, Priority, DependencyType
 from app.schemas.user import User as UserSchema
 from app.schemas.metadata import Topic, WorkType
@@ -20,6 +20,43 @@ class Dependency(DependencyBase):
     id: UUID
     model_config = ConfigDict(from_attributes=True)
 
+class DependencyBulkCreate(BaseModel):
+    dependencies: List[DependencyCreate]
+
+class DependencyBulkResult(BaseModel):
+    index: int
+    successor_id: UUID
+    predecessor_id: UUID
+    # created | exists | invalid | cycle
+    status: str
+    detail: Optional[str] = None
+    dependency_id: Optional[UUID] = None
+    # Offending path for status=cycle, following successor links
+    cycle: Optional[List[UUID]] = None
+
+class TaskBlocker(BaseModel):
+    id: UUID
+    title: str
+    status: Status
+
+class TaskBlockers(BaseModel):
+    task_id: UUID
+    # Direct blockers that are not Done
+    active_blockers: List[TaskBlocker] = []
+    # Every task upstream, when requested with transitive=true
+    upstream_ids: Optional[List[UUID]] = None
+
+class TaskEvent(BaseModel):
+    id: int
+    task_id: UUID
+    project_id: Optional[UUID] = None
+    # created | deleted | status | dates | assignees | moved
+    kind: str
+    # {field: [old, new]}
+    changes: Dict[str, List[Any]]
+    occurred_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
 class TaskBase(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -82,6 +119,39 @@ class TaskCreate(TaskBase):
     type_ids: Optional[List[UUID]] = []
     assignee_ids: Optional[List[UUID]] = []
 
+class TaskBulkDependency(BaseModel):
+    # Predecessor is either another item of the same batch (by ref) or an existing task
+    predecessor_ref: Optional[str] = None
+    predecessor_id: Optional[UUID] = None
+    type: DependencyType = DependencyType.FS
+    lag_days: int = 0
+
+class TaskBulkItem(TaskBase):
+    title: str
+    ref: Optional[str] = None
+    topic_ids: Optional[List[UUID]] = []
+    type_ids: Optional[List[UUID]] = []
+    assignee_ids: Optional[List[UUID]] = []
+    dependencies: Optional[List[TaskBulkDependency]] = []
+    subtasks: Optional[List["TaskBulkItem"]] = []
+
+class TaskBulkCreate(BaseModel):
+    project_id: Optional[UUID] = None
+    # Attach the whole forest below an existing task
+    parent_id: Optional[UUID] = None
+    tasks: List[TaskBulkItem]
+
+class TaskMove(BaseModel):
+    task_id: UUID
+    # New parent; leave unset to stay under the current one, null for top level
+    parent_id: Optional[UUID] = None
+    # Place right after / before these siblings; neither means "append"
+    after_id: Optional[UUID] = None
+    before_id: Optional[UUID] = None
+
+class TaskReorder(BaseModel):
+    moves: List[TaskMove]
+
 class TaskUpdate(TaskBase):
     topic_ids: Optional[List[UUID]] = None
     type_ids: Optional[List[UUID]] = None
@@ -92,6 +162,8 @@ class TaskInDBBase(TaskBase):
     id: UUID
     project_id: Optional[UUID] = None
     parent_id: Optional[UUID] = None
+    # Orders siblings (see app.core.wbs); internal, never serialized
+    sort_key: Optional[str] = Field(None, exclude=True)
     created_at: datetime
     updated_at: datetime
     completed_at: Optional[datetime] = None
@@ -128,6 +200,7 @@ class Task(TaskInDBBase):
 # For recursive models in Pydantic V2
 Task.model_rebuild()
 TaskShortCreate.model_rebuild()
+TaskBulkItem.model_rebuild()
 
 # Keep Subtask alias for backward compatibility during migration if needed
 # but deprecated
@@ -0,0 +1,27 @@
+from typing import List, Optional
+from datetime import date, datetime
+from uuid import UUID
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+class WorkCalendarBase(BaseModel):
+    # date.weekday() numbers: 0 = Monday ... 6 = Sunday
+    working_weekdays: List[int] = Field(default_factory=lambda: [0, 1, 2, 3, 4])
+    holidays: List[date] = Field(default_factory=list)
+
+    @field_validator("working_weekdays")
+    @classmethod
+    def check_weekdays(cls, v: List[int]) -> List[int]:
+        if not v or any(d < 0 or d > 6 for d in v):
+            raise ValueError("working_weekdays must be a non-empty list of 0 (Monday) to 6 (Sunday)")
+        return sorted(set(v))
+
+class WorkCalendarUpdate(WorkCalendarBase):
+    pass
+
+class WorkCalendar(WorkCalendarBase):
+    id: UUID
+    project_id: Optional[UUID] = None
+    user_id: Optional[UUID] = None
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,4 +1,6 @@
 from typing import List, Dict
+from uuid import UUID
+from datetime import datetime
 from pydantic import BaseModel
 
 class DayWorkload(BaseModel):
@@ -14,3 +16,21 @@ class UserWorkload(BaseModel):
 
 class TeamWorkloadResponse(BaseModel):
     users: List[UserWorkload]
+
+class TaskLeveling(BaseModel):
+    task_id: UUID
+    title: str
+    start_date: datetime
+    due_date: datetime
+    new_start_date: datetime
+    new_due_date: datetime
+    delay_days: int
+
+class ResourceLeveling(BaseModel):
+    project_id: UUID
+    capacity_hours: float
+    applied: bool
+    task_count: int  # tasks considered (open, dated, not archived)
+    changes: List[TaskLeveling]
+    # Tasks that could not be fitted under capacity within their slack
+    overloaded_task_ids: List[UUID]
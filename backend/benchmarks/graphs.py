@@ -0,0 +1,78 @@
+"""
+Synthetic, seeded task graphs for the scheduling benchmarks.
+
+A graph is plain arrays: the parent of every node (-1 for roots, parents
+always have a smaller index), the dependency edges (pred < succ, so every
+shape is acyclic) with their type and lag, and per-node start/due offsets in
+days. The builders in run_scheduling turn them into the inputs of each
+function under test.
+"""
+
+from typing import Callable, Dict, NamedTuple
+
+import numpy as np
+
+class Graph(NamedTuple):
+    parent: np.ndarray     # int64, -1 = root
+    pred: np.ndarray       # int64
+    succ: np.ndarray       # int64
+    dep_type: np.ndarray   # int8, app.core.cpm codes (FS/SS/FF/SF)
+    lag: np.ndarray        # int64 days
+    start: np.ndarray      # int64 days from the project start
+    duration: np.ndarray   # int64 days, >= 1
+
+    @property
+    def size(self) -> int:
+        return len(self.parent)
+
+def _finish(rng: np.random.Generator, n: int, parent: np.ndarray, pred: np.ndarray, succ: np.ndarray) -> Graph:
+    order = np.lexsort((succ, pred))
+    pred, succ = pred[order].astype(np.int64), succ[order].astype(np.int64)
+    return Graph(
+        parent=parent.astype(np.int64),
+        pred=pred,
+        succ=succ,
+        # All four dependency types, FS most common as in real plans
+        dep_type=rng.choice(4, size=len(pred), p=[0.7, 0.1, 0.1, 0.1]).astype(np.int8),
+        lag=rng.choice(4, size=len(pred), p=[0.85, 0.05, 0.05, 0.05]).astype(np.int64),
+        start=rng.integers(0, max(1, n // 10), size=n),
+        duration=rng.integers(1, 10, size=n),
+    )
+
+def chain(n: int, rng: np.random.Generator) -> Graph:
+    """One long FS-style chain: maximal depth for the passes."""
+    nodes = np.arange(1, n)
+    return _finish(rng, n, np.full(n, -1), nodes - 1, nodes)
+
+def fan(n: int, rng: np.random.Generator) -> Graph:
+    """A root fanning out to n - 2 tasks that all fan back into one sink."""
+    middle = np.arange(1, n - 1)
+    pred = np.concatenate((np.zeros(len(middle), dtype=np.int64), middle))
+    succ = np.concatenate((middle, np.full(len(middle), n - 1)))
+    return _finish(rng, n, np.full(n, -1), pred, succ)
+
+def random_dag(n: int, rng: np.random.Generator, degree: int = 2, window: int = 50) -> Graph:
+    """Each task depends on up to `degree` random earlier tasks within `window`."""
+    succ = np.repeat(np.arange(1, n), degree)
+    back = rng.integers(1, window + 1, size=len(succ))
+    pred = succ - np.minimum(back, succ)
+    pairs = np.unique(np.stack((pred, succ), axis=1), axis=0)
+    return _finish(rng, n, np.full(n, -1), pairs[:, 0], pairs[:, 1])
+
+def deep_hierarchy(n: int, rng: np.random.Generator, branches: int = 10) -> Graph:
+    """`branches` nested chains (each task the parent of the next), so
+    nesting depth grows with n; sparse random dependencies on top."""
+    nodes = np.arange(n)
+    parent = np.where(nodes < branches, -1, nodes - branches)
+    dag = random_dag(n, rng, degree=1)
+    return _finish(rng, n, parent, dag.pred, dag.succ)
+
+SHAPES: Dict[str, Callable[[int, np.random.Generator], Graph]] = {
+    "chain": chain,
+    "fan": fan,
+    "random": random_dag,
+    "deep": deep_hierarchy,
+}
+
+def build(shape: str, n: int, seed: int = 0) -> Graph:
+    return SHAPES[shape](n, np.random.default_rng(seed))
@@ -0,0 +1,263 @@
+"""
+Benchmark suite for the scheduling core.
+
+Targets:
+    cpm          app.core.cpm.calculate_cpm over the task forest
+    wbs          app.core.wbs.apply_wbs_codes over the task forest
+    has_cycle    app.core.dependencies.has_cycle from the last task
+    find_cycle   app.core.dependencies.find_cycle from the last task
+
+on the synthetic shapes of benchmarks.graphs (chain, fan, random DAG, deep
+hierarchy), each with all four dependency types, from 1k to 1M tasks.
+Inputs are built outside the timed region. Every case records the best wall
+time of --repeat runs, the peak traced memory of one extra run (tracemalloc)
+and a digest of the result, so a change in behaviour shows up as well as a
+slowdown. A case that raises (e.g. RecursionError on deep inputs) is
+recorded with that status instead of aborting the run.
+
+Usage, from backend/:
+
+    python -m benchmarks.run_scheduling                      # compare with baseline.json
+    python -m benchmarks.run_scheduling --sizes 1000,10000 --targets cpm,wbs
+    python -m benchmarks.run_scheduling --save-baseline      # record a new baseline
+
+Timings are machine-specific: record the baseline on the machine (or CI
+runner class) that runs the comparison. The exit status is 1 when any case
+regressed: slower or more memory than the baseline beyond --tolerance,
+a different status, or a different result digest.
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from uuid import UUID
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cpm import calculate_cpm
+from app.core.dependencies import find_cycle, has_cycle
+from app.core.enums import DependencyType
+from app.core.ordering import index_key
+from app.core.wbs import apply_wbs_codes
+from benchmarks.graphs import SHAPES, Graph, build
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Differences below this many seconds are noise, whatever the ratio
+MIN_TIME_DELTA = 0.01
+MIN_MEMORY_DELTA_MB = 1.0
+
+DEPENDENCY_TYPES = [DependencyType.FS, DependencyType.SS, DependencyType.FF, DependencyType.SF]
+EPOCH = datetime(2026, 1, 1)
+
+def task_id(i: int) -> UUID:
+    return UUID(int=i + 1)
+
+class TaskNode:
+    """
+    Stand-in for app.schemas.task.Task with just the attributes the functions
+    under test read and write. Full schemas cost ~6 KB and ~80 us each to
+    construct, which would put 1M-task cases out of reach of a CI runner
+    while measuring pydantic rather than the scheduling code.
+    """
+    __slots__ = (
+        "id", "created_at", "sort_index", "sort_key", "start_date", "due_date", "completed_at",
+        "deadline_at", "project", "subtasks", "blocked_by", "wbs_code", "slack_days", "is_critical",
+    )
+
+    def __init__(self, **fields):
+        self.wbs_code = self.slack_days = self.is_critical = None
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+class DependencyNode:
+    __slots__ = ("predecessor_id", "type", "lag_days")
+
+    def __init__(self, predecessor_id: UUID, type: DependencyType, lag_days: int):
+        self.predecessor_id, self.type, self.lag_days = predecessor_id, type, lag_days
+
+def build_forest(graph: Graph) -> List[TaskNode]:
+    """Tasks linked into a forest through subtasks, dependencies in blocked_by."""
+    preds: List[List[DependencyNode]] = [[] for _ in range(graph.size)]
+    for p, s, kind, lag in zip(graph.pred.tolist(), graph.succ.tolist(), graph.dep_type.tolist(), graph.lag.tolist()):
+        preds[s].append(DependencyNode(task_id(p), DEPENDENCY_TYPES[kind], lag))
+    tasks = []
+    for i, (start, duration) in enumerate(zip(graph.start.tolist(), graph.duration.tolist())):
+        start_date = EPOCH + timedelta(days=start)
+        tasks.append(TaskNode(
+            id=task_id(i), created_at=EPOCH + timedelta(microseconds=i),
+            sort_index=i, sort_key=index_key(i),
+            start_date=start_date, due_date=start_date + timedelta(days=duration),
+            completed_at=None, deadline_at=None, project=None,
+            subtasks=[], blocked_by=preds[i],
+        ))
+    roots = []
+    for i, parent in enumerate(graph.parent.tolist()):
+        (roots if parent < 0 else tasks[parent].subtasks).append(tasks[i])
+    return roots
+
+def walk(roots: List[TaskNode]):
+    stack = list(reversed(roots))
+    while stack:
+        t = stack.pop()
+        yield t
+        stack.extend(reversed(t.subtasks))
+
+def blocked_by_map(graph: Graph) -> Dict[UUID, List[UUID]]:
+    result: Dict[UUID, List[UUID]] = {}
+    for p, s in zip(graph.pred.tolist(), graph.succ.tolist()):
+        result.setdefault(task_id(s), []).append(task_id(p))
+    return result
+
+def digest(values) -> str:
+    h = hashlib.sha1()
+    for v in values:
+        h.update(repr(v).encode())
+    return h.hexdigest()[:16]
+
+class Target(NamedTuple):
+    prepare: Callable[[Graph], Any]
+    run: Callable[[Any], Any]
+    summarize: Callable[[Any, Any], str]
+
+TARGETS: Dict[str, Target] = {
+    "cpm": Target(
+        prepare=build_forest,
+        run=calculate_cpm,
+        summarize=lambda roots, _: digest((t.slack_days, t.is_critical) for t in walk(roots)),
+    ),
+    "wbs": Target(
+        prepare=build_forest,
+        run=apply_wbs_codes,
+        summarize=lambda roots, _: digest(t.wbs_code for t in walk(roots)),
+    ),
+    # Worst case for a dependency insert: the whole upstream of the last task is acyclic
+    "has_cycle": Target(
+        prepare=lambda graph: (task_id(graph.size - 1), blocked_by_map(graph)),
+        run=lambda state: has_cycle(state[0], state[1]),
+        summarize=lambda _, result: repr(result),
+    ),
+    "find_cycle": Target(
+        prepare=lambda graph: (task_id(graph.size - 1), blocked_by_map(graph)),
+        run=lambda state: find_cycle(state[0], lambda u: state[1].get(u, [])),
+        summarize=lambda _, result: repr(result),
+    ),
+}
+
+def measure(target: Target, graph: Graph, repeat: int, memory: bool) -> Dict[str, Any]:
+    state = target.prepare(graph)
+    best = None
+    result = None
+    try:
+        for _ in range(repeat):
+            gc.collect()
+            started = time.perf_counter()
+            result = target.run(state)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        peak_mb = None
+        if memory:
+            gc.collect()
+            tracemalloc.start()
+            try:
+                target.run(state)
+                peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+            finally:
+                tracemalloc.stop()
+    except Exception as e:  # recorded, not fatal: a failing case is a result too
+        return {"status": type(e).__name__, "seconds": None, "peak_mb": None, "digest": None}
+    return {
+        "status": "ok",
+        "seconds": round(best, 6),
+        "peak_mb": round(peak_mb, 3) if peak_mb is not None else None,
+        "digest": target.summarize(state, result),
+    }
+
+def compare(case: Dict[str, Any], base: Optional[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Reasons this case regressed against its baseline entry (empty: fine)."""
+    if base is None:
+        return []
+    problems = []
+    if case["status"] != base["status"]:
+        problems.append(f"status {base['status']} -> {case['status']}")
+    elif case["status"] == "ok":
+        if case["digest"] != base["digest"]:
+            problems.append("result differs")
+        if base["seconds"] is not None and case["seconds"] > base["seconds"] * (1 + tolerance) \
+                and case["seconds"] - base["seconds"] > MIN_TIME_DELTA:
+            problems.append(f"time {base['seconds']:.3f}s -> {case['seconds']:.3f}s")
+        if base.get("peak_mb") is not None and case["peak_mb"] is not None \
+                and case["peak_mb"] > base["peak_mb"] * (1 + tolerance) \
+                and case["peak_mb"] - base["peak_mb"] > MIN_MEMORY_DELTA_MB:
+            problems.append(f"memory {base['peak_mb']:.1f}MB -> {case['peak_mb']:.1f}MB")
+    return problems
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES))
+    parser.add_argument("--shapes", default=",".join(SHAPES))
+    parser.add_argument("--targets", default=",".join(TARGETS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown/memory growth ratio")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    shapes = args.shapes.split(",")
+    targets = args.targets.split(",")
+    unknown = (set(shapes) - SHAPES.keys()) | (set(targets) - TARGETS.keys())
+    if unknown:
+        parser.error(f"unknown shape/target: {', '.join(sorted(unknown))}")
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["cases"]
+
+    cases: Dict[str, Dict[str, Any]] = {}
+    regressions = 0
+    print(f"{'case':<32} {'status':<15} {'seconds':>10} {'peak MB':>10}  vs baseline")
+    for n in sizes:
+        for shape in shapes:
+            graph = build(shape, n, seed=args.seed)
+            for name in targets:
+                key = f"{name}/{shape}/{n}"
+                case = measure(TARGETS[name], graph, args.repeat, memory=not args.no_memory)
+                cases[key] = case
+                problems = compare(case, baseline.get(key), args.tolerance)
+                regressions += bool(problems)
+                seconds = f"{case['seconds']:.4f}" if case["seconds"] is not None else "-"
+                peak = f"{case['peak_mb']:.1f}" if case["peak_mb"] is not None else "-"
+                verdict = "REGRESSION: " + "; ".join(problems) if problems else ("ok" if key in baseline else "new")
+                print(f"{key:<32} {case['status']:<15} {seconds:>10} {peak:>10}  {verdict}", flush=True)
+            del graph
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "seed": args.seed,
+                "cases": cases,
+            }, f, indent=1, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+    elif regressions:
+        print(f"{regressions} case(s) regressed")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,41 +15,37 @@ from app.models.user import User
 from app.models.project import Project
 from app.models.task import Task
 from app.core.enums import Status
+from app.core import result_cache
 
 async def test_dashboard_summary_endpoint():
     print("Testing Dashboard Summary Endpoint Logic...")
     
     # Mocks
+    result_cache.dashboard_summaries.clear()
     db = AsyncMock()
     user = User(id=uuid4(), email="user@example.com", is_superuser=False)
-    
-    # Mock Projects Count
-    mock_proj_res = MagicMock()
-    mock_proj_res.scalar.return_value = 2
-    db.execute.return_value = mock_proj_res
-    
-    # Mock Tasks List
-    t1 = Task(id=uuid4(), title="Task 1", status=Status.IN_PROGRESS, project_id=uuid4())
+
+    def rows(*values):
+        res = MagicMock()
+        res.all.return_value = list(values)
+        return res
+
     t2 = Task(id=uuid4(), title="Task 2", status=Status.DONE, project_id=uuid4(), completed_at=datetime.utcnow())
     t3 = Task(id=uuid4(), title="Task 3", status=Status.TODO, project_id=uuid4(), due_date=datetime.utcnow() + timedelta(days=2))
-    
-    # We need to mock multiple execute calls
-    # Call 1: Projects count
-    # Call 2: Tasks list
-    # Call 3: Upcoming deadlines
-    # Call 4: Recent activity
-    
-    # A better way to mock sequential calls
+
+    # Sequential calls on the request session:
+    # projects count, status counts, upcoming deadlines, recent activity, heatmap
     db.execute.side_effect = [
-        mock_proj_res, # projects count
-        AsyncMock(scalars=lambda: MagicMock(all=lambda: [t1, t2, t3])), # all tasks
-        AsyncMock(scalars=lambda: MagicMock(all=lambda: [t3])), # upcoming
-        AsyncMock(scalars=lambda: MagicMock(all=lambda: [t2]))  # activity
+        rows((2,)),
+        rows((Status.IN_PROGRESS, 1), (Status.DONE, 1), (Status.TODO, 1)),
+        rows(t3),
+        rows(t2),
+        rows(),
     ]
-    
+
     # Call the endpoint function
     result = await get_dashboard_summary(db=db, current_user=user)
-    
+
     assert result["total_projects"] == 2
     assert result["total_tasks"] == 3
     assert result["tasks_in_progress"] == 1
@@ -59,6 +55,12 @@ async def test_dashboard_summary_endpoint():
     assert len(result["recent_activity"]) == 1
     assert result["recent_activity"][0]["title"] == "Task 2"
     
+    assert db.execute.await_count == 5
+
+    # Cached per user: the next call does not touch the database
+    assert await get_dashboard_summary(db=db, current_user=user) is result
+    assert db.execute.await_count == 5
+
     print("Scenario Passed: Dashboard summary returns correct aggregated data.")
 
 if __name__ == "__main__":
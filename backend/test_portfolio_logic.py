@@ -33,20 +33,23 @@ async def test_portfolio_logic():
         owner_id=user_id
     )
     
-    # Mock crud_project.project.get_multi
-    with patch('app.crud.crud_project.project.get_multi', new_callable=AsyncMock) as mock_get_multi:
-        mock_get_multi.return_value = [project]
-        
-        # 2. Mock Tasks (no overdue)
-        mock_tasks_res = MagicMock()
-        mock_tasks_res.scalars.return_value.all.return_value = []
-        db.execute.return_value = mock_tasks_res
+    # 2. Mock the revision lookup and the grouped task counts (no overdue)
+    db.execute.side_effect = [
+        MagicMock(all=MagicMock(return_value=[(project.id, 0)])),
+        MagicMock(all=MagicMock(return_value=[MagicMock(
+            id=project.id, name=project.name, status=project.status, progress_percent=project.progress_percent,
+            total=0, done=0, overdue=0, budget_variance=0.0,
+        )])),
+    ]
+    schedule = {"projects": [{"project_id": project.id, "critical_tasks": 0, "variance_days": 0}]}
+    with patch('app.crud.crud_task.task.portfolio_schedule', new_callable=AsyncMock) as mock_schedule:
+        mock_schedule.return_value = schedule
         
         response = await get_portfolio_health(db=db, current_user=current_user)
         
-        assert response.total_active == 1
-        assert response.projects[0].health_score == 100.0
-        assert response.projects[0].risk_level == "Low"
+        assert response["total_active"] == 1
+        assert response["projects"][0]["health_score"] == 100.0
+        assert response["projects"][0]["risk_level"] == "Low"
         print("PASS: Portfolio health aggregation correct")
 
 if __name__ == "__main__":
@@ -0,0 +1,32 @@
+import sys
+import os
+# Add the backend directory to sys.path
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+import numpy as np
+
+from benchmarks.graphs import SHAPES, build
+from benchmarks.run_scheduling import TARGETS, measure, compare
+
+def test_shapes_are_acyclic_and_seeded():
+    for shape in SHAPES:
+        graph = build(shape, 200, seed=3)
+        assert graph.size == 200
+        assert (graph.pred < graph.succ).all()
+        assert (graph.parent < np.arange(200)).all()
+        assert set(np.unique(graph.dep_type)) <= {0, 1, 2, 3}
+        assert np.array_equal(graph.pred, build(shape, 200, seed=3).pred)
+
+def test_cases_are_deterministic_and_compared():
+    graph = build("random", 300)
+    for name, target in TARGETS.items():
+        first = measure(target, graph, repeat=1, memory=False)
+        assert first["status"] == "ok", name
+        again = measure(target, graph, repeat=1, memory=True)
+        assert again["digest"] == first["digest"]
+        assert compare(again, first, tolerance=0.25) == []
+
+    base = {"status": "ok", "seconds": 1.0, "peak_mb": 10.0, "digest": "a"}
+    slower = dict(base, seconds=2.0, digest="b")
+    assert compare(slower, base, tolerance=0.25) == ["result differs", "time 1.000s -> 2.000s"]
+    assert compare(dict(base, status="RecursionError"), base, tolerance=0.25) == ["status ok -> RecursionError"]
@@ -0,0 +1,55 @@
+import sys
+import os
+# Add the backend directory to sys.path
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from app.core.dependency_graph import DependencyGraphCache, ProjectGraph, reaches
+import uuid
+
+def _graph(revision, project_tasks, links, project_of):
+    rows = []
+    for t in project_tasks:
+        outs = [(t, s, project_of[s]) for p, s in links if p == t]
+        rows.extend(outs or [(t, None, None)])
+    return ProjectGraph.from_rows(revision, rows)
+
+def test_reaches_within_and_across_projects():
+    P, Q = uuid.uuid4(), uuid.uuid4()
+    a, b, c, d = (uuid.uuid4() for _ in range(4))
+    project_of = {a: P, b: P, c: Q, d: Q}
+    links = [(a, b), (b, c), (c, d)]
+    gp = _graph(1, [a, b], links, project_of)
+    gq = _graph(1, [c, d], links, project_of)
+    assert gp.tasks == {a, b} and gp.successors[b] == [(c, Q)]
+
+    # From a: b inside P, then c is handed over to Q
+    visited = {a}
+    found, crossings = reaches(gp, P, [a], d, visited)
+    assert not found and crossings == {Q: [c]}
+    found, crossings = reaches(gq, Q, crossings[Q], d, visited)
+    assert found
+
+    # Nothing upstream is ever reached
+    found, crossings = reaches(gq, Q, [d], a, {d})
+    assert not found and not crossings
+
+def test_cache_follows_revisions():
+    P, Q = uuid.uuid4(), uuid.uuid4()
+    a, b, c = (uuid.uuid4() for _ in range(3))
+    cache = DependencyGraphCache(8)
+    cache.put(P, _graph(3, [a, b], [], {}))
+    cache.put(Q, _graph(7, [c], [], {}))
+    assert cache.get(P, 3) is not None and cache.get(P, 4) is None
+
+    # Our own commit: both projects moved exactly one revision on
+    cache.apply_link(b, c, Q, P, {P: 4, Q: 8}, added=True)
+    assert cache.get(P, 4).successors[b] == [(c, Q)]
+    assert cache.get(Q, 8) is not None
+
+    cache.apply_link(b, c, Q, P, {P: 5, Q: 9}, added=False)
+    assert cache.get(P, 5).successors[b] == []
+
+    # Another write came in between: the entry cannot be patched and is dropped
+    cache.apply_link(a, b, P, P, {P: 7}, added=True)
+    assert cache.get(P, 7) is None and cache.get(P, 5) is None
+    assert len(cache) == 1
@@ -0,0 +1,49 @@
+import sys
+import os
+# Add the backend directory to sys.path
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from app.core.hierarchy import (
+    path_segment, build_path, descendants_range, is_descendant_path,
+    ids_from_path, wbs_codes_from_paths
+)
+from app.core.ordering import index_key, key_between
+from datetime import datetime, timedelta
+import uuid
+
+def test_paths_order_like_wbs():
+    now = datetime.utcnow()
+    root_a, root_b = uuid.uuid4(), uuid.uuid4()
+    child_1, child_2, grandchild = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    a = path_segment(root_a, index_key(10), now)
+    b = path_segment(root_b, index_key(20), now - timedelta(days=1))
+    a1 = build_path(a, path_segment(child_1, index_key(-5), now))
+    a2 = build_path(a, path_segment(child_2, index_key(5), now - timedelta(days=3)))
+    a1x = build_path(a1, path_segment(grandchild, index_key(0), now))
+
+    rows = [("B", b), ("A.2", a2), ("A.1.x", a1x), ("A", a), ("A.1", a1)]
+    ordered = sorted(rows, key=lambda r: r[1])
+    assert [k for k, _ in ordered] == ["A", "A.1", "A.1.x", "A.2", "B"]
+
+    codes = wbs_codes_from_paths(ordered)
+    assert codes == {"A": "1", "A.1": "1.1", "A.1.x": "1.1.1", "A.2": "1.2", "B": "2"}
+
+    # Subtree membership is a prefix/range test
+    assert is_descendant_path(a1x, a)
+    assert not is_descendant_path(a, a)
+    assert not is_descendant_path(b, a)
+    low, high = descendants_range(a)
+    assert all(low <= p < high for p in (a1, a2, a1x))
+    assert not (low <= b < high) and not (low <= a < high)
+
+    assert ids_from_path(a1x) == [root_a, child_1, grandchild]
+
+def test_fractional_key_sorts_between_siblings():
+    now = datetime.utcnow()
+    parent = path_segment(uuid.uuid4(), index_key(0), now)
+    first = build_path(parent, path_segment(uuid.uuid4(), index_key(10), now))
+    second = build_path(parent, path_segment(uuid.uuid4(), index_key(20), now))
+    # A longer key in between must not be cut short by the segment separator
+    moved = build_path(parent, path_segment(uuid.uuid4(), key_between(index_key(10), index_key(20)), now))
+    assert sorted([second, moved, first]) == [first, moved, second]
@@ -0,0 +1,42 @@
+import sys
+import os
+import pytest
+# Add the backend directory to sys.path
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.future import select
+from app.core.pagination import encode_cursor, decode_cursor, InvalidCursorError
+from app.crud.crud_notification import notification as crud_notification
+from app.models.notification import Notification
+from datetime import datetime
+from types import SimpleNamespace
+import uuid
+
+def test_cursor_round_trip():
+    values = [datetime(2024, 5, 1, 12, 30, 15, 250), uuid.uuid4()]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, [datetime, uuid.UUID]) == values
+
+def test_malformed_cursors_are_rejected():
+    for bad in ["not-a-cursor", encode_cursor(["x"]), encode_cursor(["2024-01-01", "not-a-uuid"])]:
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(bad, [datetime, uuid.UUID])
+
+def test_keyset_query_and_next_cursor():
+    last = SimpleNamespace(created_at=datetime(2024, 1, 2), id=uuid.uuid4())
+    cursor = crud_notification.next_cursor([SimpleNamespace(), last], limit=2)
+    assert cursor == encode_cursor([last.created_at, last.id])
+    # A short page is the last one
+    assert crud_notification.next_cursor([last], limit=2) is None
+
+    query = crud_notification.paginate(select(Notification), limit=2, cursor=cursor)
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    assert "(notifications.created_at, notifications.id) <" in sql
+    assert "OFFSET" not in sql
+    assert "ORDER BY notifications.created_at DESC, notifications.id DESC" in sql
+
+    # Without a cursor the legacy offset still applies
+    sql = str(crud_notification.paginate(select(Notification), skip=20, limit=2).compile(dialect=postgresql.dialect()))
+    assert "OFFSET" in sql
@@ -0,0 +1,39 @@
+import sys
+import os
+# Add the backend directory to sys.path
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from app.core.portfolio import analyze_portfolio, variance_days
+from app.core.cpm import DAY, NO_DEADLINE, FS
+
+def test_cross_project_dependency_drives_critical_chain():
+    # Project 0: A (3d) -> project 1: B (2d); project 1 also has C (1d)
+    result = analyze_portfolio(
+        project_of=[0, 1, 1],
+        durations=[3 * DAY, 2 * DAY, DAY],
+        earliest=[0, 0, 0],
+        deadlines=[NO_DEADLINE] * 3,
+        pred=[0], succ=[1], dep_type=[FS], lag=[0],
+        project_due=[NO_DEADLINE, NO_DEADLINE],
+    )
+    assert result.schedule.finish == 5 * DAY
+    assert result.critical.tolist() == [True, True, False]
+    assert result.critical_chain.tolist() == [0, 1]
+    assert result.slack_days.tolist() == [0, 0, 4]
+    assert result.critical_tasks.tolist() == [1, 1]
+    assert result.projected_finish.tolist() == [3 * DAY, 5 * DAY]
+
+def test_due_date_caps_late_finish():
+    # Project 1 is due on day 4 but its chain through project 0 ends on day 5
+    result = analyze_portfolio(
+        project_of=[0, 1],
+        durations=[3 * DAY, 2 * DAY],
+        earliest=[0, 0],
+        deadlines=[NO_DEADLINE] * 2,
+        pred=[0], succ=[1], dep_type=[FS], lag=[0],
+        project_due=[NO_DEADLINE, 4 * DAY],
+    )
+    assert result.slack_days.tolist() == [-1, -1]
+    assert variance_days(int(result.projected_finish[1]), 4 * DAY) == 1
+    assert variance_days(-1, 4 * DAY) == 0
+    assert variance_days(3 * DAY, NO_DEADLINE) == 0
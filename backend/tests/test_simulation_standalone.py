@@ -0,0 +1,55 @@
+import sys
+import os
+# Add the backend directory to sys.path
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+import numpy as np
+
+from app.core.simulation import simulate, summarize, estimate_range, budget_iterations, MIN_ITERATIONS
+from app.core.cpm import schedule, DAY, NO_DEADLINE, FS, SS
+
+def test_fixed_durations_match_cpm():
+    # A -> B (FS, 1 day lag), A -> C (SS); D independent
+    durations = np.array([3, 2, 4, 1], dtype=float)
+    earliest = np.array([0, 0, 0, 5], dtype=float)
+    pred, succ = np.array([0, 0]), np.array([1, 2])
+    dep_type, lag = np.array([FS, SS]), np.array([1.0, 0.0])
+    result = simulate(durations, durations, durations, earliest, pred, succ, dep_type, lag, iterations=50, seed=1)
+
+    cpm = schedule((durations * DAY).astype(np.int64), (earliest * DAY).astype(np.int64), np.full(4, NO_DEADLINE),
+                   pred, succ, dep_type, (lag * DAY).astype(np.int64))
+    assert np.allclose(result.finish, cpm.finish / DAY)
+    assert np.array_equal(result.criticality == 1.0, cpm.ls == cpm.es)
+
+def test_pert_samples_and_seed():
+    low, mode, high = estimate_range(1, 2, 6, nominal=1.0)
+    args = ([low], [mode], [high], [0.0], [], [], [], [])
+    first = simulate(*args, iterations=20_000, seed=42)
+    # PERT mean (o + 4m + p) / 6
+    assert abs(first.finish.mean() - 2.5) < 0.05
+    assert first.finish.min() >= 1 and first.finish.max() <= 6
+    assert np.array_equal(first.finish, simulate(*args, iterations=20_000, seed=42).finish)
+
+    summary = summarize(first, bins=10)
+    assert summary.p50 <= summary.p80 <= summary.p95
+    assert sum(summary.finish_counts) == 20_000
+
+def test_cycles_are_skipped():
+    ones = [1.0, 1.0, 1.0]
+    result = simulate(ones, ones, ones, [0.0] * 3, [0, 1], [1, 0], [FS, FS], [0.0, 0.0], iterations=10, seed=0)
+    assert result.resolved.tolist() == [False, False, True]
+    assert result.criticality.tolist() == [0.0, 0.0, 1.0]
+
+def test_estimate_range_fills_gaps():
+    assert estimate_range(0, 0, 0, nominal=3.0) == (3.0, 3.0, 3.0)
+    assert estimate_range(0, 4, 0, nominal=1.0) == (4, 4, 4)
+    assert estimate_range(2, 0, 6, nominal=1.0) == (2, 4.0, 6)
+
+def test_iterations_shrink_to_the_cell_budget():
+    budget = 20_000_000
+    assert budget_iterations(10_000, 500, budget) == 10_000
+    assert budget_iterations(10_000, 10_000, budget) == 2_000
+    # Empty projects keep the request; huge ones keep a usable sample
+    assert budget_iterations(10_000, 0, budget) == 10_000
+    assert budget_iterations(10_000, 10_000_000, budget) == MIN_ITERATIONS
+    assert budget_iterations(50, 10_000_000, budget) == 50
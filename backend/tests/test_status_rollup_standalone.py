@@ -0,0 +1,51 @@
+import sys
+import os
+# Add the backend directory to sys.path
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from app.core.rollup import derive_status, plan_rollup
+from app.core.enums import Status
+
+def node(id, parent_id, status, total, done, active=0):
+    return {"id": id, "parent_id": parent_id, "status": status, "total": total, "done": done, "active": active}
+
+def test_derive_status():
+    assert derive_status(0, 0, 0) is None
+    assert derive_status(3, 0, 0) == Status.TODO
+    assert derive_status(3, 1, 0) == Status.IN_PROGRESS
+    assert derive_status(3, 0, 1) == Status.IN_PROGRESS
+    assert derive_status(3, 3, 0) == Status.DONE
+    assert derive_status(3, 3, 0, blocked=True) == Status.IN_PROGRESS
+
+def test_completion_bubbles_to_root():
+    # root -> mid -> leaf parent; the last open leaf was just completed
+    nodes = [
+        node("leaf_parent", "mid", Status.IN_PROGRESS, 2, 2),
+        node("mid", "root", Status.IN_PROGRESS, 2, 1),
+        node("root", None, Status.IN_PROGRESS, 1, 0, 1),
+    ]
+    assert plan_rollup(nodes) == [
+        ("leaf_parent", Status.IN_PROGRESS, Status.DONE),
+        ("mid", Status.IN_PROGRESS, Status.DONE),
+        ("root", Status.IN_PROGRESS, Status.DONE),
+    ]
+
+def test_blocked_ancestor_stops_completion():
+    nodes = [
+        node("leaf_parent", "mid", Status.IN_PROGRESS, 1, 1),
+        node("mid", "root", Status.IN_PROGRESS, 1, 0, 1),
+        node("root", None, Status.IN_PROGRESS, 1, 0, 1),
+    ]
+    assert plan_rollup(nodes, blocked_ids={"mid"}) == [
+        ("leaf_parent", Status.IN_PROGRESS, Status.DONE),
+    ]
+
+def test_reopening_a_child_reopens_ancestors():
+    nodes = [
+        node("leaf_parent", "root", Status.DONE, 2, 1, 1),
+        node("root", None, Status.DONE, 1, 1),
+    ]
+    assert plan_rollup(nodes) == [
+        ("leaf_parent", Status.DONE, Status.IN_PROGRESS),
+        ("root", Status.DONE, Status.IN_PROGRESS),
+    ]
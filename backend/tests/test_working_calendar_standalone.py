@@ -0,0 +1,57 @@
+import sys
+import os
+# Add the backend directory to sys.path
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from datetime import date, datetime
+
+import numpy as np
+
+from app.core.working_calendar import WorkingCalendar, get_calendar
+from app.core.utils import sync_task_dates
+from app.core.cpm import DAY, NO_DEADLINE, FS, schedule, task_duration
+
+# 2026-01-02 is a Friday, 2026-01-05 the following Monday
+FRI, SAT, MON, TUE = date(2026, 1, 2), date(2026, 1, 3), date(2026, 1, 5), date(2026, 1, 6)
+
+def test_counts_and_offsets_skip_weekends_and_holidays():
+    cal = WorkingCalendar(holidays=[TUE])
+    assert cal.count(FRI, MON) == 2
+    assert cal.between(FRI, MON) == 1
+    assert cal.add(FRI, 1) == MON
+    assert cal.add(SAT, 0) == MON
+    assert cal.add(MON, 1) == date(2026, 1, 7)
+    assert cal.subtract(MON, 1) == FRI
+    days = np.array([cal.day_number(d) for d in (FRI, SAT, MON)])
+    assert cal.offset(days).tolist() == [cal.offset(days[0]), cal.offset(days[0]) + 1, cal.offset(days[0]) + 1]
+
+def test_working_time_round_trip():
+    cal = get_calendar([0, 1, 2, 3, 4], [])
+    dt = datetime(2026, 1, 2, 9, 30)
+    assert cal.from_time(cal.to_time(dt)) == dt
+    # Saturday maps to Monday morning, one working day after Friday
+    assert cal.from_time(cal.to_time(datetime(2026, 1, 3, 12))) == datetime(2026, 1, 5)
+    assert cal.to_time(datetime(2026, 1, 5)) - cal.to_time(datetime(2026, 1, 2)) == DAY
+    assert get_calendar([4, 3, 2, 1, 0], ()) is cal
+
+def test_duration_sync_counts_working_days():
+    cal = WorkingCalendar()
+    data = sync_task_dates({"start_date": datetime(2026, 1, 2, 9), "duration_days": 3}, cal)
+    assert data["due_date"] == datetime(2026, 1, 6, 9)
+    data = sync_task_dates({"start_date": datetime(2026, 1, 2), "due_date": datetime(2026, 1, 5)}, cal)
+    assert data["duration_days"] == 2
+    data = sync_task_dates({"due_date": datetime(2026, 1, 5), "duration_days": 2}, cal)
+    assert data["start_date"] == datetime(2026, 1, 2)
+    # Without a calendar nothing changes
+    data = sync_task_dates({"start_date": datetime(2026, 1, 2), "duration_days": 3})
+    assert data["due_date"] == datetime(2026, 1, 4)
+
+def test_cpm_on_working_time_slack_in_working_days():
+    cal = WorkingCalendar()
+    # A: Fri..Mon (1 working day), B after A, C one working day long in parallel over the week
+    start = datetime(2026, 1, 2)
+    durations = [task_duration(start, datetime(2026, 1, 5), None, cal), DAY, DAY]
+    earliest = [cal.to_time(start)] * 3
+    sched = schedule(durations, earliest, [NO_DEADLINE] * 3, [0], [1], [FS], [0])
+    assert cal.from_time(int(sched.ef[1])) == datetime(2026, 1, 6)
+    assert ((sched.ls - sched.es) // DAY).tolist() == [0, 0, 1]
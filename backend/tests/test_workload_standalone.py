@@ -0,0 +1,61 @@
+import sys
+import os
+# Add the backend directory to sys.path
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from datetime import date, timedelta
+import numpy as np
+
+from app.core.working_calendar import WorkingCalendar
+from app.core.workload import day_numbers, spread_workload
+
+def naive_workload(pairs, n_users, first, days, calendars):
+    """Day-by-day loop the matrix version replaces."""
+    hours = np.zeros((n_users, days))
+    counts = np.zeros((n_users, days), dtype=int)
+    for u, s, d in pairs:
+        cal = calendars[u]
+        span = cal.count(s, d) if cal else (d - s).days + 1
+        if span <= 0:
+            continue
+        day = s
+        while day <= d:
+            i = (day - first).days
+            if 0 <= i < days and (cal is None or cal.is_working(cal.day_number(day))):
+                hours[u, i] += 8.0 / span
+                counts[u, i] += 1
+            day += timedelta(days=1)
+    return hours, counts
+
+def test_matches_day_by_day_spreading():
+    rng = np.random.default_rng(3)
+    first = date(2026, 3, 2)
+    days = 40
+    holidays = WorkingCalendar(holidays=[date(2026, 3, 10), date(2026, 3, 11)])
+    calendars = [None, WorkingCalendar(), holidays, None, WorkingCalendar(weekdays=[5])]
+    pairs = []
+    for _ in range(300):
+        s = first + timedelta(days=int(rng.integers(-20, 45)))
+        pairs.append((int(rng.integers(0, len(calendars))), s, s + timedelta(days=int(rng.integers(-2, 15)))))
+
+    result = spread_workload(
+        [p[0] for p in pairs], day_numbers([p[1] for p in pairs]), day_numbers([p[2] for p in pairs]),
+        n_users=len(calendars), first_day=int(day_numbers([first])[0]), days=days, calendars=calendars,
+    )
+    hours, counts = naive_workload(pairs, len(calendars), first, days, calendars)
+
+    np.testing.assert_allclose(result.hours, hours, atol=1e-9)
+    np.testing.assert_array_equal(result.counts, counts)
+    assert result.overallocated.tolist() == (hours > 8.0 + 1e-6).any(axis=1).tolist()
+
+def test_single_task_and_empty_users():
+    first = int(day_numbers([date(2026, 1, 5)])[0])  # a Monday
+    # Four-day task from Monday: 2 hours a day, alone it fits
+    result = spread_workload([0], [first], [first + 3], n_users=2, first_day=first, days=7)
+    assert result.hours[0].tolist() == [2.0, 2.0, 2.0, 2.0, 0.0, 0.0, 0.0]
+    assert result.counts[1].sum() == 0
+    assert result.overallocated.tolist() == [False, False]
+
+    # One-day tasks stack up
+    result = spread_workload([0, 0], [first, first], [first, first], n_users=1, first_day=first, days=3)
+    assert result.hours[0, 0] == 16.0 and result.overallocated[0]